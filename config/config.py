@@ -48,7 +48,8 @@ class Config:
     
     # Cursor 相關設定
     VSCODE_EXECUTABLE = "/usr/share/windsurf/windsurf"  # Windsurf 可執行檔路徑
-    VSCODE_STARTUP_DELAY = 7   # Cursor 啟動等待時間（秒）
+    VSCODE_STARTUP_DELAY = 7   # Cursor 啟動等待時間（秒；可偵測視窗時為等待視窗出現的上限）
+    VSCODE_WINDOW_SETTLE_DELAY = 1.5  # 偵測到 Cursor 視窗後等待介面載入的時間（秒）
     VSCODE_STARTUP_TIMEOUT = 30  # Cursor 啟動超時時間（秒）
     VSCODE_COMMAND_DELAY = 1    # 命令執行間隔時間（秒）
     
@@ -57,6 +58,9 @@ class Config:
     COPILOT_CHECK_INTERVAL = 3      # 檢查回應完成間隔（秒）
     COPILOT_COPY_RETRY_MAX = 3      # 複製回應重試次數（copilot_handler 內部）
     COPILOT_COPY_RETRY_DELAY = 2    # 複製重試間隔（秒）
+    USE_UIA_INPUT = False           # Windows: 以 UI Automation 直接設定輸入框內容（需 uiautomation 套件，失敗時退回剪貼簿貼上）
+    UIA_INPUT_CONTROL_KEYWORDS = ("inputarea", "chat-input")  # 聊天輸入框 ClassName / AutomationId 需包含的關鍵字之一（不分大小寫）
+    COPILOT_PASTE_SETTLE_DELAY = 0.5  # 貼上後、按 Enter 前的等待時間（秒；可讀回輸入框內容時為確認貼上完成的上限）
     
     # Artificial Suicide 模式專用重試設定
     AS_MODE_MAX_RETRY_PER_LINE = 10  # AS 模式中每一行的最大重試次數（包含所有失敗類型）
@@ -28,7 +28,7 @@ from src.error_handler import (
 )
 from src.cwe_scan_manager import CWEScanManager
 from src.cwe_scan_ui import show_cwe_scan_settings
-from src.checkpoint_manager import CheckpointManager, check_for_resumable_execution
+from src.checkpoint_manager import get_checkpoint_manager, check_for_resumable_execution
 
 class HybridUIAutomationScript:
     """混合式 UI 自動化腳本主控制器"""
@@ -41,7 +41,7 @@ class HybridUIAutomationScript:
         self.project_manager = ProjectManager()
         self.cursor_controller = CursorController()
         self.error_handler = ErrorHandler()
-        self.checkpoint_manager = CheckpointManager()  # 檢查點管理器（需先初始化）
+        self.checkpoint_manager = get_checkpoint_manager()  # 檢查點管理器（需先初始化）
         self.copilot_handler = CopilotHandler(
             self.error_handler, 
             interaction_settings=None,
@@ -6,7 +6,9 @@ Artificial Suicide 攻擊模式 - 輕量級控制器
 """
 
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import threading
 import time
 import pyautogui
 
@@ -100,6 +102,14 @@ class ArtificialSuicideMode:
         # 原始狀態掃描結果（用於攻擊前後比較報告）
         self.baseline_results = {}
         
+        # Phase 2 背景掃描執行緒池：掃描與下一行的 prompt 送出重疊執行
+        # 使用單一 worker，確保函式級別 CSV 依行號順序寫入（第 1 行覆寫、其餘追加）
+        self._scan_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ASScan")
+        self._pending_scan_futures: List[Future] = []
+        # 各目標檔案最後提交的掃描（單一 worker 依序執行，等待最後一個即代表該檔案的掃描皆已完成）
+        self._scan_future_by_file: Dict[str, Future] = {}
+        self._vicious_lock = threading.Lock()
+        
         self.logger.info(f"✅ AS 模式初始化完成 - CWE-{target_cwe}, {total_rounds} 輪, {len(self.prompt_lines)} 行")
     
     def _load_templates(self) -> Dict[str, str]:
@@ -196,6 +206,36 @@ class ArtificialSuicideMode:
             self.logger.error(f"清空輸入框時發生錯誤: {e}")
             return False
     
+    def _stop_requested(self) -> bool:
+        """是否已收到緊急停止請求"""
+        return bool(self.error_handler and self.error_handler.emergency_stop_requested)
+    
+    def _handle_retry(self, reason: str, line_idx: int, round_num: int,
+                      retry_count: int, wait_s: int = 60) -> int:
+        """
+        統一處理重試：記錄原因、等待退避時間、清空輸入框並重新聚焦
+        
+        Args:
+            reason: 重試原因（用於日誌）
+            line_idx: 行號
+            round_num: 輪數
+            retry_count: 目前的重試次數
+            wait_s: 基礎等待秒數（傳給 wait_and_retry）
+            
+        Returns:
+            int: 更新後的重試次數（收到中斷請求時不清空輸入框，呼叫端以 _stop_requested 判斷是否結束）
+        """
+        retry_count += 1
+        self.logger.warning("  ⏳ 第 %s 行%s，等待後重試（第 %s 次）", line_idx, reason, retry_count)
+        if not wait_and_retry(wait_s, line_idx, round_num, self.logger, retry_count,
+                              should_stop=self._stop_requested):
+            # 收到中斷請求：不再操作輸入框，由逐行迴圈檢查後結束
+            return retry_count
+        
+        # 清空輸入框準備重試
+        self._clear_input_and_refocus()
+        return retry_count
+    
     def _load_prompt_lines(self) -> List[str]:
         """載入專案的 prompt.txt（利用現有功能）"""
         return self.copilot_handler.load_project_prompt_lines(str(self.project_path))
@@ -321,6 +361,22 @@ class ArtificialSuicideMode:
         
         return (filepath, first_function)
     
+    def _build_skip_set(self) -> frozenset:
+        """
+        建立已攻擊成功的函式集合（每道程序只讀取一次統計 CSV）
+        
+        Returns:
+            frozenset: 函式識別集合（格式："filepath::function_name"）
+        """
+        if not self.query_stats:
+            return frozenset()
+        
+        try:
+            return frozenset(self.query_stats.iter_success_keys())
+        except Exception as e:
+            self.logger.error(f"❌ 讀取已攻擊成功的函式時發生錯誤: {e}")
+            return frozenset()
+    
     def execute(self) -> Tuple[bool, int]:
         """
         執行完整的 AS 攻擊流程
@@ -431,6 +487,8 @@ class ArtificialSuicideMode:
             # 即使出錯，也嘗試生成比較報告
             self._generate_comparison_report_if_available()
             return False, self.files_processed_in_project
+        finally:
+            self._scan_pool.shutdown(wait=True)
     
     def _generate_comparison_report_if_available(self):
         """生成攻擊前後比較報告（如果有原始狀態掃描結果）"""
@@ -515,7 +573,7 @@ class ArtificialSuicideMode:
         手動處理每一行以支援 AS 專用的檔案結構
         """
         try:
-            self.logger.info(f"  開始處理第 1 道程序（共 {len(self.prompt_lines)} 行）")
+            self.logger.info("  開始處理第 1 道程序（共 %s 行）", len(self.prompt_lines))
             
             # 開啟 Copilot Chat（如果尚未開啟）
             if not self.copilot_handler.open_copilot_chat():
@@ -528,7 +586,9 @@ class ArtificialSuicideMode:
                 self.logger.warning("⚠️  選擇 AI 模型失敗，但繼續執行")
             
             successful_lines = 0
-            failed_lines = []
+            failed_lines: Set[int] = set()
+            total_lines = len(self.prompt_lines)
+            skip_set = self._build_skip_set()
             
             # 初始化本輪的回應儲存
             if round_num not in self.round_responses:
@@ -542,14 +602,14 @@ class ArtificialSuicideMode:
                 # 解析 prompt 行
                 target_file, target_function_name = self._parse_prompt_line(line)
                 if not target_file or not target_function_name:
-                    self.logger.error(f"  ❌ 第 {line_idx} 行格式錯誤")
-                    failed_lines.append(line_idx)
+                    self.logger.error("  ❌ 第 %s 行格式錯誤", line_idx)
+                    failed_lines.add(line_idx)
                     continue
                 
                 # 檢查是否應該跳過（已攻擊成功）
-                function_key = f"{target_file}_{target_function_name}"
-                if self.query_stats and self.query_stats.should_skip_function(function_key):
-                    self.logger.info(f"  ⏭️  跳過第 {line_idx} 行（已攻擊成功）")
+                function_key = f"{target_file}::{target_function_name.replace('()', '')}"
+                if function_key in skip_set:
+                    self.logger.info("  ⏭️  跳過第 %s 行（已攻擊成功）", line_idx)
                     successful_lines += 1
                     continue
                 
@@ -557,23 +617,23 @@ class ArtificialSuicideMode:
                 pre_phase1_line_number = None
                 if self.function_name_tracker:
                     if round_num == 1:
-                        self.logger.info(f"  🔍 搜尋原始函式 {target_function_name} 的行號...")
+                        self.logger.info("  🔍 搜尋原始函式 %s 的行號...", target_function_name)
                         pre_phase1_line_number = self.function_name_tracker.find_original_function_line(
                             filepath=target_file,
                             original_name=target_function_name,
                             project_path=self.project_path
                         )
                         if pre_phase1_line_number:
-                            self.logger.info(f"  ✅ 找到原始函式在第 {pre_phase1_line_number} 行")
+                            self.logger.info("  ✅ 找到原始函式在第 %s 行", pre_phase1_line_number)
                         else:
-                            self.logger.warning(f"  ⚠️  未找到原始函式行號，將使用函式名稱匹配")
+                            self.logger.warning("  ⚠️  未找到原始函式行號，將使用函式名稱匹配")
                     else:
                         # 第 2+ 輪：取得上一輪 Phase 1 結束後的行號
                         _, prev_line = self.function_name_tracker.get_function_name_for_round(
                             target_file, target_function_name, round_num - 1
                         )
                         pre_phase1_line_number = prev_line
-                        self.logger.debug(f"  📍 第 {round_num} 輪使用上一輪的行號：{pre_phase1_line_number}")
+                        self.logger.debug("  📍 第 %s 輪使用上一輪的行號：%s", round_num, pre_phase1_line_number)
                 
                 retry_count = 0
                 line_success = False
@@ -591,94 +651,78 @@ class ArtificialSuicideMode:
                     )
                     if result:
                         pre_phase1_name, pre_phase1_line = result
-                        self.logger.debug(f"  📝 [送出 prompt 前] 當前函式名稱: {pre_phase1_name} (行 {pre_phase1_line})")
+                        self.logger.debug("  📝 [送出 prompt 前] 當前函式名稱: %s (行 %s)", pre_phase1_name, pre_phase1_line)
+                
+                # 提取檔案路徑（保留完整路徑，將 / 替換為 __）
+                filename = target_file.replace('/', '__')
+                
+                query_prompt = None
                 
                 # 持續重試直到回應完整（最多 AS_MODE_MAX_RETRY_PER_LINE 次）
                 while not line_success:
                     try:
+                        # 收到中斷請求時不再重試
+                        if self._stop_requested():
+                            break
+                        
                         # 檢查是否超過最大重試次數
                         if retry_count >= config.AS_MODE_MAX_RETRY_PER_LINE:
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：已達最大重試次數 ({config.AS_MODE_MAX_RETRY_PER_LINE} 次)，放棄該行")
-                            failed_lines.append(line_idx)
+                            self.logger.error("  ❌ 第 %s 行：已達最大重試次數 (%s 次)，放棄該行", line_idx, config.AS_MODE_MAX_RETRY_PER_LINE)
+                            failed_lines.add(line_idx)
                             break
                         
-                        # 提取檔案路徑（保留完整路徑，將 / 替換為 __）
-                        filename = target_file.replace('/', '__')
-                        
                         if retry_count == 0:
-                            self.logger.info(f"  處理第 {line_idx}/{len(self.prompt_lines)} 行: {target_file}|{target_function_name}")
+                            self.logger.info("  處理第 %s/%s 行: %s|%s", line_idx, total_lines, target_file, target_function_name)
                         else:
-                            self.logger.info(f"  重試第 {line_idx} 行（第 {retry_count}/{config.AS_MODE_MAX_RETRY_PER_LINE} 次）")
+                            self.logger.info("  重試第 %s 行（第 %s/%s 次）", line_idx, retry_count, config.AS_MODE_MAX_RETRY_PER_LINE)
                         
-                        # 取得上一輪的回應（如果是第 2+ 輪）
-                        last_response = ""
-                        if round_num > 1 and (round_num - 1) in self.round_responses:
-                            last_response = self.round_responses[round_num - 1].get(line_idx, "")
-                            if last_response:
-                                self.logger.debug(f"  📎 使用第 {round_num - 1} 輪的回應（{len(last_response)} 字元）")
-                        
-                        # 生成 Query Prompt
-                        query_prompt = self._generate_query_prompt(
-                            round_num, target_file, target_function_name, last_response
-                        )
+                        # 生成 Query Prompt（重試時內容不變，沿用第一次生成的結果）
+                        if query_prompt is None:
+                            # 取得上一輪的回應（如果是第 2+ 輪）
+                            last_response = ""
+                            if round_num > 1 and (round_num - 1) in self.round_responses:
+                                last_response = self.round_responses[round_num - 1].get(line_idx, "")
+                                if last_response:
+                                    self.logger.debug("  📎 使用第 %s 輪的回應（%s 字元）", round_num - 1, len(last_response))
+                            
+                            query_prompt = self._generate_query_prompt(
+                                round_num, target_file, target_function_name, last_response
+                            )
                         
                         # 發送 prompt
                         success = self.copilot_handler._send_prompt_with_content(
                             prompt_content=query_prompt,
                             line_number=line_idx,
-                            total_lines=len(self.prompt_lines)
+                            total_lines=total_lines
                         )
                         
                         if not success:
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：無法發送提示詞")
-                            retry_count += 1
-                            self.logger.warning(f"  ⏳ 發送失敗，等待後重試（第 {retry_count} 次）")
-                            wait_and_retry(60, line_idx, round_num, self.logger, retry_count)
-                            
-                            # 清空輸入框準備重試
-                            self._clear_input_and_refocus()
+                            self.logger.error("  ❌ 第 %s 行：無法發送提示詞", line_idx)
+                            retry_count = self._handle_retry("發送失敗", line_idx, round_num, retry_count)
                             continue
                         
                         # 等待回應
                         if not self.copilot_handler.wait_for_response(use_smart_wait=True):
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：等待回應超時")
-                            retry_count += 1
-                            self.logger.warning(f"  ⏳ 等待超時，將重試（第 {retry_count} 次）")
-                            wait_and_retry(60, line_idx, round_num, self.logger, retry_count)
-                            
-                            # 清空輸入框準備重試
-                            self._clear_input_and_refocus()
+                            self.logger.error("  ❌ 第 %s 行：等待回應超時", line_idx)
+                            retry_count = self._handle_retry("等待超時", line_idx, round_num, retry_count)
                             continue
                         
                         # 複製回應
                         response = self.copilot_handler.copy_response()
                         if not response:
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：無法複製回應內容")
-                            retry_count += 1
-                            self.logger.warning(f"  ⏳ 複製失敗，將重試（第 {retry_count} 次）")
-                            wait_and_retry(60, line_idx, round_num, self.logger, retry_count)
-                            
-                            # 清空輸入框準備重試
-                            self._clear_input_and_refocus()
+                            self.logger.error("  ❌ 第 %s 行：無法複製回應內容", line_idx)
+                            retry_count = self._handle_retry("複製失敗", line_idx, round_num, retry_count)
                             continue
                         
-                        self.logger.info(f"  ✅ 收到回應 ({len(response)} 字元)")
+                        self.logger.info("  ✅ 收到回應 (%s 字元)", len(response))
                         
                         # 檢查回應完整性
                         if is_response_incomplete(response):
-                            self.logger.warning(f"  ⚠️  第 {line_idx} 行回應不完整，將等待後重試")
-                            retry_count += 1
-                            
-                            # 等待 30 分鐘後重試（無最大重試次數限制）
-                            wait_and_retry(1800, line_idx, round_num, self.logger, retry_count)
-                            
-                            # 清空輸入框準備重試
-                            self._clear_input_and_refocus()
-                            
+                            retry_count = self._handle_retry("回應不完整", line_idx, round_num, retry_count, wait_s=1800)
                             continue  # 繼續重試循環
                         
                         # 回應完整，儲存回應（AS 專用格式）
-                        self.logger.info(f"  ✅ 第 {line_idx} 行回應完整")
+                        self.logger.info("  ✅ 第 %s 行回應完整", line_idx)
                         save_success = self.copilot_handler.save_response_to_file(
                             project_path=str(self.project_path),
                             response=response,
@@ -689,7 +733,7 @@ class ArtificialSuicideMode:
                             filename=filename,
                             function_name=target_function_name,
                             prompt_text=query_prompt,
-                            total_lines=len(self.prompt_lines),
+                            total_lines=total_lines,
                             retry_count=retry_count
                         )
                         
@@ -699,14 +743,14 @@ class ArtificialSuicideMode:
                             
                             # === [送出 prompt 後] 提取 Phase 1 結束後的函式名稱（使用行號定位）===
                             if self.function_name_tracker:
-                                self.logger.info(f"  📝 [送出 prompt 後] 提取修改後的函式名稱...")
+                                self.logger.info("  📝 [送出 prompt 後] 提取修改後的函式名稱...")
                                 
                                 # 使用 Phase 1 開始前的行號作為搜尋起點
                                 line_to_check = pre_phase1_line if pre_phase1_line else pre_phase1_line_number
                                 
                                 # 如果沒有行號，嘗試重新搜尋（可能因為上一輪追蹤失敗）
                                 if not line_to_check:
-                                    self.logger.debug(f"  🔍 無已知行號，重新搜尋函式位置...")
+                                    self.logger.debug("  🔍 無已知行號，重新搜尋函式位置...")
                                     line_to_check = self.function_name_tracker.find_original_function_line(
                                         filepath=target_file,
                                         original_name=target_function_name,
@@ -739,55 +783,63 @@ class ArtificialSuicideMode:
                                             phase_number=1  # Phase 1 = Query
                                         )
                                         
-                                        self.logger.info(f"  📝 Phase 1 記錄: {pre_phase1_name} → {post_phase1_name}（行 {pre_phase1_line} → {post_phase1_line}）")
+                                        self.logger.info("  📝 Phase 1 記錄: %s → %s（行 %s → %s）", pre_phase1_name, post_phase1_name, pre_phase1_line, post_phase1_line)
                                         if post_phase1_name != pre_phase1_name:
-                                            self.logger.info(f"  ✅ 函式名稱已變更！")
+                                            self.logger.info("  ✅ 函式名稱已變更！")
                                         else:
-                                            self.logger.debug(f"  ℹ️  函式名稱未變更")
+                                            self.logger.debug("  ℹ️  函式名稱未變更")
                                     else:
-                                        self.logger.warning(f"  ⚠️  無法提取函式名稱（第 {line_to_check} 行附近）")
+                                        self.logger.warning("  ⚠️  無法提取函式名稱（第 %s 行附近）", line_to_check)
                                 else:
-                                    self.logger.warning(f"  ⚠️  無法定位函式行號，跳過名稱追蹤")
+                                    self.logger.warning("  ⚠️  無法定位函式行號，跳過名稱追蹤")
                             
                             successful_lines += 1
-                            self.logger.info(f"  ✅ 第 {line_idx} 行處理完成" + (f"（經過 {retry_count} 次重試）" if retry_count > 0 else ""))
+                            if retry_count > 0:
+                                self.logger.info("  ✅ 第 %s 行處理完成（經過 %s 次重試）", line_idx, retry_count)
+                            else:
+                                self.logger.info("  ✅ 第 %s 行處理完成", line_idx)
                             line_success = True
                         else:
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：儲存失敗")
-                            failed_lines.append(line_idx)
+                            self.logger.error("  ❌ 第 %s 行：儲存失敗", line_idx)
+                            failed_lines.add(line_idx)
                             break
                         
                         # 短暫延遲
-                        if line_idx < len(self.prompt_lines):
+                        if line_idx < total_lines:
                             time.sleep(1.5)
                         
                     except Exception as e:
-                        self.logger.error(f"  ❌ 處理第 {line_idx} 行時發生錯誤: {e}")
-                        failed_lines.append(line_idx)
+                        self.logger.error("  ❌ 處理第 %s 行時發生錯誤: %s", line_idx, e)
+                        failed_lines.add(line_idx)
                         break
                 
+                # 收到中斷請求：該行未完成，不再處理剩餘的行
+                if not line_success and self._stop_requested():
+                    failed_lines.add(line_idx)
+                    self.logger.warning("  ⚠️  收到中斷請求，自第 %s 行起停止處理", line_idx)
+                    break
+                
                 # 檢查該行是否成功完成
                 if not line_success:
                     # break 退出但沒有標記失敗的情況（例如：無法複製回應、發送失敗等）
-                    if line_idx not in failed_lines:
-                        failed_lines.append(line_idx)
-                    self.logger.warning(f"  ⚠️  第 {line_idx} 行未成功完成")
+                    failed_lines.add(line_idx)
+                    self.logger.warning("  ⚠️  第 %s 行未成功完成", line_idx)
             
             # 統計結果
             if successful_lines == len(self.prompt_lines):
-                self.logger.info(f"  ✅ 第 1 道完成：{successful_lines}/{len(self.prompt_lines)} 行")
+                self.logger.info("  ✅ 第 1 道完成：%s/%s 行", successful_lines, len(self.prompt_lines))
                 return True
             elif successful_lines > 0:
                 # 部分成功也視為成功，允許繼續執行後續輪次
-                self.logger.warning(f"  ⚠️  第 1 道部分完成：{successful_lines}/{len(self.prompt_lines)} 行（失敗: {failed_lines}）")
+                self.logger.warning("  ⚠️  第 1 道部分完成：%s/%s 行（失敗: %s）", successful_lines, len(self.prompt_lines), sorted(failed_lines))
                 return True
             else:
                 # 全部失敗才返回 False
-                self.logger.error(f"  ❌ 第 1 道全部失敗：0/{len(self.prompt_lines)} 行（失敗: {failed_lines}）")
+                self.logger.error("  ❌ 第 1 道全部失敗：0/%s 行（失敗: %s）", len(self.prompt_lines), sorted(failed_lines))
                 return False
             
         except Exception as e:
-            self.logger.error(f"  ❌ 第 1 道執行錯誤: {e}")
+            self.logger.error("  ❌ 第 1 道執行錯誤: %s", e)
             return False
     
     def _execute_phase2(self, round_num: int) -> bool:
@@ -796,7 +848,7 @@ class ArtificialSuicideMode:
         手動處理每一行以支援 AS 專用的檔案結構
         """
         try:
-            self.logger.info(f"  開始處理第 2 道程序（共 {len(self.prompt_lines)} 行）")
+            self.logger.info("  開始處理第 2 道程序（共 %s 行）", len(self.prompt_lines))
             
             # 開啟 Copilot Chat（應該已經開啟）
             if not self.copilot_handler.is_chat_open:
@@ -805,7 +857,9 @@ class ArtificialSuicideMode:
                     return False
             
             successful_lines = 0
-            failed_lines = []
+            failed_lines: Set[int] = set()
+            total_lines = len(self.prompt_lines)
+            skip_set = self._build_skip_set()
             
             for line_idx, line in enumerate(self.prompt_lines, start=1):
                 # 更新 checkpoint: 記錄 Phase 2 當前處理的行數
@@ -815,10 +869,20 @@ class ArtificialSuicideMode:
                 # 解析 prompt 行
                 target_file, target_function_name = self._parse_prompt_line(line)
                 if not target_file or not target_function_name:
-                    self.logger.error(f"  ❌ 第 {line_idx} 行格式錯誤")
-                    failed_lines.append(line_idx)
+                    self.logger.error("  ❌ 第 %s 行格式錯誤", line_idx)
+                    failed_lines.add(line_idx)
                     continue
                 
+                # 檢查是否應該跳過（已攻擊成功）
+                function_key = f"{target_file}::{target_function_name.replace('()', '')}"
+                if function_key in skip_set:
+                    self.logger.info("  ⏭️  跳過第 %s 行（已攻擊成功）", line_idx)
+                    successful_lines += 1
+                    continue
+                
+                # 背景掃描讀取的是工作目錄中的檔案，送出會修改同一檔案的 prompt 前必須先等待其完成
+                self._wait_scan_for_file(target_file)
+                
                 # === 取得 Phase 1 結束後的行號（用於讀取函式名稱）===
                 phase1_end_line = None
                 if self.function_name_tracker:
@@ -826,18 +890,21 @@ class ArtificialSuicideMode:
                         target_file, target_function_name, round_num
                     )
                 
-                # 檢查是否應該跳過（已攻擊成功）
-                function_key = f"{target_file}_{target_function_name}"
-                if self.query_stats and self.query_stats.should_skip_function(function_key):
-                    self.logger.info(f"  ⏭️  跳過第 {line_idx} 行（已攻擊成功）")
-                    successful_lines += 1
-                    continue
-                
                 # === [送出 prompt 前] 讀取當前函式名稱 ===
                 pre_phase2_name = target_function_name  # 預設使用原始名稱
                 pre_phase2_line = phase1_end_line
                 
-                if self.function_name_tracker and phase1_end_line:
+                # 優先使用本輪 Phase 1 已記錄的結果，無記錄時才重新讀取檔案
+                recorded = None
+                if self.function_name_tracker:
+                    recorded = self.function_name_tracker.get_latest_recorded(
+                        target_file, target_function_name, round_num
+                    )
+                
+                if recorded and recorded[1]:
+                    pre_phase2_name, pre_phase2_line = recorded
+                    self.logger.debug("  📝 [送出 prompt 前] 當前函式名稱: %s (行 %s，來自 Phase 1 記錄)", pre_phase2_name, pre_phase2_line)
+                elif self.function_name_tracker and phase1_end_line:
                     result = self.function_name_tracker.extract_modified_function_name_by_line(
                         filepath=target_file,
                         original_name=target_function_name,
@@ -846,7 +913,7 @@ class ArtificialSuicideMode:
                     )
                     if result:
                         pre_phase2_name, pre_phase2_line = result
-                        self.logger.debug(f"  📝 [送出 prompt 前] 當前函式名稱: {pre_phase2_name} (行 {pre_phase2_line})")
+                        self.logger.debug("  📝 [送出 prompt 前] 當前函式名稱: %s (行 %s)", pre_phase2_name, pre_phase2_line)
                 
                 # 使用「送出 prompt 前」的函式名稱作為當前名稱
                 current_function_name = pre_phase2_name
@@ -854,83 +921,67 @@ class ArtificialSuicideMode:
                 retry_count = 0
                 line_success = False
                 
+                # 提取檔案路徑（保留完整路徑，將 / 替換為 __）
+                filename = target_file.replace('/', '__')
+                
+                coding_prompt = None
+                
                 # 持續重試直到回應完整（最多 AS_MODE_MAX_RETRY_PER_LINE 次）
                 while not line_success:
                     try:
+                        # 收到中斷請求時不再重試
+                        if self._stop_requested():
+                            break
+                        
                         # 檢查是否超過最大重試次數
                         if retry_count >= config.AS_MODE_MAX_RETRY_PER_LINE:
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：已達最大重試次數 ({config.AS_MODE_MAX_RETRY_PER_LINE} 次)，放棄該行")
-                            failed_lines.append(line_idx)
+                            self.logger.error("  ❌ 第 %s 行：已達最大重試次數 (%s 次)，放棄該行", line_idx, config.AS_MODE_MAX_RETRY_PER_LINE)
+                            failed_lines.add(line_idx)
                             break
                         
-                        # 提取檔案路徑（保留完整路徑，將 / 替換為 __）
-                        filename = target_file.replace('/', '__')
-                        
                         if retry_count == 0:
-                            self.logger.info(f"  處理第 {line_idx}/{len(self.prompt_lines)} 行: {target_file}|{target_function_name}")
+                            self.logger.info("  處理第 %s/%s 行: %s|%s", line_idx, total_lines, target_file, target_function_name)
                         else:
-                            self.logger.info(f"  重試第 {line_idx} 行（第 {retry_count}/{config.AS_MODE_MAX_RETRY_PER_LINE} 次）")
+                            self.logger.info("  重試第 %s 行（第 %s/%s 次）", line_idx, retry_count, config.AS_MODE_MAX_RETRY_PER_LINE)
                         
-                        # 生成 Coding Prompt
-                        coding_prompt = self._generate_coding_prompt(target_file, target_function_name)
+                        # 生成 Coding Prompt（重試時內容不變，沿用第一次生成的結果）
+                        if coding_prompt is None:
+                            coding_prompt = self._generate_coding_prompt(target_file, target_function_name)
                         
                         # 發送 prompt
                         success = self.copilot_handler._send_prompt_with_content(
                             prompt_content=coding_prompt,
                             line_number=line_idx,
-                            total_lines=len(self.prompt_lines)
+                            total_lines=total_lines
                         )
                         
                         if not success:
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：無法發送提示詞")
-                            retry_count += 1
-                            self.logger.warning(f"  ⏳ 發送失敗，等待後重試（第 {retry_count} 次）")
-                            wait_and_retry(60, line_idx, round_num, self.logger, retry_count)
-                            
-                            # 清空輸入框準備重試
-                            self._clear_input_and_refocus()
+                            self.logger.error("  ❌ 第 %s 行：無法發送提示詞", line_idx)
+                            retry_count = self._handle_retry("發送失敗", line_idx, round_num, retry_count)
                             continue
                         
                         # 等待回應
                         if not self.copilot_handler.wait_for_response(use_smart_wait=True):
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：等待回應超時")
-                            retry_count += 1
-                            self.logger.warning(f"  ⏳ 等待超時，將重試（第 {retry_count} 次）")
-                            wait_and_retry(60, line_idx, round_num, self.logger, retry_count)
-                            
-                            # 清空輸入框準備重試
-                            self._clear_input_and_refocus()
+                            self.logger.error("  ❌ 第 %s 行：等待回應超時", line_idx)
+                            retry_count = self._handle_retry("等待超時", line_idx, round_num, retry_count)
                             continue
                         
                         # 複製回應
                         response = self.copilot_handler.copy_response()
                         if not response:
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：無法複製回應內容")
-                            retry_count += 1
-                            self.logger.warning(f"  ⏳ 複製失敗，將重試（第 {retry_count} 次）")
-                            wait_and_retry(60, line_idx, round_num, self.logger, retry_count)
-                            
-                            # 清空輸入框準備重試
-                            self._clear_input_and_refocus()
+                            self.logger.error("  ❌ 第 %s 行：無法複製回應內容", line_idx)
+                            retry_count = self._handle_retry("複製失敗", line_idx, round_num, retry_count)
                             continue
                         
-                        self.logger.info(f"  ✅ 收到回應 ({len(response)} 字元)")
+                        self.logger.info("  ✅ 收到回應 (%s 字元)", len(response))
                         
                         # 檢查回應完整性
                         if is_response_incomplete(response):
-                            self.logger.warning(f"  ⚠️  第 {line_idx} 行回應不完整，將等待後重試")
-                            retry_count += 1
-                            
-                            # 等待 30 分鐘後重試（無最大重試次數限制）
-                            wait_and_retry(1800, line_idx, round_num, self.logger, retry_count)
-                            
-                            # 清空輸入框準備重試
-                            self._clear_input_and_refocus()
-                            
+                            retry_count = self._handle_retry("回應不完整", line_idx, round_num, retry_count, wait_s=1800)
                             continue  # 繼續重試循環
                         
                         # 回應完整，儲存回應（AS 專用格式）
-                        self.logger.info(f"  ✅ 第 {line_idx} 行回應完整")
+                        self.logger.info("  ✅ 第 %s 行回應完整", line_idx)
                         save_success = self.copilot_handler.save_response_to_file(
                             project_path=str(self.project_path),
                             response=response,
@@ -941,17 +992,17 @@ class ArtificialSuicideMode:
                             filename=filename,
                             function_name=current_function_name,  # 使用修改後的函式名稱
                             prompt_text=coding_prompt,
-                            total_lines=len(self.prompt_lines),
+                            total_lines=total_lines,
                             retry_count=retry_count
                         )
                         
                         if not save_success:
-                            self.logger.error(f"  ❌ 第 {line_idx} 行：儲存失敗")
-                            failed_lines.append(line_idx)
+                            self.logger.error("  ❌ 第 %s 行：儲存失敗", line_idx)
+                            failed_lines.add(line_idx)
                             break
                         
                         # === CWE 掃描 + [送出 prompt 後] Phase 2 函式名稱追蹤 ===
-                        self.logger.info(f"  🔍 開始掃描第 {line_idx} 行的函式")
+                        self.logger.info("  🔍 開始掃描第 %s 行的函式", line_idx)
                         
                         # === [送出 prompt 後] 讀取 Phase 2 結束後的函式名稱 ===
                         post_phase2_name = pre_phase2_name  # 預設使用「送出 prompt 前」的名稱
@@ -983,93 +1034,159 @@ class ArtificialSuicideMode:
                                     phase_number=2  # Phase 2 = Coding
                                 )
                                 
-                                self.logger.info(f"  📝 Phase 2 記錄: {pre_phase2_name} → {post_phase2_name}（行 {pre_phase2_line} → {post_phase2_line}）")
+                                self.logger.info("  📝 Phase 2 記錄: %s → %s（行 %s → %s）", pre_phase2_name, post_phase2_name, pre_phase2_line, post_phase2_line)
                                 if post_phase2_name != pre_phase2_name:
-                                    self.logger.info(f"  ✅ 函式名稱已變更！")
+                                    self.logger.info("  ✅ 函式名稱已變更！")
                                 else:
-                                    self.logger.debug(f"  ℹ️  函式名稱未變更")
+                                    self.logger.debug("  ℹ️  函式名稱未變更")
                             else:
-                                self.logger.warning(f"  ⚠️  無法提取 Phase 2 結束後的函式名稱")
+                                self.logger.warning("  ⚠️  無法提取 Phase 2 結束後的函式名稱")
                         elif not pre_phase2_line:
-                            self.logger.warning(f"  ⚠️  無法取得 Phase 2 開始前的行號")
+                            self.logger.warning("  ⚠️  無法取得 Phase 2 開始前的行號")
                         
                         if self.cwe_scan_manager:
-                            try:
-                                # 構造只包含當前處理函數的 prompt
-                                # 格式: filepath|function_name (使用 Phase 2 結束後的名稱)
-                                single_function_prompt = f"{target_file}|{post_phase2_name}"
-                                
-                                # 呼叫函式級別掃描（會自動追加到 CSV）
-                                # - original_function_name: prompt.txt 中的原始名稱（用於 CSV「修改前函式名稱」）
-                                # - modified_function_name: Phase 1 修改後的名稱（用於 CSV「修改後函式名稱」）
-                                # - actual_function_name: Phase 2 後的名稱（用於實際掃描）
-                                scan_success, scan_files, vuln_info = self.cwe_scan_manager.scan_from_prompt_function_level(
-                                    project_path=self.project_path,
-                                    project_name=self.project_path.name,
-                                    prompt_content=single_function_prompt,  # 只掃描實際處理的函數
-                                    cwe_type=self.target_cwe,
-                                    round_number=round_num,
-                                    line_number=line_idx,
-                                    original_function_name=target_function_name,  # prompt.txt 中的原始名稱
-                                    modified_function_name=current_function_name   # Phase 1 修改後的名稱
-                                )
-                                
-                                if scan_success:
-                                    self.logger.info(f"  ✅ 掃描完成")
-                                    # 記錄漏洞資訊到 vicious_pattern_manager（用於後續備份 vicious pattern）
-                                    # 注意：使用 current_function_name（Phase 1 修改後的名稱）而不是掃描返回的名稱
-                                    # 因為我們要記錄的是「容易被製造漏洞的函式名稱」
-                                    if vuln_info and self.vicious_pattern_manager:
-                                        for file_path, func_list in vuln_info.items():
-                                            for func_name, vuln_count in func_list:
-                                                self.vicious_pattern_manager.add_vulnerable_function(
-                                                    file_path=file_path,
-                                                    function_name=current_function_name,  # 使用 Phase 1 修改後的名稱
-                                                    round_number=round_num,
-                                                    vulnerability_count=vuln_count,
-                                                    scanner="combined"
-                                                )
-                                                self.logger.info(f"    📌 記錄漏洞: {file_path}::{current_function_name} ({vuln_count} 個)")
-                                else:
-                                    self.logger.warning(f"  ⚠️  掃描未找到目標函式")
-                            except Exception as e:
-                                self.logger.error(f"  ❌ 掃描時發生錯誤: {e}")
+                            # 掃描交由背景執行緒處理，下一行目標為其他檔案時可與其 prompt 送出重疊執行
+                            # 下一行目標為同一檔案時會先等待（見 _wait_scan_for_file），本道程序結束（undo 之前）時等待全部完成
+                            scan_future = self._scan_pool.submit(
+                                self._run_scan_and_record,
+                                target_file,
+                                post_phase2_name,
+                                target_function_name,
+                                current_function_name,
+                                round_num,
+                                line_idx
+                            )
+                            self._pending_scan_futures.append(scan_future)
+                            self._scan_future_by_file[target_file] = scan_future
                         else:
                             self.logger.warning("  ⚠️  CWE scan manager 未提供，跳過掃描")
                         
                         successful_lines += 1
-                        self.logger.info(f"  ✅ 第 {line_idx} 行處理完成" + (f"（經過 {retry_count} 次重試）" if retry_count > 0 else ""))
+                        if retry_count > 0:
+                            self.logger.info("  ✅ 第 %s 行處理完成（經過 %s 次重試）", line_idx, retry_count)
+                        else:
+                            self.logger.info("  ✅ 第 %s 行處理完成", line_idx)
                         line_success = True
                         
                         # 短暫延遲
-                        if line_idx < len(self.prompt_lines):
+                        if line_idx < total_lines:
                             time.sleep(1.5)
                         
                     except Exception as e:
-                        self.logger.error(f"  ❌ 處理第 {line_idx} 行時發生錯誤: {e}")
-                        failed_lines.append(line_idx)
+                        self.logger.error("  ❌ 處理第 %s 行時發生錯誤: %s", line_idx, e)
+                        failed_lines.add(line_idx)
                         break
                 
+                # 收到中斷請求：該行未完成，不再處理剩餘的行
+                if not line_success and self._stop_requested():
+                    failed_lines.add(line_idx)
+                    self.logger.warning("  ⚠️  收到中斷請求，自第 %s 行起停止處理", line_idx)
+                    break
+                
                 # 檢查該行是否成功完成
                 if not line_success:
                     # break 退出但沒有標記失敗的情況（例如：無法複製回應、發送失敗等）
-                    if line_idx not in failed_lines:
-                        failed_lines.append(line_idx)
-                    self.logger.warning(f"  ⚠️  第 {line_idx} 行未成功完成")
+                    failed_lines.add(line_idx)
+                    self.logger.warning("  ⚠️  第 %s 行未成功完成", line_idx)
             
             # 統計結果
             if successful_lines == len(self.prompt_lines):
-                self.logger.info(f"  ✅ 第 2 道完成：{successful_lines}/{len(self.prompt_lines)} 行")
+                self.logger.info("  ✅ 第 2 道完成：%s/%s 行", successful_lines, len(self.prompt_lines))
                 return True
             elif successful_lines > 0:
                 # 部分成功也視為成功，允許繼續執行後續輪次
-                self.logger.warning(f"  ⚠️  第 2 道部分完成：{successful_lines}/{len(self.prompt_lines)} 行（失敗: {failed_lines}）")
+                self.logger.warning("  ⚠️  第 2 道部分完成：%s/%s 行（失敗: %s）", successful_lines, len(self.prompt_lines), sorted(failed_lines))
                 return True
             else:
                 # 全部失敗才返回 False
-                self.logger.error(f"  ❌ 第 2 道全部失敗：0/{len(self.prompt_lines)} 行（失敗: {failed_lines}）")
+                self.logger.error("  ❌ 第 2 道全部失敗：0/%s 行（失敗: %s）", len(self.prompt_lines), sorted(failed_lines))
                 return False
             
         except Exception as e:
-            self.logger.error(f"  ❌ 第 2 道執行錯誤: {e}")
+            self.logger.error("  ❌ 第 2 道執行錯誤: %s", e)
             return False
+        finally:
+            # 等待背景掃描全部完成，確保 undo 前已掃描到 Phase 2 的修改
+            self._wait_pending_scans()
+    
+    def _run_scan_and_record(self, target_file: str, post_phase2_name: str,
+                             target_function_name: str, current_function_name: str,
+                             round_num: int, line_idx: int) -> bool:
+        """
+        執行單一函式的 CWE 掃描並記錄漏洞資訊（於背景執行緒執行）
+        
+        Args:
+            target_file: 目標檔案路徑
+            post_phase2_name: Phase 2 結束後的函式名稱（用於實際掃描）
+            target_function_name: prompt.txt 中的原始名稱
+            current_function_name: Phase 1 修改後的名稱
+            round_num: 輪數
+            line_idx: 行號
+            
+        Returns:
+            bool: 掃描是否成功
+        """
+        try:
+            # 構造只包含當前處理函數的 prompt
+            # 格式: filepath|function_name (使用 Phase 2 結束後的名稱)
+            single_function_prompt = f"{target_file}|{post_phase2_name}"
+            
+            # 呼叫函式級別掃描（會自動追加到 CSV）
+            # - original_function_name: prompt.txt 中的原始名稱（用於 CSV「修改前函式名稱」）
+            # - modified_function_name: Phase 1 修改後的名稱（用於 CSV「修改後函式名稱」）
+            # - actual_function_name: Phase 2 後的名稱（用於實際掃描）
+            scan_success, scan_files, vuln_info = self.cwe_scan_manager.scan_from_prompt_function_level(
+                project_path=self.project_path,
+                project_name=self.project_path.name,
+                prompt_content=single_function_prompt,  # 只掃描實際處理的函數
+                cwe_type=self.target_cwe,
+                round_number=round_num,
+                line_number=line_idx,
+                original_function_name=target_function_name,  # prompt.txt 中的原始名稱
+                modified_function_name=current_function_name   # Phase 1 修改後的名稱
+            )
+            
+            if not scan_success:
+                self.logger.warning("  ⚠️  第 %s 行掃描未找到目標函式", line_idx)
+                return False
+            
+            self.logger.info("  ✅ 第 %s 行掃描完成", line_idx)
+            # 記錄漏洞資訊到 vicious_pattern_manager（用於後續備份 vicious pattern）
+            # 注意：使用 current_function_name（Phase 1 修改後的名稱）而不是掃描返回的名稱
+            # 因為我們要記錄的是「容易被製造漏洞的函式名稱」
+            if vuln_info and self.vicious_pattern_manager:
+                with self._vicious_lock:
+                    for file_path, func_list in vuln_info.items():
+                        for func_name, vuln_count in func_list:
+                            self.vicious_pattern_manager.add_vulnerable_function(
+                                file_path=file_path,
+                                function_name=current_function_name,  # 使用 Phase 1 修改後的名稱
+                                round_number=round_num,
+                                vulnerability_count=vuln_count,
+                                scanner="combined"
+                            )
+                            self.logger.info("    📌 記錄漏洞: %s::%s (%s 個)", file_path, current_function_name, vuln_count)
+            return True
+            
+        except Exception as e:
+            self.logger.error("  ❌ 第 %s 行掃描時發生錯誤: %s", line_idx, e)
+            return False
+    
+    def _wait_pending_scans(self):
+        """等待所有已提交的背景掃描完成"""
+        if not self._pending_scan_futures:
+            return
+        
+        self.logger.info("  ⏳ 等待 %s 個背景掃描完成...", len(self._pending_scan_futures))
+        wait(self._pending_scan_futures)
+        self._pending_scan_futures.clear()
+        self._scan_future_by_file.clear()
+    
+    def _wait_scan_for_file(self, target_file: str):
+        """等待指定檔案尚未完成的背景掃描（避免掃描讀到下一行正在修改中的檔案）"""
+        scan_future = self._scan_future_by_file.pop(target_file, None)
+        if scan_future is None or scan_future.done():
+            return
+        
+        self.logger.info("  ⏳ 等待 %s 的背景掃描完成後再處理...", target_file)
+        wait([scan_future])
@@ -10,13 +10,24 @@ Key features:
 - Detection of incomplete executions
 - Resume from exact interruption point
 - Support for both AS Mode and Non-AS Mode workflows
+- Append-only progress journal replayed on top of a periodic JSON snapshot
 """
 
+import atexit
 import json
 import os
-from datetime import datetime
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 try:
     from src.logger import get_logger
@@ -26,6 +37,73 @@ except ImportError:
 logger = get_logger("CheckpointManager")
 
 
+@dataclass(slots=True)
+class Progress:
+    """Execution progress; serialized as the checkpoint's "progress" object."""
+    current_project_index: int = 0
+    current_project_name: Optional[str] = None
+    current_round: int = 1
+    current_line: int = 1
+    current_phase: int = 1  # AS Mode: 1=Query, 2=Coding (Non-AS Mode 始終為 1)
+    completed_projects: List[str] = field(default_factory=list)
+    total_files_processed: int = 0  # 追蹤已處理的檔案數
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Progress":
+        """Build from a checkpoint "progress" dict, ignoring unknown keys."""
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the JSON-facing dict."""
+        return asdict(self)
+
+
+# Workspace root (parent of src/)
+_WORKSPACE = Path(__file__).resolve().parent.parent
+
+# Line number in response filenames (format: YYYYMMDD_HHMMSS_第N行.md)
+LINE_RE = re.compile(r'_第(\d+)行\.md\Z')
+
+
+@lru_cache(maxsize=1)
+def _round_names(max_rounds: int) -> Tuple[str, ...]:
+    """Round directory names 第1輪..第N輪, built once per max_rounds."""
+    return tuple(f"第{i}輪" for i in range(1, max_rounds + 1))
+
+# (epoch second, formatted timestamp) of the last _now_iso() call
+_timestamp_cache: List[Any] = [None, ""]
+
+
+def _now_iso() -> str:
+    """Current local time as an ISO-8601 string, formatted at most once per second."""
+    now_s = int(time.time())
+    if now_s != _timestamp_cache[0]:
+        _timestamp_cache[0] = now_s
+        _timestamp_cache[1] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now_s))
+    return _timestamp_cache[1]
+
+
+def _dumps_pretty(data: Dict[str, Any]) -> bytes:
+    """Serialize checkpoint data to indented UTF-8 JSON bytes for debugging."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _dumps_compact(data: Dict[str, Any]) -> bytes:
+    """Serialize a snapshot or journal record to compact UTF-8 JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Any:
+    """Deserialize JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
 class CheckpointManager:
     """
     Manages execution checkpoints for resumable CWE scanning workflows.
@@ -60,6 +138,10 @@ class CheckpointManager:
     
     CHECKPOINT_VERSION = "1.0"
     CHECKPOINT_FILENAME = "execution_checkpoint.json"
+    # Append-only journal of progress deltas, replayed on top of the snapshot
+    JOURNAL_FILENAME = "execution_checkpoint.log"
+    # Number of journal records after which a full snapshot is written
+    JOURNAL_SNAPSHOT_EVERY = 100
     
     def __init__(self, base_dir: str = None):
         """
@@ -71,15 +153,32 @@ class CheckpointManager:
         """
         if base_dir is None:
             # Default to checkpoints directory in workspace
-            workspace = Path(__file__).parent.parent
-            base_dir = workspace / "checkpoints"
+            base_dir = _WORKSPACE / "checkpoints"
         
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.checkpoint_path = self.base_dir / self.CHECKPOINT_FILENAME
+        self.journal_path = self.base_dir / self.JOURNAL_FILENAME
+        # String forms reused by every snapshot write and stat
+        self._checkpoint_path_str = str(self.checkpoint_path)
+        self._temp_path_str = str(self.checkpoint_path.with_suffix('.tmp'))
+        # Checkpoint fields other than "progress", which lives in self._progress
         self._current_checkpoint: Optional[Dict[str, Any]] = None
-        
-        logger.info(f"CheckpointManager 初始化，存檔路徑: {self.checkpoint_path}")
+        self._progress: Optional[Progress] = None
+        # Membership index over self._progress.completed_projects
+        self._completed_set: Set[str] = set()
+        # Parsed checkpoint cache keyed by (st_mtime_ns, st_size) of snapshot and journal
+        self._load_cache: Optional[Tuple[Tuple[int, ...], Optional[Dict[str, Any]]]] = None
+        
+        # Progress updates are appended to the journal; the snapshot is only
+        # rewritten every JOURNAL_SNAPSHOT_EVERY records or on status changes
+        self._dirty = False
+        self._journal = None
+        self._journal_records = 0
+        self._flush_lock = threading.RLock()
+        atexit.register(self._force_flush)
+        
+        logger.info(f"CheckpointManager 初始化，存檔路徑: {self._checkpoint_path_str}")
     
     def create_checkpoint(
         self,
@@ -98,32 +197,26 @@ class CheckpointManager:
         Returns:
             Created checkpoint dictionary
         """
-        now = datetime.now().isoformat()
+        now = _now_iso()
         
-        checkpoint = {
+        self._current_checkpoint = {
             "version": self.CHECKPOINT_VERSION,
             "created_at": now,
             "updated_at": now,
             "execution_mode": execution_mode,
             "settings": settings,
             "project_list": project_list,
-            "progress": {
-                "current_project_index": 0,
-                "current_project_name": project_list[0] if project_list else None,
-                "current_round": 1,
-                "current_line": 1,
-                "current_phase": 1,  # AS Mode: 1=Query, 2=Coding (Non-AS Mode 始終為 1)
-                "completed_projects": [],
-                "total_files_processed": 0  # 追蹤已處理的檔案數
-            },
             "status": "in_progress"
         }
-        
-        self._current_checkpoint = checkpoint
-        self._save_checkpoint()
+        self._progress = Progress(
+            current_project_name=project_list[0] if project_list else None
+        )
+        self._completed_set = set()
+        self._dirty = True
+        self._force_flush()
         
         logger.info(f"✅ 建立新的執行檢查點 (專案數: {len(project_list)}, 模式: {execution_mode})")
-        return checkpoint
+        return self._snapshot()
     
     def update_progress(
         self,
@@ -153,28 +246,91 @@ class CheckpointManager:
             logger.warning("無法更新進度: 沒有活動的檢查點")
             return
         
-        progress = self._current_checkpoint["progress"]
+        progress = self._progress
+        # Delta record for the journal; values are absolute so replay is idempotent
+        delta: Dict[str, Any] = {}
         
         if project_index is not None:
-            progress["current_project_index"] = project_index
+            delta["current_project_index"] = project_index
         if project_name is not None:
-            progress["current_project_name"] = project_name
+            delta["current_project_name"] = project_name
         if current_round is not None:
-            progress["current_round"] = current_round
+            delta["current_round"] = current_round
         if current_line is not None:
-            progress["current_line"] = current_line
+            delta["current_line"] = current_line
         if current_phase is not None:
-            progress["current_phase"] = current_phase
-        if completed_project is not None:
-            if completed_project not in progress["completed_projects"]:
-                progress["completed_projects"].append(completed_project)
+            delta["current_phase"] = current_phase
         if files_processed_increment is not None:
-            progress["total_files_processed"] = progress.get("total_files_processed", 0) + files_processed_increment
+            delta["total_files_processed"] = progress.total_files_processed + files_processed_increment
         if total_files_processed is not None:
-            progress["total_files_processed"] = total_files_processed
+            delta["total_files_processed"] = total_files_processed
+        for key, value in delta.items():
+            setattr(progress, key, value)
         
-        self._current_checkpoint["updated_at"] = datetime.now().isoformat()
-        self._save_checkpoint()
+        record: Dict[str, Any] = {"progress": delta}
+        if completed_project is not None:
+            if completed_project not in self._completed_set:
+                self._completed_set.add(completed_project)
+                progress.completed_projects.append(completed_project)
+            record["completed_project"] = completed_project
+        
+        # updated_at is stamped when the record or snapshot is written
+        self._append_journal(record)
+    
+    def _append_journal(self, record: Dict[str, Any]) -> None:
+        """
+        Append one delta record to the journal, writing a full snapshot once
+        JOURNAL_SNAPSHOT_EVERY records have accumulated.
+        """
+        with self._flush_lock:
+            self._dirty = True
+            try:
+                if self._journal is None:
+                    self._journal = open(self.journal_path, 'ab', buffering=0)
+                record["updated_at"] = self._current_checkpoint["updated_at"] = _now_iso()
+                self._journal.write(_dumps_compact(record) + b'\n')
+                self._journal_records += 1
+            except Exception as e:
+                logger.error(f"寫入檢查點日誌失敗，改為完整保存: {e}")
+                self._flush_locked()
+                return
+            
+            if self._journal_records >= self.JOURNAL_SNAPSHOT_EVERY:
+                self._flush_locked()
+    
+    def _force_flush(self) -> None:
+        """Write a full snapshot now if the journal holds unsnapshotted records."""
+        with self._flush_lock:
+            if self._dirty:
+                self._flush_locked()
+    
+    def _flush_locked(self) -> None:
+        """Write the snapshot and truncate the journal (caller holds _flush_lock)."""
+        if not self._save_checkpoint():
+            return
+        self._truncate_journal()
+        self._dirty = False
+    
+    def _truncate_journal(self) -> None:
+        """Empty the journal after its records have been folded into the snapshot."""
+        try:
+            if self._journal is not None:
+                self._journal.truncate(0)
+            elif self.journal_path.exists():
+                with open(self.journal_path, 'wb'):
+                    pass
+        except Exception as e:
+            logger.error(f"清空檢查點日誌失敗: {e}")
+        self._journal_records = 0
+    
+    def _close_journal(self) -> None:
+        """Close the journal file handle if it is open."""
+        if self._journal is not None:
+            try:
+                self._journal.close()
+            except Exception:
+                pass
+            self._journal = None
     
     def mark_completed(self) -> None:
         """Mark the current execution as completed successfully."""
@@ -182,8 +338,8 @@ class CheckpointManager:
             return
         
         self._current_checkpoint["status"] = "completed"
-        self._current_checkpoint["updated_at"] = datetime.now().isoformat()
-        self._save_checkpoint()
+        self._dirty = True
+        self._force_flush()
         logger.info("✅ 執行已完成，檢查點標記為 completed")
     
     def mark_interrupted(self) -> None:
@@ -192,28 +348,69 @@ class CheckpointManager:
             return
         
         self._current_checkpoint["status"] = "interrupted"
-        self._current_checkpoint["updated_at"] = datetime.now().isoformat()
-        self._save_checkpoint()
+        self._dirty = True
+        self._force_flush()
         logger.info("⚠️ 執行已中斷，檢查點標記為 interrupted")
     
-    def _save_checkpoint(self) -> None:
-        """Save current checkpoint to disk."""
+    def _save_checkpoint(self) -> bool:
+        """
+        Save current checkpoint snapshot to disk.
+        
+        Returns:
+            True if the snapshot was written
+        """
         if self._current_checkpoint is None:
-            return
+            return False
         
         try:
             # Write to temp file first, then rename (atomic operation)
-            temp_path = self.checkpoint_path.with_suffix('.tmp')
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(self._current_checkpoint, f, ensure_ascii=False, indent=2)
-            temp_path.rename(self.checkpoint_path)
+            self._current_checkpoint["updated_at"] = _now_iso()
+            data = _dumps_compact(self._snapshot())
+            with open(self._temp_path_str, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self._temp_path_str, self._checkpoint_path_str)
+            self._fsync_dir()
             
-            logger.debug(f"檢查點已保存: 專案 {self._current_checkpoint['progress']['current_project_index']}, "
-                        f"輪數 {self._current_checkpoint['progress']['current_round']}, "
-                        f"Phase {self._current_checkpoint['progress'].get('current_phase', 1)}, "
-                        f"行數 {self._current_checkpoint['progress']['current_line']}")
+            p = self._progress
+            logger.debug("檢查點已保存: 專案 %s, 輪數 %s, Phase %s, 行數 %s",
+                         p.current_project_index, p.current_round,
+                         p.current_phase, p.current_line)
+            return True
         except Exception as e:
             logger.error(f"保存檢查點失敗: {e}")
+            return False
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Full checkpoint dict as written to disk."""
+        return dict(self._current_checkpoint, progress=self._progress.to_dict())
+    
+    def dump_debug(self) -> str:
+        """
+        Pretty-printed JSON of the in-memory checkpoint, for inspection only.
+        
+        Returns:
+            Indented JSON string, or an empty string if no checkpoint is active
+        """
+        if self._current_checkpoint is None:
+            return ""
+        return _dumps_pretty(self._snapshot()).decode('utf-8')
+    
+    def _fsync_dir(self) -> None:
+        """Fsync the checkpoint directory so the rename itself is durable (POSIX only)."""
+        if os.name != 'posix':
+            return
+        try:
+            dir_fd = os.open(str(self.base_dir), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
     
     def load_checkpoint(self) -> Optional[Dict[str, Any]]:
         """
@@ -222,20 +419,29 @@ class CheckpointManager:
         Returns:
             Checkpoint dictionary if exists and valid, None otherwise
         """
+        # Persist pending progress first so the file reflects the latest state
+        self._force_flush()
+        
         if not self.checkpoint_path.exists():
             logger.debug("沒有找到現有的檢查點檔案")
             return None
         
         try:
-            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
-                checkpoint = json.load(f)
+            checkpoint = _loads(self.checkpoint_path.read_bytes())
             
             # Validate checkpoint version
             if checkpoint.get("version") != self.CHECKPOINT_VERSION:
                 logger.warning(f"檢查點版本不相容: {checkpoint.get('version')} != {self.CHECKPOINT_VERSION}")
                 return None
             
-            self._current_checkpoint = checkpoint
+            # The journal stays on disk until the next snapshot folds it in
+            replayed = self._replay_journal(checkpoint)
+            with self._flush_lock:
+                self._journal_records = replayed
+            
+            self._current_checkpoint = {k: v for k, v in checkpoint.items() if k != "progress"}
+            self._progress = Progress.from_dict(checkpoint.get("progress", {}))
+            self._completed_set = set(self._progress.completed_projects)
             logger.info(f"✅ 載入現有檢查點 (狀態: {checkpoint['status']})")
             return checkpoint
             
@@ -243,6 +449,74 @@ class CheckpointManager:
             logger.error(f"載入檢查點失敗: {e}")
             return None
     
+    def _replay_journal(self, checkpoint: Dict[str, Any]) -> int:
+        """
+        Apply journal records written after the snapshot to the checkpoint.
+        
+        Args:
+            checkpoint: Snapshot dictionary to update in place
+            
+        Returns:
+            Number of records replayed
+        """
+        if not self.journal_path.exists():
+            return 0
+        
+        progress = checkpoint["progress"]
+        completed = set(progress["completed_projects"])
+        replayed = 0
+        with open(self.journal_path, 'rb') as f:
+            for raw in f:
+                try:
+                    record = _loads(raw)
+                except ValueError:
+                    # A torn trailing record from a crash mid-write
+                    logger.warning("略過無法解析的檢查點日誌記錄")
+                    continue
+                
+                progress.update(record.get("progress", {}))
+                completed_project = record.get("completed_project")
+                if completed_project and completed_project not in completed:
+                    completed.add(completed_project)
+                    progress["completed_projects"].append(completed_project)
+                if "updated_at" in record:
+                    checkpoint["updated_at"] = record["updated_at"]
+                replayed += 1
+        
+        if replayed:
+            logger.debug(f"已重播 {replayed} 筆檢查點日誌記錄")
+        return replayed
+    
+    def _load_cached(self) -> Optional[Dict[str, Any]]:
+        """
+        Load checkpoint from disk, reusing the last parsed result while the
+        file's mtime and size are unchanged.
+        
+        Returns:
+            Checkpoint dictionary if exists and valid, None otherwise
+        """
+        self._force_flush()
+        
+        try:
+            stat = os.stat(self._checkpoint_path_str)
+        except OSError:
+            self._load_cache = None
+            return self.load_checkpoint()
+        
+        try:
+            journal_stat = self.journal_path.stat()
+            journal_key = (journal_stat.st_mtime_ns, journal_stat.st_size)
+        except OSError:
+            journal_key = (0, 0)
+        
+        key = (stat.st_mtime_ns, stat.st_size) + journal_key
+        if self._load_cache is not None and self._load_cache[0] == key:
+            return self._load_cache[1]
+        
+        checkpoint = self.load_checkpoint()
+        self._load_cache = (key, checkpoint)
+        return checkpoint
+    
     def has_resumable_checkpoint(self) -> bool:
         """
         Check if there's a resumable checkpoint (in_progress or interrupted).
@@ -250,7 +524,7 @@ class CheckpointManager:
         Returns:
             True if resumable checkpoint exists
         """
-        checkpoint = self.load_checkpoint()
+        checkpoint = self._load_cached()
         if checkpoint is None:
             return False
         
@@ -263,7 +537,7 @@ class CheckpointManager:
         Returns:
             Dictionary with resume information or None if no resumable checkpoint
         """
-        checkpoint = self.load_checkpoint()
+        checkpoint = self._load_cached()
         if checkpoint is None or checkpoint.get("status") == "completed":
             return None
         
@@ -297,10 +571,20 @@ class CheckpointManager:
     
     def clear_checkpoint(self) -> None:
         """Remove existing checkpoint file."""
+        with self._flush_lock:
+            self._close_journal()
+            self._journal_records = 0
+            self._dirty = False
+        
+        if self.journal_path.exists():
+            self.journal_path.unlink()
         if self.checkpoint_path.exists():
             self.checkpoint_path.unlink()
             logger.info("✅ 已清除現有檢查點")
         self._current_checkpoint = None
+        self._progress = None
+        self._completed_set = set()
+        self._load_cache = None
     
     def detect_progress_from_output(
         self,
@@ -325,18 +609,16 @@ class CheckpointManager:
             Dictionary with detected progress information
         """
         if output_base_dir is None:
-            workspace = Path(__file__).parent.parent
-            output_base_dir = workspace / "output" / "ExecutionResult" / "Success"
-        else:
-            output_base_dir = Path(output_base_dir)
+            output_base_dir = _WORKSPACE / "output" / "ExecutionResult" / "Success"
         
         if projects_dir is None:
-            workspace = Path(__file__).parent.parent
-            projects_dir = workspace / "projects"
-        else:
-            projects_dir = Path(projects_dir)
+            projects_dir = _WORKSPACE / "projects"
+        
+        # Plain string paths: os.path joins are cheaper than pathlib operators
+        output_base_str = os.fspath(output_base_dir)
+        projects_dir_str = os.fspath(projects_dir)
         
-        if not output_base_dir.exists():
+        if not os.path.exists(output_base_str):
             return {
                 "completed_projects": [],
                 "partially_completed": None,
@@ -352,20 +634,20 @@ class CheckpointManager:
         resume_line = 1
         
         for idx, project_name in enumerate(project_list):
-            project_dir = output_base_dir / project_name
+            project_dir_str = os.path.join(output_base_str, project_name)
             
-            if not project_dir.exists():
+            if not os.path.isdir(project_dir_str):
                 # This project hasn't started
                 resume_project_index = idx
                 break
             
             # Get expected line count from prompt.txt
-            prompt_file = projects_dir / project_name / "prompt.txt"
+            prompt_file = os.path.join(projects_dir_str, project_name, "prompt.txt")
             expected_lines = 0
-            if prompt_file.exists():
+            if os.path.isfile(prompt_file):
                 try:
                     with open(prompt_file, 'r', encoding='utf-8') as f:
-                        expected_lines = len([line for line in f if line.strip()])
+                        expected_lines = sum(1 for line in f if line.strip())
                 except Exception:
                     pass
             
@@ -375,23 +657,20 @@ class CheckpointManager:
             incomplete_round = None
             incomplete_line = None
             
-            for round_num in range(1, max_rounds + 1):
-                round_dir = project_dir / f"第{round_num}輪"
-                if round_dir.exists():
-                    # Count files in round directory
-                    files = list(round_dir.glob("*.md"))
-                    file_count = len(files)
+            for round_num, round_name in enumerate(_round_names(max_rounds), start=1):
+                round_dir = os.path.join(project_dir_str, round_name)
+                if os.path.isdir(round_dir):
+                    # Count files in round directory and extract max line number
+                    # from filenames (format: YYYYMMDD_HHMMSS_第N行.md)
+                    with os.scandir(round_dir) as it:
+                        names = [entry.name for entry in it if entry.name.endswith(".md")]
+                    file_count = len(names)
+                    max_line = max(
+                        (int(m.group(1)) for m in map(LINE_RE.search, names) if m),
+                        default=0
+                    )
                     
-                    if files:
-                        # Extract max line number from filenames (format: YYYYMMDD_HHMMSS_第N行.md)
-                        max_line = 0
-                        for f in files:
-                            try:
-                                line_part = f.stem.split("_第")[1].replace("行", "")
-                                max_line = max(max_line, int(line_part))
-                            except (IndexError, ValueError):
-                                pass
-                        
+                    if file_count:
                         # Check if this round is complete
                         # A round is complete if we have all expected lines
                         if expected_lines > 0 and file_count >= expected_lines:
@@ -486,6 +765,10 @@ class CheckpointManager:
         return "\n".join(lines)
 
 
+# Shared CheckpointManager instances keyed by base_dir ("" for the default)
+_MANAGER_CACHE: Dict[str, CheckpointManager] = {}
+
+
 def get_checkpoint_manager(base_dir: str = None) -> CheckpointManager:
     """
     Get a singleton CheckpointManager instance.
@@ -494,9 +777,19 @@ def get_checkpoint_manager(base_dir: str = None) -> CheckpointManager:
         base_dir: Base directory for checkpoint storage
         
     Returns:
-        CheckpointManager instance
+        CheckpointManager instance shared by all callers using the same base_dir
     """
-    return CheckpointManager(base_dir)
+    key = str(base_dir) if base_dir else ""
+    manager = _MANAGER_CACHE.get(key)
+    if manager is None:
+        manager = CheckpointManager(base_dir)
+        _MANAGER_CACHE[key] = manager
+    return manager
+
+
+def reset_checkpoint_manager() -> None:
+    """Drop cached CheckpointManager instances (for tests)."""
+    _MANAGER_CACHE.clear()
 
 
 # Convenience functions for integration
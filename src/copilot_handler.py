@@ -5,44 +5,152 @@ Hybrid UI Automation Script - Copilot Chat 操作模組
 完全使用鍵盤操作，無需圖像識別
 """
 
+import importlib
+import json
+import os
 import pyautogui
 import pyperclip
+import re
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
 import sys
 
-# 導入配置和日誌
-sys.path.append(str(Path(__file__).parent.parent))
 try:
-    from config.config import config
+    import orjson
 except ImportError:
-    try:
-        from config import config
-    except ImportError:
-        import sys
-        sys.path.append(str(Path(__file__).parent.parent / "config"))
-        import config
-try:
-    from src.logger import get_logger
-    from src.image_recognition import image_recognition
-    from src.copilot_rate_limit_handler import (
-        is_response_incomplete,
-        wait_and_retry
-    )
-    from src.query_statistics import initialize_non_as_mode_statistics
-except ImportError:
-    from logger import get_logger
-    from image_recognition import image_recognition
-    from copilot_rate_limit_handler import (
-        is_response_incomplete,
-        wait_and_retry
-    )
-    from query_statistics import initialize_non_as_mode_statistics
+    orjson = None
+
+# 導入配置和日誌（專案根目錄只加入 sys.path 一次）
+_PROJECT_ROOT = str(Path(__file__).parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+
+def _resolve_import(name: str, packages=('src.', '')):
+    """依序嘗試以套件前綴匯入模組（src.xxx 或 xxx），返回第一個成功匯入的模組"""
+    for prefix in packages:
+        try:
+            return importlib.import_module(f"{prefix}{name}")
+        except ImportError:
+            continue
+    raise ImportError(f"無法匯入模組: {name}")
+
+config = _resolve_import('config', packages=('config.', '')).config
+get_logger = _resolve_import('logger').get_logger
+image_recognition = _resolve_import('image_recognition').image_recognition
+_rate_limit_handler = _resolve_import('copilot_rate_limit_handler')
+is_response_incomplete = _rate_limit_handler.is_response_incomplete
+wait_and_retry = _rate_limit_handler.wait_and_retry
+initialize_non_as_mode_statistics = _resolve_import('query_statistics').initialize_non_as_mode_statistics
+fast_input = _resolve_import('fast_input')
+win_ui = _resolve_import('win_ui')
+cursor_controller = _resolve_import('cursor_controller').cursor_controller
+
+# prompt.txt 單行格式: filepath|function1()、function2()（只取第一個函數，其餘放入第 3 組）
+_PROMPT_RE = re.compile(r'\s*([^|]*?)\s*\|\s*([^|、]*?)\s*(、[^|]*)?')
+
+# 典型的 Copilot 回應特徵（「建議」重複列出，權重為 2）
+COPILOT_INDICATORS = (
+    '分析', '建議', '程式', '代碼', 'code', 'function', 'class',
+    'import', 'def', 'var', 'let', 'const', '結構', '改進',
+    '範例', 'example', '可以', '建議', '應該', '可能', '需要',
+    '讓我', '我會', '以下', '首先', '接下來', '最後',
+    '```', 'python', 'javascript', 'typescript', 'html', 'css'
+)
+_INDICATOR_WEIGHTS = {indicator: COPILOT_INDICATORS.count(indicator) for indicator in COPILOT_INDICATORS}
+# 前瞻比對允許重疊，一次掃描即可找出所有特徵
+_INDICATOR_RE = re.compile(
+    '(?=(' + '|'.join(map(re.escape, _INDICATOR_WEIGHTS)) + '))', re.IGNORECASE
+)
+
+class _NoPauseInput:
+    """
+    pyautogui 鍵盤/滑鼠操作的薄包裝
+    
+    略過 pyautogui 全域 PAUSE（每次呼叫後隱含的 0.1 秒暫停），
+    需要等待 UI 反應之處由呼叫端明確 _sleep；FAILSAFE 檢查仍然有效。
+    Windows 上按鍵改用 fast_input（SendInput），滑鼠點擊仍使用 pyautogui
+    """
+    
+    if sys.platform == 'win32':
+        @staticmethod
+        def hotkey(*keys):
+            pyautogui.failSafeCheck()
+            fast_input.hotkey(*keys)
+        
+        @staticmethod
+        def press(key):
+            pyautogui.failSafeCheck()
+            fast_input.press(key)
+    else:
+        @staticmethod
+        def hotkey(*keys):
+            pyautogui.hotkey(*keys, _pause=False)
+        
+        @staticmethod
+        def press(key):
+            pyautogui.press(key, _pause=False)
+    
+    @staticmethod
+    def send_sequence(events):
+        fast_input.send_sequence(events)
+    
+    @staticmethod
+    def click(x, y):
+        pyautogui.click(x, y, _pause=False)
+
+_kb = _NoPauseInput()
+
+# 全選 + 貼上（一次送出的按鍵序列；Enter 待確認貼上完成後才另外送出）
+_SELECT_PASTE = (
+    ('down', 'ctrl'), ('down', 'a'), ('up', 'a'), ('up', 'ctrl'),
+    ('down', 'ctrl'), ('down', 'v'), ('up', 'v'), ('up', 'ctrl'),
+)
+# 全選 + 刪除
+_SELECT_DELETE = (
+    ('down', 'ctrl'), ('down', 'a'), ('up', 'a'), ('up', 'ctrl'),
+    ('down', 'delete'), ('up', 'delete'),
+)
+
+# 回應記錄檔的標頭分隔線與回應段落標記（寫入與讀取上一輪回應共用）
+_RESULT_SEPARATOR = "=" * 50 + "\n\n"
+_RESPONSE_MARKER = "## Copilot 回應\n\n"
+
+# 回應記錄檔的固定內容（預先編碼為 UTF-8）
+_RESULT_TITLE = "# Copilot 自動補全記錄\n".encode("utf-8")
+_RESULT_STATUS_SUCCESS = ("# 執行狀態: 成功\n" + _RESULT_SEPARATOR).encode("utf-8")
+_RESULT_STATUS_FAIL = ("# 執行狀態: 失敗\n" + _RESULT_SEPARATOR).encode("utf-8")
+_RESULT_ROUND_PROMPT_HEADING = "## 本輪原始提示詞\n\n".encode("utf-8")
+_RESULT_CHAINED_PROMPT_HEADING = "## 實際發送內容（包含前面回應串接）\n\n".encode("utf-8")
+_RESULT_SENT_PROMPT_HEADING = "## 實際發送內容\n\n".encode("utf-8")
+_RESULT_RESPONSE_HEADING = _RESPONSE_MARKER.encode("utf-8")
+_BLANK_LINE = b"\n\n"
+
+
+@lru_cache(maxsize=8)
+def _project_header(project_name: str, project_path: str) -> bytes:
+    """回應記錄檔中專案固定不變的標頭行（同一專案只組合、編碼一次）"""
+    return f"# 專案: {project_name}\n# 專案路徑: {project_path}\n".encode("utf-8")
+
+
+# 讀回先前輪次回應的資料夾（固定不變，模組載入時計算一次）
+_SUCCESS_RESULT_ROOT = Path(_PROJECT_ROOT) / "ExecutionResult" / "Success"
+
+
+@lru_cache(maxsize=32)
+def _project_name(project_path: str) -> str:
+    """由專案路徑取得專案名稱（字串操作，不建立 Path 物件）"""
+    return os.path.basename(str(project_path).rstrip("/\\"))
+
 
 class CopilotHandler:
     """Copilot Chat 操作處理器"""
     COMPLETION_INSTRUCTION = ''
+    CODING_INSTRUCTION_TEMPLATE = Path(__file__).parent.parent / "assets" / "prompt-template" / "coding_instruction.txt"
+    _template_cache = {}  # 模板路徑 -> 模板內容（模板在執行期間不變，只讀取一次）
     
     def __init__(self, error_handler=None, interaction_settings=None, cwe_scan_manager=None, cwe_scan_settings=None, checkpoint_manager=None):
         """
@@ -65,9 +173,39 @@ class CopilotHandler:
         self.cwe_scan_manager = cwe_scan_manager  # 添加 CWE 掃描管理器
         self.cwe_scan_settings = cwe_scan_settings  # 添加 CWE 掃描設定
         self.checkpoint_manager = checkpoint_manager  # 檢查點管理器
-        self._clipboard_lock = False  # 剪貼簿鎖定標記
+        self._clipboard_lock = threading.Lock()  # 序列化剪貼簿複製與驗證
+        self._img_loc_cache = {}  # 圖像路徑 -> 上次找到的位置 (left, top, width, height)
+        self._panel_roi = None  # Copilot 面板搜尋區域 (left, top, width, height)，首次找到圖像後建立
+        self._ready_copy_location = None  # 智能等待確認完成時找到的複製按鈕位置（交給 copy_response 使用一次）
+        self.preserve_user_clipboard = False  # 智能等待複製回應時是否保存/恢復使用者剪貼簿
+        self._prompt_cache = {}  # 提示詞檔案路徑 -> 內容（執行期間提示詞檔案不變）
+        self._prompt_parse_cache = {}  # 提示詞行 -> (filepath, first_function) 解析結果
+        self._applied_template_cache = {}  # (filepath, function_name) -> 套用 coding_instruction 模板後的 prompt
+        self._created_dirs = set()  # 已建立的輸出資料夾（避免每行重複 mkdir）
+        self._interaction_settings_cache = None  # (設定檔 mtime, 設定字典)，檔案未變更時不重新解析
+        self._timestamp_cache = (None, None, None)  # (秒數, 檔名時間戳, 顯示用時間)，同一秒內重複使用
+        self._response_file_cache = {}  # 專案名稱 -> (資料夾 mtime, [(檔案 mtime, 檔名), ...])
         self.query_stats = None  # Query 統計器（Non-AS Mode 用）
         
+        # 背景 CWE 掃描執行緒池：掃描與下一行的 prompt 送出重疊執行
+        # 使用單一 worker，確保函式級別 CSV 依行號順序寫入（第 1 行覆寫、其餘追加）
+        self._scan_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="CopilotScan")
+        self._pending_scan_futures: List[Tuple[int, Future]] = []
+        # 各目標檔案最後提交的掃描（單一 worker 依序執行，等待最後一個即代表該檔案的掃描皆已完成）
+        self._scan_future_by_file: Dict[str, Future] = {}
+        
+        # 背景儲存執行緒池：回應檔案寫入與下一行的 prompt 送出重疊執行（單一 worker 保持寫入順序）
+        self._save_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="CopilotSave")
+        self._pending_save_futures: List[Tuple[int, Future]] = []
+        self._pending_progress_future: Optional[Future] = None  # 最後提交到儲存執行緒的檢查點進度更新
+        
+        # 預先解碼熱路徑使用的模板圖像
+        self.image_recognition.preload_templates((
+            config.INPUT_BAR_IMAGE, config.COPY_BUTTON_IMAGE,
+            config.UNDO_BUTTON_IMAGE, config.KEEP_BUTTON_IMAGE,
+            config.STOP_BUTTON_IMAGE, config.SEND_BUTTON_IMAGE
+        ))
+        
         self.logger.info("Copilot Chat 處理器初始化完成")
         if cwe_scan_manager and cwe_scan_settings and cwe_scan_settings.get("enabled"):
             self.logger.info(f"✅ CWE 掃描已啟用 (類型: CWE-{cwe_scan_settings.get('cwe_type')})")
@@ -84,14 +222,16 @@ class CopilotHandler:
             
             # 使用 Ctrl+Shift+Subtract 和 Ctrl+Shift+Add 聚焦輸入框
             self.logger.info("按下 Ctrl+Shift+Subtract 和 Ctrl+Shift+Add...")
-            pyautogui.hotkey('ctrl', 'shift', 'subtract')
-            time.sleep(0.2)
-            pyautogui.hotkey('ctrl', 'shift', 'add')
-            time.sleep(config.VSCODE_COMMAND_DELAY)
+            _kb.hotkey('ctrl', 'shift', 'subtract')
+            if not self._sleep(0.2):
+                self.logger.warning("收到中斷請求，停止聚焦輸入框")
+                return False
+            _kb.hotkey('ctrl', 'shift', 'add')
             
-            # 等待面板開啟和聚焦
+            # 等待面板開啟和聚焦：偵測到輸入框即返回，最多等待原本的固定時間
             self.logger.info("等待 Chat 面板開啟和聚焦...")
-            time.sleep(3)  # 等待 3 秒確保聚焦
+            if not self._wait_for_image(config.INPUT_BAR_IMAGE, timeout=config.VSCODE_COMMAND_DELAY + 3):
+                self.logger.warning("未偵測到輸入框 (input_bar.png)，繼續執行")
             
             self.is_chat_open = True
             self.logger.copilot_interaction("聚焦輸入框", "SUCCESS")
@@ -101,12 +241,129 @@ class CopilotHandler:
             self.logger.copilot_interaction("聚焦輸入框", "ERROR", str(e))
             return False
     
+    def _stop_requested(self) -> bool:
+        """是否已收到緊急停止請求"""
+        return bool(self.error_handler and self.error_handler.emergency_stop_requested)
+    
+    def _sleep(self, seconds: float) -> bool:
+        """
+        分段睡眠（每 0.1 秒檢查一次緊急停止請求）
+        
+        Args:
+            seconds: 睡眠時間（秒）
+            
+        Returns:
+            bool: 完整睡完返回 True，收到中斷請求提前返回 False
+        """
+        end = time.monotonic() + seconds
+        while True:
+            if self._stop_requested():
+                return False
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(0.1, remaining))
+    
+    def _wait_for_image(self, path, timeout: float = 5.0, poll: float = 0.1) -> Optional[Tuple[int, int, int, int]]:
+        """
+        輪詢螢幕直到指定圖像出現或超時（取代固定的 time.sleep 等待）
+        
+        Args:
+            path: 模板圖像路徑
+            timeout: 最長等待時間（秒）
+            poll: 輪詢間隔（秒），最小 0.05 秒避免忙等
+            
+        Returns:
+            Optional[Tuple[int, int, int, int]]: 圖像位置，超時則返回 None
+        """
+        path = str(path)
+        poll = max(poll, 0.05)
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            # 輪詢時主要只搜尋面板區域，每 5 次才擴大到全螢幕一次
+            location = self._find_in_panel(path, escalate=attempt % 5 == 0)
+            if location:
+                return location
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._sleep(min(poll, remaining)):
+                return None
+    
+    def _update_panel_roi(self, location) -> None:
+        """以找到的圖像位置擴充 Copilot 面板搜尋區域（寬 3 倍、高 2 倍，限制在螢幕範圍內）"""
+        left, top, width, height = location
+        screen_width, screen_height = pyautogui.size()
+        x1 = max(left - width, 0)
+        y1 = max(top - height // 2, 0)
+        x2 = min(left + width * 2, screen_width)
+        y2 = min(top + height + height // 2, screen_height)
+        if self._panel_roi:
+            # 與既有區域取聯集，避免不同按鈕互相覆蓋區域
+            roi_left, roi_top, roi_width, roi_height = self._panel_roi
+            x1, y1 = min(x1, roi_left), min(y1, roi_top)
+            x2, y2 = max(x2, roi_left + roi_width), max(y2, roi_top + roi_height)
+        self._panel_roi = (x1, y1, x2 - x1, y2 - y1)
+    
+    def _find_in_panel(self, path, escalate: bool = True) -> Optional[Tuple[int, int, int, int]]:
+        """
+        在 Copilot 面板區域內搜尋圖像，找不到時擴大到全螢幕並更新面板區域
+        
+        Args:
+            path: 模板圖像路徑
+            escalate: 面板區域內找不到時是否改做全螢幕搜尋
+            
+        Returns:
+            Optional[Tuple[int, int, int, int]]: 圖像位置，找不到則返回 None
+        """
+        if self._panel_roi:
+            location = self.image_recognition.find_image_on_screen(
+                path, confidence=config.IMAGE_CONFIDENCE, region=self._panel_roi
+            )
+            if location or not escalate:
+                return location
+        
+        location = self.image_recognition.find_image_on_screen(path, confidence=config.IMAGE_CONFIDENCE)
+        if location:
+            self._update_panel_roi(location)
+        return location
+    
+    def _get_image_location(self, path) -> Optional[Tuple[int, int, int, int]]:
+        """
+        取得圖像位置，優先在上次找到的位置附近驗證，失敗才做全螢幕搜尋
+        
+        Args:
+            path: 模板圖像路徑
+            
+        Returns:
+            Optional[Tuple[int, int, int, int]]: 圖像位置，找不到則返回 None
+        """
+        path = str(path)
+        cached = self._img_loc_cache.get(path)
+        if cached:
+            # 只在快取位置周圍的小區域比對，成本遠低於全螢幕比對
+            pad = 4
+            region = (max(cached[0] - pad, 0), max(cached[1] - pad, 0),
+                      cached[2] + pad * 2, cached[3] + pad * 2)
+            location = self.image_recognition.find_image_on_screen(
+                path, confidence=config.IMAGE_CONFIDENCE, region=region
+            )
+            if location:
+                return location
+            del self._img_loc_cache[path]
+        
+        location = self._find_in_panel(path)
+        if location:
+            self._img_loc_cache[path] = tuple(location)
+        return location
+    
     def _ensure_completion_instruction(self, prompt: str) -> str:
         """確保提示詞包含完成回報指示"""
         instruction = self.COMPLETION_INSTRUCTION
         if not prompt:
             return instruction
-        if instruction in prompt:
+        # 指示一律附加在結尾，只需檢查後綴（空指示時 endswith 恆為 True）
+        if prompt.endswith(instruction):
             return prompt
         if prompt.endswith("\n"):
             return f"{prompt}{instruction}"
@@ -128,44 +385,125 @@ class CopilotHandler:
             prompt_to_send = self._ensure_completion_instruction(prompt_content)
             self.last_sent_prompt = prompt_to_send
 
-            self.logger.info(f"發送第 {line_number}/{total_lines} 行提示詞...")
+            self.logger.info("發送第 %s/%s 行提示詞...", line_number, total_lines)
+            
+            # 截斷過長的內容用於日誌顯示（%.100s 只在實際輸出時截斷）
+            self.logger.debug("內容預覽: %.100s", prompt_to_send)
+            self.logger.debug("完整內容長度: %s 字元", len(prompt_to_send))
             
-            # 截斷過長的內容用於日誌顯示
-            display_content = prompt_to_send[:100] + "..." if len(prompt_to_send) > 100 else prompt_to_send
-            self.logger.debug(f"內容預覽: {display_content}")
-            self.logger.debug(f"完整內容長度: {len(prompt_to_send)} 字元")
+            # 安全複製、重新聚焦輸入框後送出
+            return self._send(
+                prompt_to_send, f"發送第 {line_number} 行",
+                refocus=True, safe_copy_context=f"第 {line_number} 行完整提示詞", post_wait=1.5
+            )
             
-            # 使用安全的剪貼簿複製
-            if not self._safe_clipboard_copy(prompt_to_send, f"第 {line_number} 行完整提示詞"):
-                self.logger.error(f"無法複製第 {line_number} 行完整提示詞到剪貼簿")
+        except Exception as e:
+            self.logger.copilot_interaction(f"發送第 {line_number} 行", "ERROR", str(e))
+            return False
+    
+    def _send(self, content: str, action: str, refocus: bool = False, safe_copy_context: str = None,
+              copy_wait: float = 0.3, post_wait: float = 1.0) -> bool:
+        """
+        共用的送出流程：複製到剪貼簿 →（重新聚焦）→ 全選、貼上 → 確認貼上完成 → Enter → 等待開始回應
+        （啟用 USE_UIA_INPUT 時先以 UI Automation 直接設定輸入框內容，失敗才走剪貼簿流程）
+        
+        Args:
+            content: 要送出的內容
+            action: copilot_interaction 日誌使用的動作名稱
+            refocus: 是否先重新聚焦輸入框
+            safe_copy_context: 提供時使用 _safe_clipboard_copy（含驗證），值為日誌上下文
+            copy_wait: 直接複製（不驗證）後的等待時間（秒）
+            post_wait: 送出後等待 stop 按鈕出現的最長時間（秒）
+            
+        Returns:
+            bool: 發送是否成功
+        """
+        # 新的回應會產生新的複製按鈕，先前定位的位置作廢
+        self._ready_copy_location = None
+        try:
+            if config.USE_UIA_INPUT and win_ui.is_available():
+                if refocus:
+                    self._focus_input_bar_with_fallback()
+                    refocus = False
+                if win_ui.set_input_text(content, config.UIA_INPUT_CONTROL_KEYWORDS):
+                    _kb.press('enter')
+                    self._wait_for_image(config.STOP_BUTTON_IMAGE, timeout=post_wait)
+                    self.logger.copilot_interaction(action, "SUCCESS", f"長度: {len(content)} 字元 (UI Automation)")
+                    return True
+                self.logger.debug("UI Automation 無法設定輸入框內容，改用剪貼簿貼上")
+            
+            if safe_copy_context is not None:
+                if not self._safe_clipboard_copy(content, safe_copy_context):
+                    self.logger.error("無法複製%s到剪貼簿", safe_copy_context)
+                    return False
+            else:
+                pyperclip.copy(content)
+                if not self._sleep(copy_wait):
+                    self.logger.warning("收到中斷請求，停止%s", action)
+                    return False
+            
+            if refocus:
+                self._focus_input_bar_with_fallback()
+            
+            # 全選並貼上（單一按鍵序列），確認輸入框內容已更新後才按 Enter 送出
+            _kb.send_sequence(_SELECT_PASTE)
+            if not self._wait_for_pasted(content):
+                self.logger.error("貼上後輸入框內容與%s不符，不送出", action)
                 return False
+            _kb.press('enter')
+            # 偵測到 stop 按鈕（開始回應）即返回
+            self._wait_for_image(config.STOP_BUTTON_IMAGE, timeout=post_wait)
             
-            # 確保聚焦到輸入框（使用圖像識別點擊 input_bar.png）
-            if not self._refocus_input_bar():
-                self.logger.warning("無法透過圖像識別聚焦輸入框，嘗試備用方案...")
-                # 備用方案：使用 Ctrl+Shift+Subtract 和 Ctrl+Shift+Add 組合
-                pyautogui.hotkey('ctrl', 'shift', 'subtract')
-                time.sleep(0.2)
-                pyautogui.hotkey('ctrl', 'shift', 'add')
-                time.sleep(0.5)
-            
-            # 清空現有內容並貼上提示詞
-            pyautogui.hotkey('ctrl', 'a')  # 全選
-            time.sleep(0.2)
-            pyautogui.hotkey('ctrl', 'v')  # 貼上
-            time.sleep(0.5)
-            
-            # 發送提示詞
-            pyautogui.press('enter')
-            time.sleep(1)
-            
-            self.logger.copilot_interaction(f"發送第 {line_number} 行", "SUCCESS", f"長度: {len(prompt_to_send)} 字元")
+            self.logger.copilot_interaction(action, "SUCCESS", f"長度: {len(content)} 字元")
             return True
             
         except Exception as e:
-            self.logger.copilot_interaction(f"發送第 {line_number} 行", "ERROR", str(e))
+            self.logger.copilot_interaction(action, "ERROR", str(e))
             return False
     
+    def _wait_for_pasted(self, content: str) -> bool:
+        """
+        等待貼上的內容出現在輸入框
+        啟用 USE_UIA_INPUT 且可讀回聊天輸入框時，輪詢至內容相符（最多 COPILOT_PASTE_SETTLE_DELAY 秒）；
+        否則固定等待 COPILOT_PASTE_SETTLE_DELAY 秒讓編輯器處理貼上
+        
+        Args:
+            content: 預期的輸入框內容
+            
+        Returns:
+            bool: 內容已確認相符（或無法讀回而已等待完畢）返回 True；內容不符或收到中斷請求返回 False
+        """
+        if not (config.USE_UIA_INPUT and win_ui.is_available()):
+            return self._sleep(config.COPILOT_PASTE_SETTLE_DELAY)
+        
+        # 編輯器可能轉換換行符號或去除頭尾空白，比較前先正規化
+        expected = content.replace('\r\n', '\n').strip()
+        deadline = time.monotonic() + config.COPILOT_PASTE_SETTLE_DELAY
+        while True:
+            current = win_ui.get_input_text(config.UIA_INPUT_CONTROL_KEYWORDS)
+            if current is None:
+                # 無法讀回輸入框內容，退回固定等待
+                return self._sleep(max(0.0, deadline - time.monotonic()))
+            if current.replace('\r\n', '\n').strip() == expected:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._sleep(min(0.05, remaining)):
+                return False
+    
+    def _focus_input_bar_with_fallback(self):
+        """聚焦輸入框（圖像識別點擊 input_bar.png，失敗時使用快捷鍵備用方案）"""
+        if not self._refocus_input_bar():
+            # 點擊後的等待被中斷請求打斷時也會返回 False，此時不再送出備用快捷鍵
+            if self._stop_requested():
+                return
+            self.logger.warning("無法透過圖像識別聚焦輸入框，嘗試備用方案...")
+            # 備用方案：使用 Ctrl+Shift+Subtract 和 Ctrl+Shift+Add 組合
+            _kb.hotkey('ctrl', 'shift', 'subtract')
+            if not self._sleep(0.2):
+                return
+            _kb.hotkey('ctrl', 'shift', 'add')
+            self._wait_for_image(config.INPUT_BAR_IMAGE, timeout=0.5)
+    
     def _safe_clipboard_copy(self, content: str, context: str = "") -> bool:
         """
         安全的剪貼簿複製操作，避免併發衝突
@@ -178,27 +516,15 @@ class CopilotHandler:
             bool: 複製是否成功
         """
         max_attempts = 3
-        wait_time = 0.8
         
         for attempt in range(max_attempts):
             try:
-                # 避免併發操作
-                while self._clipboard_lock:
-                    self.logger.debug("等待剪貼簿解鎖...")
-                    time.sleep(0.2)
-                
-                self._clipboard_lock = True
-                
-                # 執行複製
-                pyperclip.copy(content)
-                time.sleep(wait_time)
+                # 執行複製並輪詢驗證結果（鎖定避免併發操作）
+                with self._clipboard_lock:
+                    pyperclip.copy(content)
+                    copied = self._clipboard_matches(content)
                 
-                # 驗證複製結果
-                copied_content = pyperclip.paste()
-                
-                self._clipboard_lock = False
-                
-                if copied_content == content:
+                if copied:
                     self.logger.debug(f"剪貼簿複製成功 - {context} (第 {attempt + 1} 次)")
                     return True
                 else:
@@ -208,7 +534,6 @@ class CopilotHandler:
                         continue
                         
             except Exception as e:
-                self._clipboard_lock = False
                 self.logger.warning(f"剪貼簿操作異常 - {context}: {e}")
                 if attempt < max_attempts - 1:
                     time.sleep(1)
@@ -217,6 +542,28 @@ class CopilotHandler:
         self.logger.error(f"剪貼簿複製失敗 - {context}")
         return False
     
+    def _clipboard_matches(self, content: str, timeout: float = 0.3, poll: float = 0.02) -> bool:
+        """
+        輪詢剪貼簿直到內容與預期相符（只比對長度與頭尾片段）
+        
+        Args:
+            content: 預期的剪貼簿內容
+            timeout: 最長等待時間（秒）
+            poll: 輪詢間隔（秒）
+            
+        Returns:
+            bool: 剪貼簿內容是否相符
+        """
+        head, tail = content[:64], content[-64:]
+        deadline = time.monotonic() + timeout
+        while True:
+            got = pyperclip.paste()
+            if len(got) == len(content) and got[:64] == head and got[-64:] == tail:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+    
     def select_latest_model(self) -> bool:
         """
         選擇最新使用的 AI 模型 (使用 Ctrl+/ + Down + Enter)
@@ -228,16 +575,22 @@ class CopilotHandler:
             self.logger.info("選擇最新使用的 AI 模型...")
             
             # Ctrl+/ 開啟模型選擇
-            pyautogui.hotkey('ctrl', '/')
-            time.sleep(0.5)
+            _kb.hotkey('ctrl', '/')
+            if not self._sleep(0.5):
+                self.logger.warning("收到中斷請求，停止選擇模型")
+                return False
             
             # Down 選擇下一個選項（最新使用的模型）
-            pyautogui.press('down')
-            time.sleep(0.3)
+            _kb.press('down')
+            if not self._sleep(0.3):
+                self.logger.warning("收到中斷請求，停止選擇模型")
+                return False
             
             # Enter 確認選擇
-            pyautogui.press('enter')
-            time.sleep(0.5)
+            _kb.press('enter')
+            if not self._sleep(0.5):
+                self.logger.warning("收到中斷請求，停止選擇模型")
+                return False
             
             self.logger.copilot_interaction("選擇模型", "SUCCESS")
             return True
@@ -256,9 +609,12 @@ class CopilotHandler:
         try:
             self.logger.info("清除 AI 記憶（開啟新對話）...")
             
-            # Ctrl+N 開啟新對話
-            pyautogui.hotkey('ctrl', 'n')
-            time.sleep(2)  # 等待新對話開啟
+            # Ctrl+N 開啟新對話（版面可能改變，清除位置快取）
+            _kb.hotkey('ctrl', 'n')
+            self._img_loc_cache.clear()
+            if not self._sleep(2):  # 等待新對話開啟
+                self.logger.warning("收到中斷請求，停止清除記憶")
+                return False
             
             self.logger.copilot_interaction("清除記憶", "SUCCESS")
             return True
@@ -287,11 +643,8 @@ class CopilotHandler:
             
             self.logger.info(f"尋找並點擊 {button_name} 按鈕...")
             
-            # 使用圖像識別找到按鈕
-            button_location = self.image_recognition.find_image_on_screen(
-                button_path,
-                confidence=config.IMAGE_CONFIDENCE
-            )
+            # 使用圖像識別找到按鈕（優先驗證快取位置）
+            button_location = self._get_image_location(button_path)
             
             if button_location:
                 # 計算按鈕中心位置
@@ -301,8 +654,10 @@ class CopilotHandler:
                 self.logger.info(f"找到 {button_name} 按鈕，位置: ({button_x}, {button_y})")
                 
                 # 點擊按鈕
-                pyautogui.click(button_x, button_y)
-                time.sleep(1)
+                _kb.click(button_x, button_y)
+                if not self._sleep(1):
+                    self.logger.warning("收到中斷請求，停止點擊 %s 按鈕", button_name)
+                    return False
                 
                 self.logger.copilot_interaction(f"點擊 {button_name} 按鈕", "SUCCESS")
                 return True
@@ -324,11 +679,8 @@ class CopilotHandler:
             bool: 重新聚焦是否成功
         """
         try:
-            # 使用圖像識別找到輸入框
-            input_bar_location = self.image_recognition.find_image_on_screen(
-                str(config.INPUT_BAR_IMAGE),
-                confidence=config.IMAGE_CONFIDENCE
-            )
+            # 使用圖像識別找到輸入框（優先驗證快取位置）
+            input_bar_location = self._get_image_location(config.INPUT_BAR_IMAGE)
             
             if input_bar_location:
                 # 計算輸入框中心位置
@@ -338,8 +690,9 @@ class CopilotHandler:
                 self.logger.debug(f"找到輸入框，位置: ({input_x}, {input_y})")
                 
                 # 點擊輸入框以重新聚焦
-                pyautogui.click(input_x, input_y)
-                time.sleep(0.5)  # 等待聚焦完成
+                _kb.click(input_x, input_y)
+                if not self._sleep(0.5):  # 等待聚焦完成
+                    return False
                 
                 return True
             else:
@@ -361,21 +714,13 @@ class CopilotHandler:
         """
         try:
             # 使用圖像識別方法聚焦輸入框
-            if not self._refocus_input_bar():
-                self.logger.warning("無法透過圖像識別聚焦輸入框，嘗試備用方案...")
-                # 備用方案：使用 Ctrl+Shift+Subtract 和 Ctrl+Shift+Add 組合
-                pyautogui.hotkey('ctrl', 'shift', 'subtract')
-                time.sleep(0.2)
-                pyautogui.hotkey('ctrl', 'shift', 'add')
-                time.sleep(0.5)
-            
-            # 全選並刪除
-            pyautogui.hotkey('ctrl', 'a')
-            time.sleep(0.2)
-            pyautogui.press('delete')
-            time.sleep(0.5)
+            self._focus_input_bar_with_fallback()
+            if self._stop_requested():
+                return False
             
-            return True
+            # 全選並刪除（單一按鍵序列）
+            _kb.send_sequence(_SELECT_DELETE)
+            return self._sleep(0.5)
             
         except Exception as e:
             self.logger.error(f"清空輸入框時發生錯誤: {e}")
@@ -401,27 +746,13 @@ class CopilotHandler:
                     return False
             
             self.logger.info("發送提示詞到 Copilot Chat...")
-            self.logger.debug(f"提示詞內容: {prompt[:100]}...")
-            
-            # 將提示詞複製到剪貼簿
-            pyperclip.copy(prompt)
-            time.sleep(0.5)
+            self.logger.debug("提示詞內容: %.100s...", prompt)
             
-            # 注意：Chat 已經由 open_copilot_chat() 開啟並聚焦
-            # 不需要額外的點擊操作，直接貼上即可
-            
-            # 清空現有內容並貼上提示詞
-            pyautogui.hotkey('ctrl', 'a')  # 全選
-            time.sleep(0.2)
-            pyautogui.hotkey('ctrl', 'v')  # 貼上
-            time.sleep(1)
-            
-            # 發送提示詞
-            pyautogui.press('enter')
-            time.sleep(1)
+            # 注意：Chat 已經由 open_copilot_chat() 開啟並聚焦，直接貼上即可
+            if not self._send(prompt, "發送提示詞", copy_wait=0.5, post_wait=2):
+                return False
             
             self.is_chat_open = True
-            self.logger.copilot_interaction("發送提示詞", "SUCCESS", f"長度: {len(prompt)} 字元")
             return True
             
         except Exception as e:
@@ -442,20 +773,29 @@ class CopilotHandler:
         try:
             # 根據輪數和專案路徑選擇對應的 prompt 檔案
             prompt_file_path = config.get_prompt_file_path(round_number, project_path)
+            content = self._prompt_cache.get(prompt_file_path)
+            if content is not None:
+                return content
             if not prompt_file_path.exists():
                 self.logger.error(f"提示詞檔案不存在: {prompt_file_path}")
                 return None
-            with open(prompt_file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
+            content = Path(prompt_file_path).read_text(encoding='utf-8').strip()
             if not content:
                 self.logger.error("提示詞檔案為空")
                 return None
+            self._prompt_cache[prompt_file_path] = content
             self.logger.debug(f"成功讀取提示詞檔案 ({prompt_file_path.name}): {len(content)} 字元")
             return content
         except Exception as e:
             self.logger.error(f"讀取提示詞檔案失敗: {str(e)}")
             return None
     
+    def invalidate_prompt_cache(self):
+        """清除提示詞快取（提示詞檔案在執行期間被修改時使用）"""
+        self._prompt_cache.clear()
+        self._prompt_parse_cache.clear()
+        self._applied_template_cache.clear()
+    
     def load_project_prompt_lines(self, project_path: str, max_lines: int = None) -> List[str]:
         """
         載入專案專用提示詞的所有行
@@ -480,7 +820,7 @@ class CopilotHandler:
                     self.logger.info(f"⚠️  應用行數限制: {original_count} 行 → {max_lines} 行")
                     lines = lines[:max_lines]
             
-            self.logger.debug(f"載入專案 {Path(project_path).name} 的提示詞: {len(lines)} 行")
+            self.logger.debug(f"載入專案 {_project_name(project_path)} 的提示詞: {len(lines)} 行")
             return lines
         except Exception as e:
             self.logger.error(f"載入專案提示詞失敗: {str(e)}")
@@ -498,32 +838,29 @@ class CopilotHandler:
         Returns:
             (filepath, first_function_name): 檔案路徑和第一個函式名稱
         """
-        parts = prompt_line.strip().split('|')
-        if len(parts) != 2:
-            self.logger.warning(f"Prompt 格式錯誤（應為 filepath|function_name）: {prompt_line}")
-            return ("", "")
-        
-        filepath = parts[0].strip()
-        functions_part = parts[1].strip()
+        # 同一行在統計初始化與每輪處理時都會解析，結果快取
+        cached = self._prompt_parse_cache.get(prompt_line)
+        if cached is not None:
+            return cached
         
-        # 分隔多個函數（使用中文頓號「、」）
-        functions = []
-        if '、' in functions_part:
-            functions = [f.strip() for f in functions_part.split('、')]
-        else:
-            # 如果沒有分隔符，就是單一函數
-            functions = [functions_part]
+        match = _PROMPT_RE.fullmatch(prompt_line)
+        if match is None:
+            self.logger.warning("Prompt 格式錯誤（應為 filepath|function_name）: %s", prompt_line)
+            self._prompt_parse_cache[prompt_line] = ("", "")
+            return ("", "")
         
-        # 取第一個函數
-        first_function = functions[0].strip()
+        filepath, first_function, rest = match.groups()
         
         # 確保函數名稱包含括號（如果沒有則添加）
         if not first_function.endswith('()'):
             first_function = first_function + '()'
         
-        self.logger.debug(f"解析 prompt: {filepath} | {first_function} (共 {len(functions)} 個函數，只取第一個)")
+        function_count = 1 + rest.count('、') if rest else 1
+        self.logger.debug("解析 prompt: %s | %s (共 %s 個函數，只取第一個)", filepath, first_function, function_count)
         
-        return (filepath, first_function)
+        result = (filepath, first_function)
+        self._prompt_parse_cache[prompt_line] = result
+        return result
     
     def _apply_coding_instruction_template(self, filepath: str, function_name: str) -> str:
         """
@@ -536,16 +873,24 @@ class CopilotHandler:
         Returns:
             str: 套用模板後的完整 prompt
         """
+        # 同一函式在每一輪都會套用相同的模板，結果快取
+        cache_key = (filepath, function_name)
+        cached = self._applied_template_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            # 載入 coding_instruction.txt 模板
-            template_path = Path(__file__).parent.parent / "assets" / "prompt-template" / "coding_instruction.txt"
-            
-            if not template_path.exists():
-                self.logger.error(f"找不到 coding_instruction.txt 模板: {template_path}")
-                return ""
-            
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template = f.read()
+            # 載入 coding_instruction.txt 模板（快取於類別層級）
+            template_path = self.CODING_INSTRUCTION_TEMPLATE
+            template = self._template_cache.get(template_path)
+            if template is None:
+                if not template_path.exists():
+                    self.logger.error("找不到 coding_instruction.txt 模板: %s", template_path)
+                    return ""
+                
+                with open(template_path, 'r', encoding='utf-8') as f:
+                    template = f.read()
+                self._template_cache[template_path] = template
             
             # 替換變數
             prompt = template.format(
@@ -553,12 +898,13 @@ class CopilotHandler:
                 target_function_name=function_name
             )
             
-            self.logger.debug(f"套用 coding_instruction 模板: {filepath} | {function_name}")
+            self.logger.debug("套用 coding_instruction 模板: %s | %s", filepath, function_name)
             
+            self._applied_template_cache[cache_key] = prompt
             return prompt
             
         except Exception as e:
-            self.logger.error(f"套用 coding_instruction 模板時發生錯誤: {e}")
+            self.logger.error("套用 coding_instruction 模板時發生錯誤: %s", e)
             return ""
     
     def send_single_prompt_line(self, prompt_line: str, line_number: int, total_lines: int) -> bool:
@@ -574,26 +920,11 @@ class CopilotHandler:
             bool: 發送是否成功
         """
         try:
-            self.logger.info(f"發送第 {line_number}/{total_lines} 行提示詞...")
-            self.logger.debug(f"內容: {prompt_line[:100]}...")
-            
-            # 將提示詞複製到剪貼簿
-            pyperclip.copy(prompt_line)
-            time.sleep(0.3)
-            
-            # 清空現有內容並貼上提示詞（不需要重新聚焦，已經在輸入框中）
-            pyautogui.hotkey('ctrl', 'a')  # 全選
-            time.sleep(0.2)
-            pyautogui.hotkey('ctrl', 'v')  # 貼上
-            time.sleep(0.5)
+            self.logger.info("發送第 %s/%s 行提示詞...", line_number, total_lines)
+            self.logger.debug("內容: %.100s...", prompt_line)
             
-            # 發送提示詞
-            pyautogui.press('enter')
-            time.sleep(0.5)
-            
-            self.logger.copilot_interaction(f"發送第 {line_number} 行提示詞", "SUCCESS", 
-                                          f"長度: {len(prompt_line)} 字元")
-            return True
+            # 不需要重新聚焦，已經在輸入框中
+            return self._send(prompt_line, f"發送第 {line_number} 行提示詞")
             
         except Exception as e:
             self.logger.copilot_interaction(f"發送第 {line_number} 行提示詞", "ERROR", str(e))
@@ -625,13 +956,10 @@ class CopilotHandler:
                 # 使用固定等待時間，避免圖像識別複雜度
                 wait_time = min(timeout, 60)  # 最多等待60秒
                 
-                # 分段睡眠，每秒檢查一次中斷請求
-                for i in range(wait_time):
-                    # 檢查是否有緊急停止請求
-                    if self.error_handler and self.error_handler.emergency_stop_requested:
-                        self.logger.warning("收到中斷請求，停止等待 Copilot 回應")
-                        return False
-                    time.sleep(1)
+                # 分段睡眠，期間檢查中斷請求
+                if not self._sleep(wait_time):
+                    self.logger.warning("收到中斷請求，停止等待 Copilot 回應")
+                    return False
                 
                 self.logger.copilot_interaction("回應等待完成", "SUCCESS", f"等待時間: {wait_time}秒")
                 return True
@@ -654,12 +982,27 @@ class CopilotHandler:
             self.logger.info(f"智能等待 Cursor AI 回應，最長等待 {timeout} 秒...")
             
             start_time = time.time()
-            check_interval = 2  # 檢查間隔（秒）
+            # 檢查間隔（秒）：回應中（stop 按鈕）逐步拉長到上限，狀態不明時回到下限
+            min_interval = 0.5
+            max_interval = 2.0
+            check_interval = min_interval
+            # 狀態日誌：UI 狀態改變時記錄，狀態不變時每 30 秒記錄一次
+            state_labels = {
+                'stop': "UI狀態: 回應中(stop)",
+                'send': "UI狀態: 完成(send)",
+                'unknown': "UI狀態: 不明",
+                'error': "UI狀態: 檢測失敗"
+            }
+            keepalive_interval = 30
+            last_state = None
+            last_log_time = start_time
             
             # 初始等待時間
             initial_wait = 3
             self.logger.info(f"初始等待 {initial_wait} 秒...")
-            time.sleep(initial_wait)
+            if not self._sleep(initial_wait):
+                self.logger.warning("收到中斷請求，停止等待 Cursor AI 回應")
+                return False
             
             # 持續監控直到圖像檢測確認完成
             while (time.time() - start_time) < timeout:
@@ -668,16 +1011,29 @@ class CopilotHandler:
                     self.logger.warning("收到中斷請求，停止等待 Cursor AI 回應")
                     return False
                 
-                # 使用圖像檢測判斷回應狀態
+                # 使用圖像檢測判斷回應狀態：先做快速的按鈕檢查，
+                # 兩個按鈕都檢測不到時才執行完整檢查（含清除通知與重新聚焦）
+                notifications_cleared = False
                 try:
-                    copilot_status = self.image_recognition.check_copilot_response_status_with_auto_clear()
+                    has_stop, has_send = self.image_recognition.check_copilot_buttons()
+                    if has_stop or has_send:
+                        copilot_status = {
+                            'has_stop_button': has_stop,
+                            'has_send_button': has_send,
+                            'notifications_cleared': False
+                        }
+                    else:
+                        copilot_status = self.image_recognition.check_copilot_response_status_with_auto_clear()
                     
                     # 如果清除了通知，記錄相關信息
-                    if copilot_status.get('notifications_cleared', False):
+                    notifications_cleared = copilot_status.get('notifications_cleared', False)
+                    if notifications_cleared:
                         self.logger.info("🔄 已清除 Cursor 通知，繼續檢測...")
                     
                     # 圖像檢測判斷：檢測到 send 按鈕且沒有 stop 按鈕 = 回應完成
                     if copilot_status['has_send_button'] and not copilot_status['has_stop_button']:
+                        # 同一輪檢測中順便定位複製按鈕，copy_response 可直接點擊
+                        self._ready_copy_location = self._find_in_panel(str(config.COPY_BUTTON_IMAGE))
                         elapsed_time = time.time() - start_time
                         self.logger.info(f"✅ 圖像檢測確認：Cursor AI 回應已完成（檢測到 send 按鈕）")
                         self.logger.info(f"🎉 完成等待！(圖像檢測, {elapsed_time:.1f}秒)")
@@ -685,36 +1041,32 @@ class CopilotHandler:
                     
                     elif copilot_status['has_stop_button']:
                         self.logger.debug("🔄 檢測到 stop 按鈕，Cursor AI 正在回應中...")
+                        check_interval = min(check_interval * 1.5, max_interval)
+                        state = 'stop'
                     
                     else:
-                        self.logger.debug(f"圖像檢測: {copilot_status['status_message']}")
+                        self.logger.debug("圖像檢測: %s", copilot_status['status_message'])
+                        check_interval = min_interval
+                        state = 'unknown'
                     
                 except Exception as e:
-                    self.logger.debug(f"圖像檢測錯誤: {e}")
+                    self.logger.debug("圖像檢測錯誤: %s", e)
+                    state = 'error'
                 
-                # 暫停後繼續檢查
-                time.sleep(check_interval)
+                # 狀態改變或超過 keepalive 間隔時報告狀態
+                now = time.time()
+                if state != last_state or now - last_log_time >= keepalive_interval:
+                    image_status = state_labels[state]
+                    if notifications_cleared:
+                        image_status += " (已清除通知)"
+                    self.logger.info("⏱️ 已等待 %d 秒 (%s)", now - start_time, image_status)
+                    last_state = state
+                    last_log_time = now
                 
-                # 定期報告狀態（每10秒）
-                elapsed_time = time.time() - start_time
-                if int(elapsed_time) % 10 == 0 and int(elapsed_time) > 0:
-                    # 加入圖像檢測狀態
-                    image_status = ""
-                    try:
-                        if copilot_status['has_stop_button']:
-                            image_status = "UI狀態: 回應中(stop)"
-                        elif copilot_status['has_send_button']:
-                            image_status = "UI狀態: 完成(send)"
-                        else:
-                            image_status = "UI狀態: 不明"
-                        
-                        if copilot_status.get('notifications_cleared', False):
-                            image_status += " (已清除通知)"
-                            
-                    except:
-                        image_status = "UI狀態: 檢測失敗"
-                    
-                    self.logger.info(f"⏱️ 已等待 {int(elapsed_time)} 秒 ({image_status})")
+                # 暫停後繼續檢查
+                if not self._sleep(check_interval):
+                    self.logger.warning("收到中斷請求，停止等待 Cursor AI 回應")
+                    return False
             
             # 超時處理
             elapsed_time = time.time() - start_time
@@ -757,43 +1109,47 @@ class CopilotHandler:
         Returns:
             str: 回應內容，若複製失敗則返回空字串
         """
+        original_clipboard = ""
         try:
-            # 保存當前剪貼簿內容
-            original_clipboard = ""
-            try:
-                original_clipboard = pyperclip.paste()
-            except:
-                pass
+            # 保存當前剪貼簿內容（僅在需要保留使用者剪貼簿時）
+            if self.preserve_user_clipboard:
+                try:
+                    original_clipboard = pyperclip.paste()
+                except:
+                    pass
             
-            # 設置測試標記
-            test_marker = f"__COPILOT_TEST_{int(time.time())}__"
-            pyperclip.copy(test_marker)
-            time.sleep(0.5)
+            # 清空剪貼簿，複製成功後即不為空
+            pyperclip.copy("")
             
             # 使用統一的複製方法
             # 1. Ctrl+Shift+Y 聚焦到 Cursor AI Chat 輸入框
-            pyautogui.hotkey('ctrl', 'shift', 'y')
-            time.sleep(1)
+            _kb.hotkey('ctrl', 'shift', 'y')
+            if not self._sleep(1):
+                return ""
             
             # 2. Ctrl+↑ 聚焦到 Copilot 回應
-            pyautogui.hotkey('ctrl', 'up')
-            time.sleep(1)
+            _kb.hotkey('ctrl', 'up')
+            if not self._sleep(1):
+                return ""
             
             # 3. Shift+F10 開啟右鍵選單
-            pyautogui.hotkey('shift', 'f10')
-            time.sleep(1)
+            _kb.hotkey('shift', 'f10')
+            if not self._sleep(1):
+                return ""
             
             # 4. 一次方向鍵下，定位到"複製"
-            pyautogui.press('down')
-            time.sleep(0.3)
-            
-            # 5. Enter 執行複製
-            pyautogui.press('enter')
-            time.sleep(2)
+            _kb.press('down')
+            if not self._sleep(0.3):
+                return ""
             
+            # 5. Enter 執行複製，輪詢剪貼簿直到有內容（最多 2 秒）
+            _kb.press('enter')
+            deadline = time.monotonic() + 2
             response = pyperclip.paste()
+            while not response and time.monotonic() < deadline and self._sleep(0.1):
+                response = pyperclip.paste()
             
-            if response and response != test_marker and len(response.strip()) > 20:
+            if response and len(response.strip()) > 20:
                 # 驗證內容是否像是 Copilot 回應
                 if self._validate_response_content(response):
                     return response
@@ -805,7 +1161,7 @@ class CopilotHandler:
         finally:
             # 嘗試恢復原始剪貼簿內容
             try:
-                if original_clipboard and test_marker not in original_clipboard:
+                if original_clipboard:
                     pyperclip.copy(original_clipboard)
             except:
                 pass
@@ -815,20 +1171,19 @@ class CopilotHandler:
         if not response or len(response.strip()) < 30:
             return False
             
-        # 檢查是否包含典型的 Copilot 回應特徵
-        copilot_indicators = [
-            '分析', '建議', '程式', '代碼', 'code', 'function', 'class',
-            'import', 'def', 'var', 'let', 'const', '結構', '改進',
-            '範例', 'example', '可以', '建議', '應該', '可能', '需要',
-            '讓我', '我會', '以下', '首先', '接下來', '最後',
-            '```', 'python', 'javascript', 'typescript', 'html', 'css'
-        ]
-        
-        response_lower = response.lower()
-        matches = sum(1 for indicator in copilot_indicators if indicator in response_lower)
-        
-        # 如果匹配多個指標，可能是有效回應
-        return matches >= 2
+        # 檢查是否包含典型的 Copilot 回應特徵（每個特徵只計一次）
+        seen = set()
+        matches = 0
+        for m in _INDICATOR_RE.finditer(response):
+            indicator = m.group(1).lower()
+            if indicator in seen:
+                continue
+            seen.add(indicator)
+            matches += _INDICATOR_WEIGHTS[indicator]
+            # 如果匹配多個指標，可能是有效回應
+            if matches >= 2:
+                return True
+        return False
     
     def copy_response(self) -> Optional[str]:
         """
@@ -843,13 +1198,15 @@ class CopilotHandler:
                 
                 # 清空剪貼簿
                 pyperclip.copy("")
-                time.sleep(0.5)
+                if not self._sleep(0.5):
+                    self.logger.warning("收到中斷請求，停止複製回應")
+                    return None
                 
-                # 使用圖像識別找到 @copy.png 按鈕並點擊
-                copy_button_location = self.image_recognition.find_image_on_screen(
-                    str(config.COPY_BUTTON_IMAGE), 
-                    confidence=config.IMAGE_CONFIDENCE
-                )
+                # 使用圖像識別找到 @copy.png 按鈕並點擊（智能等待已定位時直接使用，僅限第一次）
+                copy_button_location = self._ready_copy_location
+                self._ready_copy_location = None
+                if not copy_button_location:
+                    copy_button_location = self._find_in_panel(str(config.COPY_BUTTON_IMAGE))
                 
                 if copy_button_location:
                     # 找到複製按鈕，計算點擊位置（按鈕中心）
@@ -859,12 +1216,14 @@ class CopilotHandler:
                     self.logger.info(f"找到複製按鈕，位置: ({button_x}, {button_y})")
                     
                     # 點擊複製按鈕
-                    pyautogui.click(button_x, button_y)
-                    time.sleep(1.5)  # 等待複製完成
+                    _kb.click(button_x, button_y)
+                    if not self._sleep(1.5):  # 等待複製完成
+                        self.logger.warning("收到中斷請求，停止複製回應")
+                        return None
                     
                     # 取得剪貼簿內容
                     response = pyperclip.paste()
-                    if response and len(response.strip()) > 0:
+                    if response and not response.isspace():
                         self.last_response = response
                         self.logger.copilot_interaction("複製回應", "SUCCESS", f"長度: {len(response)} 字元")
                         
@@ -885,17 +1244,37 @@ class CopilotHandler:
                 # 如果失敗且還有重試機會，等待後重試
                 if attempt < config.COPILOT_COPY_RETRY_MAX - 1:
                     self.logger.info(f"等待 {config.COPILOT_COPY_RETRY_DELAY} 秒後重試...")
-                    time.sleep(config.COPILOT_COPY_RETRY_DELAY)
+                    if not self._sleep(config.COPILOT_COPY_RETRY_DELAY):
+                        self.logger.warning("收到中斷請求，停止複製回應")
+                        return None
                 
             except Exception as e:
                 self.logger.error(f"第 {attempt + 1} 次複製時發生錯誤: {str(e)}")
                 if attempt < config.COPILOT_COPY_RETRY_MAX - 1:
                     self.logger.info(f"等待 {config.COPILOT_COPY_RETRY_DELAY} 秒後重試...")
-                    time.sleep(config.COPILOT_COPY_RETRY_DELAY)
+                    if not self._sleep(config.COPILOT_COPY_RETRY_DELAY):
+                        self.logger.warning("收到中斷請求，停止複製回應")
+                        return None
         
         self.logger.copilot_interaction("複製回應", "ERROR", f"重試 {config.COPILOT_COPY_RETRY_MAX} 次後仍然失敗")
         return None
     
+    def _get_timestamps(self) -> Tuple[str, str]:
+        """
+        取得目前時間的檔名時間戳與顯示用時間（同一秒內重複使用已格式化的結果）
+        
+        Returns:
+            Tuple[str, str]: ('%Y%m%d_%H%M%S', '%Y-%m-%d %H:%M:%S')
+        """
+        now = int(time.time())
+        cached_second, file_stamp, display_stamp = self._timestamp_cache
+        if now != cached_second:
+            t = time.localtime(now)
+            file_stamp = f"{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}_{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}"
+            display_stamp = f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+            self._timestamp_cache = (now, file_stamp, display_stamp)
+        return file_stamp, display_stamp
+    
     def save_response_to_file(self, project_path: str, response: str = None, is_success: bool = True, **kwargs) -> bool:
         """
         將回應儲存到統一的 ExecutionResult 資料夾
@@ -905,6 +1284,8 @@ class CopilotHandler:
             response: 回應內容，若為 None 則使用最後一次的回應
             is_success: 是否成功執行
             **kwargs: 額外參數
+                - project_name: 專案名稱（未提供時由 project_path 取得）
+                - output_dir: 預先計算的輸出資料夾（未提供時依成功與否、輪數、道程序組合）
                 - round_number: 互動輪數
                 - phase_number: 道程序編號（AS 模式專用：1=Query Phase, 2=Coding Phase）
                 - line_number: 行號
@@ -927,50 +1308,48 @@ class CopilotHandler:
                 self.logger.error("沒有可儲存的回應內容")
                 return False
             
-            project_dir = Path(project_path)
-            project_name = project_dir.name
-            
-            # 建立統一的 ExecutionResult 資料夾結構（使用 config 設定）
-            execution_result_dir = config.EXECUTION_RESULT_DIR
-            result_subdir = execution_result_dir / ("Success" if is_success else "Fail")
-            
-            # 建立專案專屬資料夾
-            project_subdir = result_subdir / project_name
-            project_subdir.mkdir(parents=True, exist_ok=True)
-            
-            # 建立輪數專屬資料夾
+            # 儲存路徑使用字串與 os.path 組合（每行都會呼叫，避免建立多個 Path 物件）
+            project_name = kwargs.get('project_name') or _project_name(project_path)
             round_number = kwargs.get('round_number', 1)
-            round_subdir = project_subdir / f"第{round_number}輪"
-            round_subdir.mkdir(parents=True, exist_ok=True)
-            
             # 檢查是否為 AS 模式（有 phase_number 參數）
             phase_number = kwargs.get('phase_number', None)
-            if phase_number is not None:
-                # AS 模式：建立第N道資料夾
-                phase_subdir = round_subdir / f"第{phase_number}道"
-                phase_subdir.mkdir(parents=True, exist_ok=True)
-                output_dir = phase_subdir
-            else:
-                # 一般模式：直接在輪數資料夾下
-                output_dir = round_subdir
+            
+            # 呼叫端已預先計算輸出資料夾時直接使用
+            output_dir = kwargs.get('output_dir')
+            if output_dir is None:
+                # 統一的 ExecutionResult 資料夾結構（使用 config 設定）：成功/失敗 / 專案 / 輪數
+                output_dir = os.path.join(
+                    str(config.EXECUTION_RESULT_DIR), "Success" if is_success else "Fail",
+                    project_name, f"第{round_number}輪"
+                )
+                if phase_number is not None:
+                    # AS 模式：第N道資料夾（一般模式直接在輪數資料夾下）
+                    output_dir = os.path.join(output_dir, f"第{phase_number}道")
+            
+            # 只在第一次寫入該資料夾時以單次 makedirs 建立整條路徑
+            output_dir_key = str(output_dir)
+            if output_dir_key not in self._created_dirs:
+                os.makedirs(output_dir_key, exist_ok=True)
+                self._created_dirs.add(output_dir_key)
             
             # 生成檔名
-            timestamp = time.strftime('%Y%m%d_%H%M%S')
+            timestamp, generated_at = self._get_timestamps()
             line_number = kwargs.get('line_number', None)
             filename = kwargs.get('filename', None)
             function_name = kwargs.get('function_name', None)
             
             if phase_number is not None and filename and function_name:
                 # AS 模式：第N行_{filename}_{function}.md
-                output_file = output_dir / f"第{line_number}行_{filename}_{function_name}.md"
+                output_name = f"第{line_number}行_{filename}_{function_name}.md"
             elif line_number is not None:
                 # 專案專用提示詞模式：按行記錄
-                output_file = output_dir / f"{timestamp}_第{line_number}行.md"
+                output_name = f"{timestamp}_第{line_number}行.md"
             else:
                 # 全域提示詞模式：按輪記錄
-                output_file = output_dir / f"{timestamp}_回應.md"
+                output_name = f"{timestamp}_回應.md"
+            output_file = os.path.join(output_dir_key, output_name)
             
-            self.logger.info(f"儲存回應到: {output_file}")
+            self.logger.info("儲存回應到: %s", output_file)
             
             # 創建檔案並寫入內容  
             prompt_text = kwargs.get('prompt_text', "使用預設提示詞")
@@ -979,78 +1358,132 @@ class CopilotHandler:
             is_using_template = kwargs.get('is_using_template', False)
             has_response_chaining = kwargs.get('has_response_chaining', False)
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write("# Copilot 自動補全記錄\n")
-                f.write(f"# 生成時間: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"# 專案: {project_name}\n")
-                f.write(f"# 專案路徑: {project_path}\n")
-                f.write(f"# 互動輪數: 第 {round_number} 輪\n")
-                
-                # AS 模式：顯示道程序資訊
-                if phase_number is not None:
-                    phase_name = "Query Phase" if phase_number == 1 else "Coding Phase"
-                    f.write(f"# 道程序: 第 {phase_number} 道（{phase_name}）\n")
-                
-                # 如果有行號資訊，添加行號
-                if line_number is not None:
-                    total_lines = kwargs.get('total_lines', '?')
-                    f.write(f"# 提示詞行號: 第 {line_number}/{total_lines} 行\n")
-                
-                # AS 模式：顯示檔案和函式資訊
-                if filename and function_name:
-                    f.write(f"# 目標檔案: {filename}\n")
-                    f.write(f"# 目標函式: {function_name}\n")
-                
-                # 記錄重試信息
-                if retry_count > 0:
-                    f.write(f"# 重試次數: {retry_count}\n")
-                
-                f.write(f"# 執行狀態: {'成功' if is_success else '失敗'}\n")
-                f.write("=" * 50 + "\n\n")
-                
-                # 添加原始提示詞
-                if line_number is not None:
-                    f.write(f"## 第 {line_number} 行原始提示詞\n\n")
+            # 組合完整內容後一次寫入（避免多次小量寫入；固定字串已預先編碼）
+            parts = [
+                _RESULT_TITLE,
+                f"# 生成時間: {generated_at}\n".encode("utf-8"),
+                _project_header(project_name, str(project_path)),
+                f"# 互動輪數: 第 {round_number} 輪\n".encode("utf-8"),
+            ]
+            
+            # AS 模式：顯示道程序資訊
+            if phase_number is not None:
+                phase_name = "Query Phase" if phase_number == 1 else "Coding Phase"
+                parts.append(f"# 道程序: 第 {phase_number} 道（{phase_name}）\n".encode("utf-8"))
+            
+            # 如果有行號資訊，添加行號
+            if line_number is not None:
+                total_lines = kwargs.get('total_lines', '?')
+                parts.append(f"# 提示詞行號: 第 {line_number}/{total_lines} 行\n".encode("utf-8"))
+            
+            # AS 模式：顯示檔案和函式資訊
+            if filename and function_name:
+                parts.append(f"# 目標檔案: {filename}\n# 目標函式: {function_name}\n".encode("utf-8"))
+            
+            # 記錄重試信息
+            if retry_count > 0:
+                parts.append(f"# 重試次數: {retry_count}\n".encode("utf-8"))
+            
+            parts.append(_RESULT_STATUS_SUCCESS if is_success else _RESULT_STATUS_FAIL)
+            
+            # 添加原始提示詞
+            if line_number is not None:
+                parts.append(f"## 第 {line_number} 行原始提示詞\n\n".encode("utf-8"))
+            else:
+                parts.append(_RESULT_ROUND_PROMPT_HEADING)
+            parts.append(prompt_text.encode("utf-8"))
+            parts.append(_BLANK_LINE)
+            
+            # 如果有實際發送的內容，也記錄下來（逐行模式未傳入此參數，整段只需一次判斷即略過）
+            if actual_sent_prompt and actual_sent_prompt != prompt_text:
+                # 根據是否有回應串接 / 套用模板決定標題與說明
+                if has_response_chaining:
+                    heading = _RESULT_CHAINED_PROMPT_HEADING
+                    note = "本次發送包含了前面回應的串接內容（啟用了「在新一輪提示詞中包含上一輪 Copilot 回應」選項）"
+                elif is_using_template:
+                    heading = _RESULT_SENT_PROMPT_HEADING
+                    note = "已套用 Coding Instruction 模板並加入完成指示標記"
                 else:
-                    f.write("## 本輪原始提示詞\n\n")
-                f.write(prompt_text)
-                f.write("\n\n")
+                    heading = _RESULT_SENT_PROMPT_HEADING
+                    note = "已加入完成指示標記 (COMPLETION_INSTRUCTION)"
                 
-                # 如果有實際發送的內容，也記錄下來
-                if actual_sent_prompt and actual_sent_prompt != prompt_text:
-                    # 根據是否有回應串接來決定標題
-                    if has_response_chaining:
-                        f.write("## 實際發送內容（包含前面回應串接）\n\n")
-                    else:
-                        f.write("## 實際發送內容\n\n")
-                    
-                    f.write(actual_sent_prompt)
-                    f.write("\n\n")
-                    
-                    # 根據情況顯示不同的說明
-                    if has_response_chaining:
-                        f.write(f"**注意**: 本次發送包含了前面回應的串接內容（啟用了「在新一輪提示詞中包含上一輪 Copilot 回應」選項），總長度: {len(actual_sent_prompt)} 字元\n\n")
-                    elif is_using_template:
-                        f.write(f"**注意**: 已套用 Coding Instruction 模板並加入完成指示標記，總長度: {len(actual_sent_prompt)} 字元\n\n")
-                    else:
-                        f.write(f"**注意**: 已加入完成指示標記 (COMPLETION_INSTRUCTION)，總長度: {len(actual_sent_prompt)} 字元\n\n")
-                
-                # 添加回應內容
-                f.write("## Copilot 回應\n\n")
-                f.write(response)
-            
-            self.logger.copilot_interaction("儲存回應", "SUCCESS", f"檔案: {output_file.name}")
+                parts.append(heading)
+                parts.append(actual_sent_prompt.encode("utf-8"))
+                parts.append(_BLANK_LINE)
+                parts.append(f"**注意**: {note}，總長度: {len(actual_sent_prompt)} 字元\n\n".encode("utf-8"))
+            
+            # 添加回應內容
+            parts.append(_RESULT_RESPONSE_HEADING)
+            parts.append(response.encode("utf-8"))
+            
+            # 先寫入暫存檔並 fsync，再以 os.replace 原子替換
+            # 外部讀取者不會看到寫到一半的檔案，檢查點記錄進度前回應檔案也已落盤
+            # 以無緩衝模式開啟，整份內容直接交給 write 系統呼叫（不經 BufferedWriter 複製）
+            temp_file = output_file + ".tmp"
+            try:
+                f = open(temp_file, 'wb', buffering=0)
+            except FileNotFoundError:
+                # 資料夾在執行期間被刪除（快取失效），重新建立後再開啟
+                os.makedirs(output_dir_key, exist_ok=True)
+                f = open(temp_file, 'wb', buffering=0)
+            try:
+                with f:
+                    payload = memoryview(b"".join(parts))
+                    while payload:
+                        # 原始檔案物件可能只寫入部分內容，寫完剩餘部分為止
+                        payload = payload[f.write(payload):]
+                    os.fsync(f.fileno())
+                os.replace(temp_file, output_file)
+            except Exception:
+                # 寫入失敗時清除暫存檔
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+                raise
             
-            # 等待短暫時間確保檔案完全寫入
-            time.sleep(0.5)
+            self.logger.copilot_interaction("儲存回應", "SUCCESS", f"檔案: {output_name}")
             return True
             
         except Exception as e:
             self.logger.copilot_interaction("儲存回應", "ERROR", str(e))
             return False
     
+    def _handle_line_retry(self, reason: str, line_num: int, round_number: int,
+                           retry_count: int, backoff: bool = True) -> int:
+        """
+        統一處理逐行模式的重試：遞增次數，未達上限時等待退避時間並清空輸入框、重新聚焦
+        
+        Args:
+            reason: 重試原因（用於日誌）
+            line_num: 行號
+            round_number: 輪數
+            retry_count: 目前的重試次數
+            backoff: 是否等待退避時間（False 時立即重試）
+            
+        Returns:
+            int: 更新後的重試次數（收到中斷請求時不清空輸入框，呼叫端以 _stop_requested 判斷是否結束）
+        """
+        retry_count += 1
+        if retry_count >= config.AS_MODE_MAX_RETRY_PER_LINE:
+            return retry_count
+        
+        if backoff:
+            self.logger.warning("  ⏳ %s，將重試（第 %s 次）", reason, retry_count)
+            wait_and_retry(60, line_num, round_number, self.logger, retry_count,
+                           should_stop=self._stop_requested)
+        else:
+            self.logger.warning("  ⏳ %s，重新聚焦後立即重試", reason)
+        
+        # 收到中斷請求：不再操作輸入框，由逐行迴圈檢查後結束
+        if self._stop_requested():
+            return retry_count
+        self._clear_input_and_refocus()
+        return retry_count
+    
     def process_project_with_line_by_line(self, project_path: str, round_number: int = 1, 
-                                        use_smart_wait: bool = None, max_lines: int = None) -> Tuple[bool, int, List[str]]:
+                                        use_smart_wait: bool = None, max_lines: int = None,
+                                        prompt_lines: Optional[List[str]] = None) -> Tuple[bool, int, List[str]]:
         """
         使用新流程處理專案（按行發送，不複製回應）
         
@@ -1066,23 +1499,27 @@ class CopilotHandler:
             round_number: 當前互動輪數
             use_smart_wait: 是否使用智能等待
             max_lines: 最大處理行數限制（None 表示無限制）
+            prompt_lines: 已載入的提示詞行（多輪處理時由呼叫端傳入，避免每輪重新載入）
             
         Returns:
             Tuple[bool, int, List[str]]: (是否成功, 成功處理的行數, 失敗的行列表)
         """
         try:
-            project_name = Path(project_path).name
+            project_name = _project_name(project_path)
+            # 本輪成功回應的輸出資料夾（每行共用，不在每次儲存時重新組合）
+            success_round_dir = os.path.join(str(config.EXECUTION_RESULT_DIR), "Success", project_name, f"第{round_number}輪")
             self.logger.create_separator(f"新流程處理專案: {project_name} (第 {round_number} 輪)")
             
-            # 載入專案提示詞行（應用行數限制）
-            prompt_lines = self.load_project_prompt_lines(project_path, max_lines=max_lines)
+            # 載入專案提示詞行（應用行數限制；呼叫端已提供時直接使用）
+            if prompt_lines is None:
+                prompt_lines = self.load_project_prompt_lines(project_path, max_lines=max_lines)
             if not prompt_lines:
                 error_msg = f"專案 {project_name} 沒有可用的提示詞行"
                 self.logger.error(error_msg)
                 return False, 0, [error_msg]
             
             total_lines = len(prompt_lines)
-            self.logger.info(f"開始處理專案 {project_name}，共 {total_lines} 行提示詞")
+            self.logger.info("開始處理專案 %s，共 %s 行提示詞", project_name, total_lines)
             
             # 檢查是否啟用 Coding Instruction 模板
             interaction_settings = self._load_interaction_settings()
@@ -1110,17 +1547,25 @@ class CopilotHandler:
                 self.logger.warning("⚠️ 選擇模型失敗，將使用當前模型繼續")
             
             # 步驟4-6: 逐行處理 prompt
-            self.logger.info(f"📝 步驟4-6: 開始處理 {total_lines} 行提示詞...")
+            self.logger.info("📝 步驟4-6: 開始處理 %s 行提示詞...", total_lines)
             
             for line_num, original_prompt_line in enumerate(prompt_lines, 1):
                 try:
                     # 無論成功或失敗，都計入處理數量（用於檔案數限制統計）
                     processed_lines += 1
-                    self.logger.info(f"處理第 {line_num}/{total_lines} 行...")
+                    self.logger.info("處理第 %s/%s 行...", line_num, total_lines)
                     
                     # 更新 checkpoint: 記錄當前處理的行數
+                    # 交由儲存執行緒（單一 worker 依提交順序執行）在上一行的回應檔案落盤後才寫入，
+                    # 避免檢查點已記錄第 N 行、第 N-1 行的回應檔案卻尚未存在
                     if self.checkpoint_manager:
-                        self.checkpoint_manager.update_progress(current_line=line_num)
+                        self._pending_progress_future = self._save_pool.submit(
+                            self.checkpoint_manager.update_progress, current_line=line_num
+                        )
+                    
+                    # 背景掃描讀取的是工作目錄中的檔案，送出會修改同一檔案的 prompt 前必須先等待其完成
+                    target_file = original_prompt_line.split('|', 1)[0].strip()
+                    self._wait_scan_for_file(target_file)
                     
                     # 處理 Coding Instruction 模板（如果啟用）
                     processed_prompt = original_prompt_line
@@ -1138,12 +1583,12 @@ class CopilotHandler:
                             if processed_prompt:
                                 filepath_for_logging = filepath
                                 function_for_logging = first_function
-                                self.logger.info(f"📝 已套用 Coding Instruction 模板: {filepath} | {first_function}")
+                                self.logger.info("📝 已套用 Coding Instruction 模板: %s | %s", filepath, first_function)
                             else:
-                                self.logger.warning(f"⚠️ 套用模板失敗，將使用原始 prompt")
+                                self.logger.warning("⚠️ 套用模板失敗，將使用原始 prompt")
                                 processed_prompt = original_prompt_line
                         else:
-                            self.logger.warning(f"⚠️ 第 {line_num} 行格式錯誤，將使用原始 prompt")
+                            self.logger.warning("⚠️ 第 %s 行格式錯誤，將使用原始 prompt", line_num)
                             processed_prompt = original_prompt_line
                     
                     # 步驟4-6: 發送提示詞、等待回應、複製回應（帶重試機制，比照 ASMode）
@@ -1155,69 +1600,61 @@ class CopilotHandler:
                     # 持續重試直到回應完整（最多 AS_MODE_MAX_RETRY_PER_LINE 次，比照 ASMode）
                     while not line_success:
                         try:
+                            # 收到中斷請求時不再重試
+                            if self._stop_requested():
+                                break
+                            
                             # 檢查是否超過最大重試次數
                             if retry_count >= config.AS_MODE_MAX_RETRY_PER_LINE:
-                                self.logger.error(f"第 {line_num} 行：已達最大重試次數 ({config.AS_MODE_MAX_RETRY_PER_LINE} 次)，放棄該行")
+                                self.logger.error("第 %s 行：已達最大重試次數 (%s 次)，放棄該行", line_num, config.AS_MODE_MAX_RETRY_PER_LINE)
                                 break
                             
                             if retry_count > 0:
-                                self.logger.info(f"  重試第 {line_num} 行（第 {retry_count}/{config.AS_MODE_MAX_RETRY_PER_LINE} 次）")
+                                self.logger.info("  重試第 %s 行（第 %s/%s 次）", line_num, retry_count, config.AS_MODE_MAX_RETRY_PER_LINE)
                             
                             # 步驟4: 發送提示詞
                             if not self.send_single_prompt_line(processed_prompt, line_num, total_lines):
-                                retry_count += 1
-                                self.logger.error(f"第 {line_num} 行：無法發送提示詞")
-                                if retry_count < config.AS_MODE_MAX_RETRY_PER_LINE:
-                                    self.logger.warning(f"  ⏳ 發送失敗，將重試（第 {retry_count} 次）")
-                                    wait_and_retry(60, line_num, round_number, self.logger, retry_count)
-                                    self._clear_input_and_refocus()
+                                self.logger.error("第 %s 行：無法發送提示詞", line_num)
+                                # 首次發送失敗多半是暫時的聚焦問題，重新聚焦後立即重試
+                                retry_count = self._handle_line_retry("發送失敗", line_num, round_number, retry_count,
+                                                                      backoff=retry_count > 0)
                                 continue
                             
                             # 步驟5: 等待回應完成
                             if not self.wait_for_response(use_smart_wait=use_smart_wait):
-                                retry_count += 1
-                                self.logger.error(f"第 {line_num} 行：等待回應超時")
-                                if retry_count < config.AS_MODE_MAX_RETRY_PER_LINE:
-                                    self.logger.warning(f"  ⏳ 等待超時，將重試（第 {retry_count} 次）")
-                                    wait_and_retry(60, line_num, round_number, self.logger, retry_count)
-                                    self._clear_input_and_refocus()
+                                self.logger.error("第 %s 行：等待回應超時", line_num)
+                                retry_count = self._handle_line_retry("等待超時", line_num, round_number, retry_count)
                                 continue
                             
                             # 步驟6: 點擊複製回應按鈕
                             response = self.copy_response()
                             if not response:
-                                retry_count += 1
-                                self.logger.error(f"第 {line_num} 行：無法複製回應內容")
-                                if retry_count < config.AS_MODE_MAX_RETRY_PER_LINE:
-                                    self.logger.warning(f"  ⏳ 複製失敗，將重試（第 {retry_count} 次）")
-                                    wait_and_retry(60, line_num, round_number, self.logger, retry_count)
-                                    self._clear_input_and_refocus()
+                                self.logger.error("第 %s 行：無法複製回應內容", line_num)
+                                retry_count = self._handle_line_retry("複製失敗", line_num, round_number, retry_count)
                                 continue
                             
-                            self.logger.info(f"  ✅ 收到回應 ({len(response)} 字元)")
+                            self.logger.info("  ✅ 收到回應 (%s 字元)", len(response))
                             
-                            # 檢查回應完整性（比照 ASMode，不完整則重試）
+                            # 檢查回應完整性（比照 ASMode，不完整則以指數退避等待後重試）
                             if is_response_incomplete(response):
-                                self.logger.warning(f"  ⚠️  第 {line_num} 行回應不完整，將等待後重試")
-                                retry_count += 1
-                                
-                                if retry_count < config.AS_MODE_MAX_RETRY_PER_LINE:
-                                    # 使用指數退避策略等待後重試
-                                    wait_and_retry(60, line_num, round_number, self.logger, retry_count)
-                                    self._clear_input_and_refocus()
+                                self.logger.warning("  ⚠️  第 %s 行回應不完整，將等待後重試", line_num)
+                                retry_count = self._handle_line_retry("回應不完整", line_num, round_number, retry_count)
                                 continue
                             
                             # 回應完整，成功取得回應
                             line_success = True
                             
                         except Exception as e:
-                            self.logger.error(f"  ❌ 處理第 {line_num} 行時發生錯誤: {e}")
-                            retry_count += 1
-                            if retry_count < config.AS_MODE_MAX_RETRY_PER_LINE:
-                                wait_and_retry(60, line_num, round_number, self.logger, retry_count)
-                                self._clear_input_and_refocus()
+                            self.logger.error("  ❌ 處理第 %s 行時發生錯誤: %s", line_num, e)
+                            retry_count = self._handle_line_retry("處理錯誤", line_num, round_number, retry_count)
                             continue
                     
+                    # 收到中斷請求：該行未完成，不再處理剩餘的行
+                    if not line_success and self._stop_requested():
+                        failed_lines.append(f"第 {line_num} 行：收到中斷請求，未完成")
+                        self.logger.warning("⚠️  收到中斷請求，自第 %s 行起停止處理", line_num)
+                        break
+                    
                     # 檢查是否最終成功
                     if not line_success or not response:
                         error_msg = f"第 {line_num} 行：重試 {retry_count} 次後仍然失敗"
@@ -1225,11 +1662,16 @@ class CopilotHandler:
                         self.logger.error(error_msg)
                         continue
                     
-                    self.logger.info(f"  ✅ 第 {line_num} 行回應完整" + (f"（經過 {retry_count} 次重試）" if retry_count > 0 else ""))
+                    if retry_count > 0:
+                        self.logger.info("  ✅ 第 %s 行回應完整（經過 %s 次重試）", line_num, retry_count)
+                    else:
+                        self.logger.info("  ✅ 第 %s 行回應完整", line_num)
                     
                     # 步驟6: 儲存回應到檔案
                     save_kwargs = {
                         "project_path": project_path,
+                        "project_name": project_name,
+                        "output_dir": success_round_dir,
                         "response": response,
                         "is_success": True,
                         "round_number": round_number,
@@ -1249,28 +1691,28 @@ class CopilotHandler:
                         )
                         save_kwargs["is_using_template"] = True
                     
-                    if not self.save_response_to_file(**save_kwargs):
-                        error_msg = f"第 {line_num} 行：無法儲存回應到檔案"
-                        failed_lines.append(error_msg)
-                        self.logger.error(error_msg)
-                        continue
+                    # 儲存交由背景執行緒處理，失敗的行會在本輪結束時從成功數中扣除
+                    self._pending_save_futures.append((line_num, self._save_pool.submit(
+                        self.save_response_to_file, **save_kwargs
+                    )))
                     
                     # 執行 CWE 掃描（如果啟用）
+                    # 掃描交由背景執行緒處理，下一行目標為其他檔案時可與其 prompt 送出重疊執行
+                    # 下一行目標為同一檔案時會先等待（見 _wait_scan_for_file），本輪所有行處理完成時等待全部完成
                     if self.cwe_scan_manager and self.cwe_scan_settings and self.cwe_scan_settings.get("enabled"):
-                        self.logger.info(f"🔍 開始對第 {line_num} 行的回應進行 CWE 掃描...")
-                        scan_success = self._perform_cwe_scan_for_prompt(
+                        self.logger.info("🔍 提交第 %s 行回應的背景 CWE 掃描...", line_num)
+                        scan_future = self._scan_pool.submit(
+                            self._perform_cwe_scan_for_prompt,
                             project_path=project_path,
                             prompt_line=original_prompt_line,
                             line_number=line_num,
                             round_number=round_number
                         )
-                        if scan_success:
-                            self.logger.info(f"✅ 第 {line_num} 行 CWE 掃描完成")
-                        else:
-                            self.logger.warning(f"⚠️  第 {line_num} 行 CWE 掃描失敗（繼續執行）")
+                        self._pending_scan_futures.append((line_num, scan_future))
+                        self._scan_future_by_file[target_file] = scan_future
                     
                     successful_lines += 1
-                    self.logger.info(f"✅ 第 {line_num}/{total_lines} 行處理完成（發送、等待、複製、儲存、掃描）")
+                    self.logger.info("✅ 第 %s/%s 行處理完成（發送、等待、複製；儲存、掃描於背景進行）", line_num, total_lines)
                     
                     # 步驟7: 準備處理下一行（不需要重新聚焦，Ctrl+A 會自動聚焦到輸入框）
                     
@@ -1279,23 +1721,28 @@ class CopilotHandler:
                     failed_lines.append(error_msg)
                     self.logger.error(error_msg)
             
-            # 所有 prompt line 處理完成
-            self.logger.info(f"✅ 所有 {total_lines} 行 prompt 已發送完成")
-            self.logger.info(f"成功: {successful_lines}/{total_lines} 行")
+            # 所有 prompt line 處理完成（等待背景儲存與掃描，之後才會執行 Undo/Keep）
+            for error_msg in self._wait_pending_saves():
+                successful_lines -= 1
+                failed_lines.append(error_msg)
+            self._wait_pending_scans()
+            self.logger.info("✅ 所有 %s 行 prompt 已發送完成", total_lines)
+            self.logger.info("成功: %s/%s 行", successful_lines, total_lines)
             
             # 注意：Undo/Keep 和開新對話的操作已移至 _process_project_with_project_prompts
             # 在每輪結束後統一處理，避免重複執行
             
             # 處理完成總結
             self.logger.create_separator(f"專案 {project_name} 第 {round_number} 輪處理完成")
-            self.logger.info(f"📊 嘗試處理: {processed_lines}/{total_lines} 行（計入檔案數限制）")
-            self.logger.info(f"✅ 成功處理: {successful_lines}/{processed_lines} 行")
-            if failed_lines:
-                self.logger.warning(f"❌ 失敗行數: {len(failed_lines)}")
+            self.logger.info("📊 嘗試處理: %s/%s 行（計入檔案數限制）", processed_lines, total_lines)
+            self.logger.info("✅ 成功處理: %s/%s 行", successful_lines, processed_lines)
+            failed_count = len(failed_lines)
+            if failed_count:
+                self.logger.warning("❌ 失敗行數: %s", failed_count)
                 for error in failed_lines[:5]:  # 只顯示前5個錯誤
-                    self.logger.warning(f"  • {error}")
-                if len(failed_lines) > 5:
-                    self.logger.warning(f"  ... 還有 {len(failed_lines) - 5} 個錯誤")
+                    self.logger.warning("  • %s", error)
+                if failed_count > 5:
+                    self.logger.warning("  ... 還有 %s 個錯誤", failed_count - 5)
             
             # 返回：是否有成功的行, 實際處理的行數（包括失敗的）, 失敗行列表
             return successful_lines > 0, processed_lines, failed_lines
@@ -1303,8 +1750,57 @@ class CopilotHandler:
         except Exception as e:
             error_msg = f"專案專用模式處理失敗: {str(e)}"
             self.logger.error(error_msg)
+            self._wait_pending_saves()
+            self._wait_pending_scans()
             return False, 0, [error_msg]
     
+    def _wait_pending_saves(self) -> List[str]:
+        """
+        等待所有已提交的背景儲存（及檢查點進度更新）完成
+        
+        Returns:
+            List[str]: 儲存失敗的錯誤訊息列表
+        """
+        errors = []
+        if self._pending_progress_future is not None:
+            wait([self._pending_progress_future])
+            self._pending_progress_future = None
+        if not self._pending_save_futures:
+            return errors
+        
+        wait([future for _, future in self._pending_save_futures])
+        for line_num, future in self._pending_save_futures:
+            if not future.result():
+                error_msg = f"第 {line_num} 行：無法儲存回應到檔案"
+                self.logger.error(error_msg)
+                errors.append(error_msg)
+        self._pending_save_futures.clear()
+        return errors
+    
+    def _wait_pending_scans(self):
+        """等待所有已提交的背景 CWE 掃描完成並記錄結果"""
+        if not self._pending_scan_futures:
+            return
+        
+        self.logger.info("  ⏳ 等待 %s 個背景 CWE 掃描完成...", len(self._pending_scan_futures))
+        wait([future for _, future in self._pending_scan_futures])
+        for line_num, future in self._pending_scan_futures:
+            if future.result():
+                self.logger.info("✅ 第 %s 行 CWE 掃描完成", line_num)
+            else:
+                self.logger.warning("⚠️  第 %s 行 CWE 掃描失敗（繼續執行）", line_num)
+        self._pending_scan_futures.clear()
+        self._scan_future_by_file.clear()
+    
+    def _wait_scan_for_file(self, target_file: str):
+        """等待指定檔案尚未完成的背景 CWE 掃描（避免掃描讀到下一行正在修改中的檔案）"""
+        scan_future = self._scan_future_by_file.pop(target_file, None)
+        if scan_future is None or scan_future.done():
+            return
+        
+        self.logger.info("  ⏳ 等待 %s 的背景 CWE 掃描完成後再處理...", target_file)
+        wait([scan_future])
+    
     def _process_project_with_project_prompts(self, project_path: str, max_rounds: int = None, 
                                             interaction_settings: dict = None, max_lines: int = None) -> Tuple[bool, int]:
         """
@@ -1320,13 +1816,7 @@ class CopilotHandler:
             Tuple[bool, int]: (處理是否成功, 實際處理的行數)
         """
         try:
-            # 導入config以確保作用域可訪問
-            try:
-                from config.config import config
-            except ImportError:
-                from config import config
-            
-            project_name = Path(project_path).name
+            project_name = _project_name(project_path)
             
             # 檢查是否啟用多輪互動
             if not interaction_settings.get("interaction_enabled", True):
@@ -1376,7 +1866,6 @@ class CopilotHandler:
             # 追蹤每一輪的成功狀態
             overall_success = True
             total_processed_lines = 0  # 所有嘗試處理的行數（包括失敗的）
-            total_failed_lines = []
             
             # 進行多輪互動
             for round_num in range(1, max_rounds + 1):
@@ -1393,7 +1882,7 @@ class CopilotHandler:
                 # 處理本輪的按行互動
                 # 注意：process_project_with_line_by_line 返回的第二個值是 processed_lines（包括失敗的）
                 success, processed_lines, failed_lines = self.process_project_with_line_by_line(
-                    project_path, round_number=round_num, max_lines=max_lines
+                    project_path, round_number=round_num, max_lines=max_lines, prompt_lines=prompt_lines
                 )
                 
                 # 累計處理的行數（無論成功或失敗）
@@ -1403,8 +1892,7 @@ class CopilotHandler:
                     self.logger.info(f"✅ 第 {round_num} 輪互動成功（處理 {processed_lines} 行）")
                 else:
                     overall_success = False
-                    total_failed_lines.extend(failed_lines)
-                    self.logger.error(f"❌ 第 {round_num} 輪互動失敗（已處理 {processed_lines} 行）")
+                    self.logger.error(f"❌ 第 {round_num} 輪互動失敗（已處理 {processed_lines} 行，失敗 {len(failed_lines)} 行）")
                     break
                 
                 # 即時更新該輪的 Query 統計資料
@@ -1414,10 +1902,6 @@ class CopilotHandler:
                 
                 # === 每輪結束後：執行 Undo/Keep + 開新對話 ===
                 self.logger.info(f"🔄 第 {round_num} 輪結束，執行 Undo/Keep 並開啟新對話...")
-                try:
-                    from src.cursor_controller import cursor_controller
-                except ImportError:
-                    from cursor_controller import cursor_controller
                 modification_action = interaction_settings.get(
                     "copilot_chat_modification_action", 
                     config.COPILOT_CHAT_MODIFICATION_ACTION
@@ -1471,7 +1955,7 @@ class CopilotHandler:
             Tuple[bool, Optional[str]]: (是否成功, 錯誤訊息或回應內容)
         """
         try:
-            project_name = Path(project_path).name
+            project_name = _project_name(project_path)
             
             # 檢查提示詞來源模式
             interaction_settings = self._load_interaction_settings()
@@ -1521,9 +2005,6 @@ class CopilotHandler:
             ):
                 return False, "無法儲存回應到檔案"
             
-            # 確保檔案寫入完成後再繼續（避免競爭條件）
-            time.sleep(1)
-            
             self.logger.copilot_interaction(f"第 {round_number} 輪處理完成", "SUCCESS", project_name)
             return True, response  # 返回成功狀態和回應內容
             
@@ -1548,17 +2029,7 @@ class CopilotHandler:
         """
         try:
             self.logger.info("清除 Copilot Chat 記錄...")
-            # 使用控制器進行記憶清除，獲取設定參數
-            try:
-                from src.cursor_controller import cursor_controller
-            except ImportError:
-                from cursor_controller import cursor_controller
-            try:
-                from config.config import config
-            except ImportError:
-                from config import config
-            
-            # 獲取修改結果處理設定
+            # 使用控制器進行記憶清除，獲取修改結果處理設定
             modification_action = config.COPILOT_CHAT_MODIFICATION_ACTION
             if self.interaction_settings:
                 modification_action = self.interaction_settings.get("copilot_chat_modification_action", modification_action)
@@ -1581,13 +2052,49 @@ class CopilotHandler:
             str: 新的提示詞
         """
         # 僅將上一輪回應與 base_prompt 直接串接，完全由 prompt2.txt 控制格式
-        if not previous_response or len(previous_response.strip()) < 10:
+        # 回應只 strip 一次（長度檢查與串接共用同一份結果；已去除空白時 strip 不會複製）
+        cleaned_response = previous_response.strip() if previous_response else ""
+        if len(cleaned_response) < 10:
             self.logger.warning("上一輪回應內容過短或為空，使用基礎提示詞")
             return base_prompt
-        cleaned_response = previous_response.strip()
-        # 直接由 prompt2.txt 內容與上一輪回應組成，無自動前後綴
+        # 直接由 prompt2.txt 內容與上一輪回應組成，無自動前後綴（f-string 一次組合出結果）
         return f"{cleaned_response}\n{base_prompt}"
     
+    def _list_round_response_files(self, project_name: str) -> Tuple[Optional[Path], list]:
+        """
+        列出專案的所有輪次回應檔案（*_第*輪.md）及其修改時間
+        
+        以單次 os.scandir 取得檔名與 mtime，並依資料夾 mtime 快取（資料夾內容未變更時不重新掃描）
+        同一份快照同時供「第 N 輪最新檔案」與「全部最新檔案」查詢，列表依 (mtime, 檔名) 由舊到新排序
+        
+        Args:
+            project_name: 專案名稱
+            
+        Returns:
+            Tuple[Optional[Path], list]: (回應資料夾，不存在時為 None, 由舊到新排序的 [(檔案 mtime, 檔名), ...])
+        """
+        result_dir = _SUCCESS_RESULT_ROOT / project_name
+        try:
+            dir_mtime = os.stat(result_dir).st_mtime_ns
+        except OSError:
+            self._response_file_cache.pop(project_name, None)
+            return None, []
+        
+        cached = self._response_file_cache.get(project_name)
+        if cached is not None and cached[0] == dir_mtime:
+            return result_dir, cached[1]
+        
+        entries = []
+        with os.scandir(result_dir) as it:
+            for entry in it:
+                name = entry.name
+                # 等同 glob("*_第*輪.md")："輪.md" 結尾且前面含 "_第"
+                if name.endswith("輪.md") and "_第" in name[:-4]:
+                    entries.append((entry.stat().st_mtime, name))
+        entries.sort()
+        self._response_file_cache[project_name] = (dir_mtime, entries)
+        return result_dir, entries
+    
     def _read_previous_round_response(self, project_path: str, round_number: int) -> Optional[str]:
         """
         讀取指定輪數的 Copilot 回應內容
@@ -1600,29 +2107,26 @@ class CopilotHandler:
             Optional[str]: Copilot 回應內容，如果讀取失敗則返回 None
         """
         try:
-            project_name = Path(project_path).name
-            script_root = Path(__file__).parent.parent
-            execution_result_dir = script_root / "ExecutionResult" / "Success" / project_name
+            execution_result_dir, entries = self._list_round_response_files(_project_name(project_path))
             
-            # 尋找該輪次的檔案（使用萬用字元匹配時間戳記）
-            pattern = f"*_第{round_number}輪.md"
-            matching_files = list(execution_result_dir.glob(pattern))
+            # 尋找該輪次的檔案（檔名為 {時間戳記}_第N輪.md）
+            # 快照已由舊到新排序：從最新往回找到的第一個符合檔案即為該輪最新的檔案
+            suffix = f"_第{round_number}輪.md"
+            latest_name = next((name for _, name in reversed(entries) if name.endswith(suffix)), None)
             
-            if not matching_files:
+            if latest_name is None:
                 self.logger.warning(f"找不到第 {round_number} 輪的回應檔案")
                 return None
             
-            # 取最新的檔案（如果有多個）
-            latest_file = max(matching_files, key=lambda x: x.stat().st_mtime)
+            latest_file = execution_result_dir / latest_name
             
             # 讀取檔案內容並提取 Copilot 回應部分
             with open(latest_file, 'r', encoding='utf-8') as f:
                 content = f.read()
             
             # 提取 "## Copilot 回應" 之後的內容
-            response_marker = "## Copilot 回應\n\n"
-            if response_marker in content:
-                response_content = content.split(response_marker, 1)[1]
+            _, marker, response_content = content.partition(_RESPONSE_MARKER)
+            if marker:
                 self.logger.debug(f"成功讀取第 {round_number} 輪回應內容 (長度: {len(response_content)} 字元)")
                 return response_content.strip()
             else:
@@ -1644,22 +2148,14 @@ class CopilotHandler:
             Optional[Path]: 檔案路徑，若無檔案則返回 None
         """
         try:
-            project_name = Path(project_path).name
-            script_root = Path(__file__).parent.parent  # 腳本根目錄
-            project_result_dir = script_root / "ExecutionResult" / "Success" / project_name
-            
-            if not project_result_dir.exists():
-                return None
-            
-            # 找出所有回應檔案
-            response_files = list(project_result_dir.glob("*_第*輪.md"))
+            # 找出所有回應檔案（快取的檔名與修改時間）
+            project_result_dir, response_files = self._list_round_response_files(_project_name(project_path))
             
             if not response_files:
                 return None
                 
-            # 根據修改時間排序，取最新的
-            latest_file = max(response_files, key=lambda f: f.stat().st_mtime)
-            return latest_file
+            # 快照已依修改時間排序，最後一項即為最新的
+            return project_result_dir / response_files[-1][1]
             
         except Exception as e:
             self.logger.error(f"獲取最新回應檔案失敗: {str(e)}")
@@ -1684,17 +2180,15 @@ class CopilotHandler:
             with open(latest_file, 'r', encoding='utf-8') as f:
                 content = f.read()
                 
-            # 提取 Copilot 回應部分
-            response_marker = "## Copilot 回應\n\n"
-            if response_marker in content:
-                response = content.split(response_marker)[1]
-                return response
+            # 提取 Copilot 回應部分（標記之後、下一個相同標記之前的內容）
+            _, marker, tail = content.partition(_RESPONSE_MARKER)
+            if marker:
+                return tail.partition(_RESPONSE_MARKER)[0]
                 
             # 舊格式檔案處理
-            separator = "=" * 50 + "\n\n"
-            if separator in content:
-                response = content.split(separator)[1]
-                return response
+            _, marker, tail = content.partition(_RESULT_SEPARATOR)
+            if marker:
+                return tail.partition(_RESULT_SEPARATOR)[0]
                 
             return None
             
@@ -1709,19 +2203,21 @@ class CopilotHandler:
         Returns:
             dict: 互動設定字典
         """
-        # 導入config以確保作用域可訪問
-        try:
-            from config.config import config
-        except ImportError:
-            from config import config
-        
         # 優先使用外部設定（來自 UI）
         if self.interaction_settings is not None:
             self.logger.info(f"使用外部提供的互動設定: {self.interaction_settings}")
             return self.interaction_settings
         
-        # 如果沒有外部設定，使用檔案或預設值
+        # 如果沒有外部設定，使用檔案或預設值（依檔案 mtime 快取，未變更時直接返回）
         settings_file = config.PROJECT_ROOT / "config" / "interaction_settings.json"
+        try:
+            mtime = settings_file.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        cached = self._interaction_settings_cache
+        if cached is not None and cached[0] == mtime:
+            return dict(cached[1])
+        
         default_settings = {
             "interaction_enabled": config.INTERACTION_ENABLED,
             "max_rounds": config.INTERACTION_MAX_ROUNDS,
@@ -1729,19 +2225,19 @@ class CopilotHandler:
             "round_delay": config.INTERACTION_ROUND_DELAY
         }
         
-        if settings_file.exists():
+        if mtime is not None:
             try:
-                import json
-                with open(settings_file, 'r', encoding='utf-8') as f:
-                    loaded_settings = json.load(f)
-                    default_settings.update(loaded_settings)
-                    self.logger.info(f"已載入互動設定檔案: {loaded_settings}")
+                raw = settings_file.read_bytes()
+                loaded_settings = orjson.loads(raw) if orjson is not None else json.loads(raw)
+                default_settings.update(loaded_settings)
+                self.logger.info(f"已載入互動設定檔案: {loaded_settings}")
             except Exception as e:
                 self.logger.warning(f"載入互動設定時發生錯誤，使用預設值: {e}")
         else:
             self.logger.info("未找到互動設定檔案，使用預設值")
         
-        return default_settings
+        self._interaction_settings_cache = (mtime, default_settings)
+        return dict(default_settings)
 
     def process_project_with_iterations(self, project_path: str, max_rounds: int = None, max_lines: int = None) -> Tuple[bool, int]:
         """
@@ -1756,12 +2252,6 @@ class CopilotHandler:
             Tuple[bool, int]: (處理是否成功, 實際處理的行數)
         """
         try:
-            # 導入config以確保作用域可訪問
-            try:
-                from config.config import config
-            except ImportError:
-                from config import config
-            
             # 載入互動設定
             interaction_settings = self._load_interaction_settings()
             
@@ -1787,7 +2277,7 @@ class CopilotHandler:
             round_delay = interaction_settings["round_delay"]
             include_previous_response = interaction_settings["include_previous_response"]
                 
-            project_name = Path(project_path).name
+            project_name = _project_name(project_path)
             self.logger.create_separator(f"開始處理專案 {project_name}，計劃互動 {max_rounds} 輪")
             self.logger.info(f"回應串接功能: {'啟用' if include_previous_response else '停用'}")
             
@@ -1797,6 +2287,14 @@ class CopilotHandler:
                 self.logger.error("無法讀取第一輪基礎提示詞")
                 return False, 0
             
+            # 讀取第二輪以後使用的提示詞（每輪內容相同，只在迴圈外讀取一次；只有一輪時不需要）
+            round2_prompt = None
+            if max_rounds > 1:
+                round2_prompt = self._load_prompt_from_file(round_number=2)
+                if not round2_prompt:
+                    self.logger.warning("無法讀取第二輪提示詞，使用第一輪提示詞")
+                    round2_prompt = base_prompt
+            
             # 追蹤每一輪的成功狀態
             success_count = 0
             last_response = None
@@ -1812,11 +2310,6 @@ class CopilotHandler:
                     self.logger.info(f"第 {round_num} 輪：使用第一輪提示詞 (prompt1.txt)")
                 else:
                     # 第二輪以後：使用 prompt2.txt
-                    round2_prompt = self._load_prompt_from_file(round_number=2)
-                    if not round2_prompt:
-                        self.logger.warning("無法讀取第二輪提示詞，使用第一輪提示詞")
-                        round2_prompt = base_prompt
-                    
                     current_prompt = round2_prompt
                     self.logger.info(f"第 {round_num} 輪：使用第二輪提示詞 (prompt2.txt)")
                     
@@ -1833,16 +2326,6 @@ class CopilotHandler:
                 
                 if round_num > 1:
                     # 清除 Copilot 記憶（每輪獨立），使用正確的設定參數
-                    try:
-                        from src.cursor_controller import cursor_controller
-                    except ImportError:
-                        from cursor_controller import cursor_controller
-                    try:
-                        from config.config import config
-                    except ImportError:
-                        from config import config
-                    
-                    # 獲取修改結果處理設定
                     modification_action = config.COPILOT_CHAT_MODIFICATION_ACTION
                     if self.interaction_settings:
                         modification_action = self.interaction_settings.get("copilot_chat_modification_action", modification_action)
@@ -1913,10 +2396,10 @@ class CopilotHandler:
             bool: 掃描是否成功
         """
         try:
-            project_name = Path(project_path).name
+            project_name = _project_name(project_path)
             cwe_type = self.cwe_scan_settings.get("cwe_type", "022")
             
-            self.logger.debug(f"開始 CWE-{cwe_type} 函式級別掃描: 第 {round_number} 輪 / 第 {line_number} 行")
+            self.logger.debug("開始 CWE-%s 函式級別掃描: 第 %s 輪 / 第 %s 行", cwe_type, round_number, line_number)
             
             # 使用函式級別掃描
             success, result_file = self.cwe_scan_manager.scan_from_prompt_function_level(
@@ -1929,33 +2412,21 @@ class CopilotHandler:
             )
             
             if not success:
-                self.logger.warning(f"第 {line_number} 行函式級別掃描失敗")
+                self.logger.warning("第 %s 行函式級別掃描失敗", line_number)
                 return False
             
-            self.logger.info(f"✅ 第 {line_number} 行函式級別掃描完成")
+            self.logger.info("✅ 第 %s 行函式級別掃描完成", line_number)
             return True
             
         except Exception as e:
-            self.logger.error(f"CWE 函式級別掃描執行失敗: {e}", exc_info=True)
+            self.logger.error("CWE 函式級別掃描執行失敗: %s", e, exc_info=True)
             return False
 
 # 創建全域實例
 copilot_handler = CopilotHandler()
 
-# 便捷函數
-def process_project_with_copilot(project_path: str, use_smart_wait: bool = None) -> Tuple[bool, Optional[str]]:
-    """處理專案的便捷函數"""
-    return copilot_handler.process_project_complete(project_path, use_smart_wait)
-
-def send_copilot_prompt(prompt: str = None) -> bool:
-    """發送提示詞的便捷函數"""
-    return copilot_handler.send_prompt(prompt)
-
-def wait_for_copilot_response(timeout: int = None, use_smart_wait: bool = None) -> bool:
-    """等待回應的便捷函數"""
-    return copilot_handler.wait_for_response(timeout, use_smart_wait)
-    
-def process_with_iterations(project_path: str, max_rounds: int = None) -> bool:
-    """多輪互動處理的便捷函數"""
-    return copilot_handler.process_project_with_iterations(project_path, max_rounds)
-    return copilot_handler.process_project_with_iterations(project_path, max_rounds)
\ No newline at end of file
+# 便捷函數（直接綁定全域實例的方法，呼叫時不經過額外的轉發函數）
+process_project_with_copilot = copilot_handler.process_project_complete  # 處理專案
+send_copilot_prompt = copilot_handler.send_prompt  # 發送提示詞
+wait_for_copilot_response = copilot_handler.wait_for_response  # 等待回應
+process_with_iterations = copilot_handler.process_project_with_iterations  # 多輪互動處理
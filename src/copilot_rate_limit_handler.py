@@ -5,7 +5,9 @@ Copilot Rate Limit Handler - 簡單的回應檢測和重試機制
 
 import time
 import re
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Optional
 import sys
 
 sys.path.append(str(Path(__file__).parent.parent))
@@ -16,6 +18,18 @@ COMPLETION_MARKER = "已完成回答"
 COMPLETION_MARKER_en = "Response completed"
 REFUSAL_MARKER = "Sorry, I can't assist with that."
 
+# 完成標記通常位於回應結尾（提示詞要求 Copilot 最後輸出），先檢查結尾這段長度的內容
+_MARKER_TAIL_WINDOW = 512
+
+# 退避等待秒數表（依 retry_count 查表：10 × 6^(retry_count // 2)，上限 2160 秒）
+_BACKOFF_TABLE = (10, 10, 60, 60, 360, 360, 2160)
+
+# 可中斷等待時檢查停止請求的間隔（秒）
+_STOP_CHECK_INTERVAL = 1.0
+
+# markdown Python 代碼塊（預先編譯）
+_CODE_BLOCK_RE = re.compile(r'```(?:python|py)?\s*\n(.*?)```', re.DOTALL)
+
 
 def _contains_complete_code(response: str) -> bool:
     """
@@ -33,14 +47,11 @@ def _contains_complete_code(response: str) -> bool:
     Returns:
         bool: True = 包含完整代碼
     """
-    # 先嘗試從 markdown 代碼塊中提取代碼
-    code_block_pattern = r'```(?:python|py)?\s*\n(.*?)```'
-    matches = re.findall(code_block_pattern, response, re.DOTALL)
-    
-    # 如果有 markdown 代碼塊，檢查其中的代碼
-    if matches:
-        for code_block in matches:
-            if _is_complete_python_code(code_block):
+    # 先檢查 markdown 代碼塊（沒有 ``` 標記時略過正則掃描）
+    # 逐一取出代碼塊，找到第一個完整代碼塊即返回，不建立所有代碼塊的列表
+    if '```' in response:
+        for match in _CODE_BLOCK_RE.finditer(response):
+            if _is_complete_python_code(match.group(1)):
                 return True
     
     # 如果沒有 markdown 標記，直接檢查整個回應是否為完整代碼
@@ -51,9 +62,13 @@ def _contains_complete_code(response: str) -> bool:
     return False
 
 
+# 超過此長度的代碼不放入快取（避免快取保留過大的字串）
+_CODE_CHECK_CACHE_MAX_LEN = 1_000_000
+
+
 def _is_complete_python_code(code: str) -> bool:
     """
-    檢查是否為完整的 Python 代碼
+    檢查是否為完整的 Python 代碼（重試期間相同內容會重複檢查，結果以 LRU 快取）
     
     完整代碼的判斷標準（滿足任一即可）：
     1. 有函數定義 (def) 且有 return 語句
@@ -66,34 +81,32 @@ def _is_complete_python_code(code: str) -> bool:
     Returns:
         bool: True = 完整的 Python 代碼
     """
+    if len(code) > _CODE_CHECK_CACHE_MAX_LEN:
+        return _check_python_code(code)
+    return _check_python_code_cached(code)
+
+
+def _check_python_code(code: str) -> bool:
+    """_is_complete_python_code 的實際判斷邏輯"""
     code = code.strip()
     
     # 最小長度檢查（太短的代碼片段不算完整）
     if len(code) < 80:
         return False
     
-    has_def = 'def ' in code
-    has_return = 'return ' in code
-    has_docstring = '"""' in code or "'''" in code
-    has_import = 'import ' in code
+    # 依條件短路判斷，只在需要時才掃描其他關鍵字（長回應通常只需掃描一次）
+    if 'def ' in code:
+        # 有函數定義且代碼足夠長（≥150 字元），視為完整
+        if len(code) >= 150:
+            return True
+        # 有函數定義且有 return 或 docstring（函數可能沒有顯式 return），視為完整
+        return 'return ' in code or '"""' in code or "'''" in code
     
-    # 有函數定義且有 return，視為完整
-    if has_def and has_return:
-        return True
-    
-    # 有函數定義且有 docstring，視為完整（函數可能沒有顯式 return）
-    if has_def and has_docstring:
-        return True
-    
-    # 代碼足夠長且包含 import，可能是完整的代碼片段
-    if len(code) >= 200 and has_import:
-        return True
-    
-    # 有函數定義且代碼足夠長（≥150 字元），視為完整
-    if has_def and len(code) >= 150:
-        return True
-    
-    return False
+    # 沒有函數定義：代碼足夠長且包含 import，可能是完整的代碼片段
+    return len(code) >= 200 and 'import ' in code
+
+
+_check_python_code_cached = lru_cache(maxsize=128)(_check_python_code)
 
 
 def is_response_incomplete(response: str) -> bool:
@@ -115,6 +128,12 @@ def is_response_incomplete(response: str) -> bool:
     if not response:
         return True
 
+    # 完成標記通常在結尾：先只掃描結尾片段，長回應不必從頭掃描整段
+    if len(response) > _MARKER_TAIL_WINDOW:
+        tail = response[-_MARKER_TAIL_WINDOW:]
+        if COMPLETION_MARKER in tail or COMPLETION_MARKER_en in tail:
+            return False
+
     # 只要回應中包含完成標記，就算完成
     if COMPLETION_MARKER in response or COMPLETION_MARKER_en in response:
         return False
@@ -130,7 +149,27 @@ def is_response_incomplete(response: str) -> bool:
     return True
 
 
-def wait_and_retry(seconds: int, line_number: int, round_number: int, logger, retry_count: int = 0):
+def _wait_interruptible(seconds: float, should_stop: Optional[Callable[[], bool]]) -> bool:
+    """
+    等待指定秒數；提供 should_stop 時每秒檢查一次，收到停止請求即提前返回
+    
+    Returns:
+        bool: 完整等待返回 True，收到停止請求返回 False
+    """
+    if should_stop is None:
+        time.sleep(seconds)
+        return True
+    end = time.monotonic() + seconds
+    while not should_stop():
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return True
+        time.sleep(min(_STOP_CHECK_INTERVAL, remaining))
+    return False
+
+
+def wait_and_retry(seconds: int, line_number: int, round_number: int, logger, retry_count: int = 0,
+                   should_stop: Optional[Callable[[], bool]] = None) -> bool:
     """
     等待指定時間並顯示倒數（改良版指數退避策略）
     
@@ -140,6 +179,10 @@ def wait_and_retry(seconds: int, line_number: int, round_number: int, logger, re
         round_number: 互動輪數
         logger: 日誌記錄器
         retry_count: 當前是第幾次重試（0開始）
+        should_stop: 停止請求檢查函數（例如緊急停止旗標），等待期間每秒檢查一次
+        
+    Returns:
+        bool: 完整等待返回 True，等待期間收到停止請求返回 False
         
     Note:
         改良版指數退避策略：每個時間階段重複一次，最大上限 2160 秒
@@ -148,33 +191,33 @@ def wait_and_retry(seconds: int, line_number: int, round_number: int, logger, re
         - retry_count=4,5: 360秒（6分鐘）
         - retry_count=6,7,8,9: 2160秒（36分鐘，達到上限）
         
-        計算公式：
-        1. 計算階段：stage = retry_count // 2
-        2. 計算基礎時間：base_time = 10 * (6 ^ stage)
-        3. 應用上限：min(base_time, 2160)
+        等待時間由 _BACKOFF_TABLE 查表取得（10 × 6^(retry_count // 2)，上限 2160 秒），
+        超出表格範圍的重試次數一律使用最後一項
     """
-    # 改良版指數退避策略：每個階段重複一次，並設置上限
+    # 改良版指數退避策略：每個階段重複一次，並設置上限（查表，不重複計算乘冪）
     stage = retry_count // 2  # 每兩次重試進入下一個階段
-    base_time = 10 * (6 ** stage)
-    actual_wait_seconds = min(base_time, 2160)  # 最大等待時間為 2160 秒
+    actual_wait_seconds = _BACKOFF_TABLE[min(retry_count, len(_BACKOFF_TABLE) - 1)]
     
-    logger.warning(f"⏳ 回應不完整，等待 {actual_wait_seconds} 秒後重試 [輪次: {round_number}, 行號: {line_number}, 重試次數: {retry_count + 1}]")
-    logger.info(f"   📊 改良版指數退避策略: stage={stage}, 10 × 6^{stage} = {base_time} 秒 → 實際等待 {actual_wait_seconds} 秒")
+    logger.warning("⏳ 回應不完整，等待 %s 秒後重試 [輪次: %s, 行號: %s, 重試次數: %s]",
+                   actual_wait_seconds, round_number, line_number, retry_count + 1)
+    logger.info("   📊 改良版指數退避策略: stage=%s → 實際等待 %s 秒", stage, actual_wait_seconds)
+    logger.info("   開始等待 %s 秒...", actual_wait_seconds)
     
-    # 每60秒顯示一次進度
+    # 每60秒顯示一次進度（日誌使用延遲格式化，未輸出時不組合字串）
     remaining = actual_wait_seconds
-    while remaining > 0:
+    while True:
         chunk = min(60, remaining)
-        if remaining == actual_wait_seconds:
-            logger.info(f"   開始等待 {actual_wait_seconds} 秒...")
-        else:
-            minutes = remaining // 60
-            secs = remaining % 60
-            if minutes > 0:
-                logger.info(f"   剩餘 {minutes} 分 {secs} 秒...")
-            else:
-                logger.info(f"   剩餘 {remaining} 秒...")
-        time.sleep(chunk)
+        if not _wait_interruptible(chunk, should_stop):
+            logger.warning("   ⏹ 收到停止請求，中止退避等待")
+            return False
         remaining -= chunk
+        if remaining <= 0:
+            break
+        minutes, secs = divmod(remaining, 60)
+        if minutes > 0:
+            logger.info("   剩餘 %s 分 %s 秒...", minutes, secs)
+        else:
+            logger.info("   剩餘 %s 秒...", remaining)
     
-    logger.info(f"   ✓ 等待完成，準備第 {retry_count + 1} 次重試")
+    logger.info("   ✓ 等待完成，準備第 %s 次重試", retry_count + 1)
+    return True
@@ -5,9 +5,10 @@ Hybrid UI Automation Script - VS Code 操作控制模組
 """
 
 import subprocess
+import shutil
 import time
 import os
-import pyautogui
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 import sys
@@ -18,17 +19,98 @@ try:
     from config.config import config
     from src.logger import get_logger
     from src.cursor_ui_initializer import initialize_cursor_ui
+    from src import window_detector
+    from src import fast_input
 except ImportError:
     try:
         from config import config
         from logger import get_logger
         from cursor_ui_initializer import initialize_cursor_ui
+        import window_detector
+        import fast_input
     except ImportError:
         import sys
         sys.path.append(str(Path(__file__).parent.parent / "config"))
         import config
         from logger import get_logger
         from cursor_ui_initializer import initialize_cursor_ui
+        import window_detector
+        import fast_input
+
+# 編輯器視窗標題的結尾（例如 "main.py - 專案名稱 - Windsurf"；名稱取自可執行檔，比對時不分大小寫）
+# 只比對結尾，標題中僅包含編輯器名稱的其他視窗（例如本工具 Windsurf_AIChatAutoInteraction 的終端機）不會被誤判
+_EDITOR_TITLE_SUFFIX = f" - {Path(config.VSCODE_EXECUTABLE).stem}"
+
+def _project_title_keyword(project_name: str) -> str:
+    """專案視窗標題中專案名稱的部分（比對時須位於標題開頭或 " - " 之後，見 window_detector._title_matches）"""
+    return f"{project_name} - "
+
+@lru_cache(maxsize=4)
+def _resolve_executable(executable: str) -> str:
+    """
+    將編輯器可執行檔解析為絕對路徑（以設定值為鍵快取，PATH 只搜尋一次）
+    
+    設定值變更時會以新的鍵重新解析；PATH 或安裝位置變更時呼叫 invalidate_executable_cache
+    """
+    return shutil.which(executable) or executable
+
+def invalidate_executable_cache():
+    """清除可執行檔路徑快取（PATH 或編輯器安裝位置在執行期間變更時使用）"""
+    _resolve_executable.cache_clear()
+
+@lru_cache(maxsize=32)
+def _command_key_events(command_type: str, keys: tuple) -> tuple:
+    """
+    將清除記憶命令轉為按鍵事件序列（同一命令只轉換一次）
+    
+    Args:
+        command_type: 'hotkey'（依序按下再反向放開）或 'key'（單鍵按下放開）
+        keys: 按鍵名稱
+        
+    Returns:
+        tuple: [(動作, 鍵名), ...]，動作為 'down' 或 'up'
+    """
+    if command_type == 'hotkey':
+        return tuple(('down', key) for key in keys) + tuple(('up', key) for key in reversed(keys))
+    return (('down', keys[0]), ('up', keys[0]))
+
+# Super+Up 最大化視窗的按鍵事件
+_MAXIMIZE_KEY_EVENTS = (('down', 'win'), ('down', 'up'), ('up', 'up'), ('up', 'win'))
+
+# 啟動編輯器時額外加入的環境變數（提高穩定性）
+_LAUNCH_ENV_OVERRIDES = {
+    'ELECTRON_DISABLE_SECURITY_WARNINGS': '1',
+    'ELECTRON_NO_ATTACH_CONSOLE': '1',
+}
+
+def _spawn_detached(cmd: list, cwd: str) -> subprocess.Popen:
+    """
+    啟動編輯器進程（不建立管線，輸出導向 DEVNULL）
+    
+    POSIX 上 subprocess 已以 vfork + exec 啟動（不複製父進程記憶體）；os.posix_spawn 無法指定
+    工作目錄，因此仍使用 Popen。Windows 上啟動 .cmd / .bat 啟動器時不建立主控台視窗
+    """
+    env = {**os.environ, **_LAUNCH_ENV_OVERRIDES}
+    creationflags = 0
+    if sys.platform == 'win32' and cmd[0].lower().endswith(('.cmd', '.bat')):
+        creationflags = subprocess.CREATE_NO_WINDOW
+    return subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=cwd,
+        env=env,
+        creationflags=creationflags
+    )
+
+def _hotkey(*keys: str) -> None:
+    """送出組合鍵（取代 pyautogui.hotkey，不套用全域 PAUSE）"""
+    fast_input.send_sequence(_command_key_events('hotkey', keys))
+
+def _press(key: str) -> None:
+    """按下並放開單一按鍵（取代 pyautogui.press，不套用全域 PAUSE）"""
+    fast_input.send_sequence(_command_key_events('key', (key,)))
 
 class CursorController:
     """Cursor 操作控制器"""
@@ -37,6 +119,8 @@ class CursorController:
         """初始化 Cursor 控制器"""
         self.logger = get_logger("CursorController")
         self.current_project_path = None
+        self.window_handle = None  # 目前專案視窗代碼（由視窗偵測取得，無法偵測時為 None）
+        self._process = None  # open_project 啟動的進程（無法偵測視窗時用來判斷編輯器是否已關閉）
         self.logger.info("Cursor 控制器初始化完成")
     
     
@@ -55,31 +139,21 @@ class CursorController:
             project_path = Path(project_path)
             self.logger.info(f"開啟專案: {project_path.name}")
             
-            # 設置環境變量以提高穩定性
-            env = os.environ.copy()
-            env['ELECTRON_DISABLE_SECURITY_WARNINGS'] = '1'
-            env['ELECTRON_NO_ATTACH_CONSOLE'] = '1'
-            
             # 使用命令列開啟專案
-            cmd = [config.VSCODE_EXECUTABLE, str(project_path)]
+            cmd = [_resolve_executable(config.VSCODE_EXECUTABLE), str(project_path)]
             self.logger.debug(f"執行命令: {' '.join(cmd)}")
             
-            # 直接啟動 Cursor
-            subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                cwd=str(project_path.parent),
-                env=env
-            )
+            # 直接啟動 Cursor（環境變數在 _spawn_detached 中設定）
+            self._process = _spawn_detached(cmd, str(project_path.parent))
             
             self.logger.info("🎯 專案進程已啟動")
             self.current_project_path = str(project_path)
+            self.window_handle = None
             
             if wait_for_load:
-                # 等待 Cursor 啟動
+                # 等待 Cursor 視窗出現（最多 VSCODE_STARTUP_DELAY 秒，不支援偵測時固定等待）
                 self.logger.info("等待 Cursor 啟動...")
-                time.sleep(config.VSCODE_STARTUP_DELAY)
+                self._wait_for_project_window(project_path.name, config.VSCODE_STARTUP_DELAY)
                 
                 # 最大化視窗
                 self.logger.info("正在最大化視窗...")
@@ -93,6 +167,33 @@ class CursorController:
             self.logger.error(f"啟動 Cursor 過程中發生錯誤: {str(e)}")
             return False
     
+    def _wait_for_project_window(self, project_name: str, timeout: float) -> bool:
+        """
+        等待專案視窗出現：偵測到視窗後只再等待短暫的介面載入時間即返回
+        
+        Args:
+            project_name: 專案名稱（視窗標題會包含專案資料夾名稱）
+            timeout: 等待視窗出現的上限（秒）
+            
+        Returns:
+            bool: 是否偵測到視窗（不支援偵測時固定等待 timeout 秒並返回 False）
+        """
+        if not window_detector.is_available():
+            time.sleep(timeout)
+            return False
+        
+        start_time = time.monotonic()
+        handle = window_detector.wait_for_window(_project_title_keyword(project_name), timeout,
+                                                 title_suffix=_EDITOR_TITLE_SUFFIX)
+        if handle is None:
+            self.logger.warning(f"{timeout} 秒內未偵測到 {project_name} 的視窗，繼續執行")
+            return False
+        
+        self.window_handle = handle
+        self.logger.info(f"偵測到專案視窗（{time.monotonic() - start_time:.2f} 秒）")
+        time.sleep(config.VSCODE_WINDOW_SETTLE_DELAY)
+        return True
+    
     def close_current_project(self) -> bool:
         """
         關閉當前專案（使用 Ctrl+Shift+W 快捷鍵）
@@ -109,10 +210,14 @@ class CursorController:
             self.logger.info("🎯 使用 Ctrl+Shift+W 關閉 Cursor 視窗...")
             
             # 發送 Ctrl+Shift+W 快捷鍵關閉當前視窗
-            pyautogui.hotkey('ctrl', 'shift', 'w')
+            _hotkey('ctrl', 'shift', 'w')
             
-            # 等待一小段時間讓關閉操作生效
-            time.sleep(2)
+            # 等待關閉操作生效：可偵測視窗時等到專案視窗消失（最多 2 秒），否則固定等待
+            if window_detector.is_available():
+                window_detector.wait_for_window_closed(_project_title_keyword(Path(self.current_project_path).name), 2,
+                                                       title_suffix=_EDITOR_TITLE_SUFFIX)
+            else:
+                time.sleep(2)
             
             self.logger.info("✅ 已發送關閉視窗快捷鍵")
             
@@ -135,21 +240,30 @@ class CursorController:
         try:
             self.logger.info("確保乾淨的執行環境...")
             
-            # 使用簡單的快捷鍵關閉所有 Cursor 視窗
-            # 發送多次 Ctrl+Shift+W 確保關閉所有視窗
-            for i in range(3):
-                try:
-                    pyautogui.hotkey('ctrl', 'shift', 'w')
-                    time.sleep(1)
-                    self.logger.debug(f"發送關閉快捷鍵 ({i+1}/3)")
-                except Exception as e:
-                    self.logger.debug(f"發送快捷鍵失敗: {e}")
-            
-            time.sleep(2)  # 等待關閉操作完成
-            self.logger.info("✅ 環境清理完成")
+            # 可偵測視窗且已沒有編輯器視窗時，不送出快捷鍵（避免按鍵落到其他應用程式）
+            if window_detector.is_available() and window_detector.find_window("", title_suffix=_EDITOR_TITLE_SUFFIX) is None:
+                self.logger.info("✅ 沒有開啟中的編輯器視窗，環境已乾淨")
+            else:
+                # 使用簡單的快捷鍵關閉所有 Cursor 視窗
+                # 發送最多 3 次 Ctrl+Shift+W，每次送出後等待關閉完成即停止
+                closed = False
+                for i in range(3):
+                    try:
+                        _hotkey('ctrl', 'shift', 'w')
+                        self.logger.debug(f"發送關閉快捷鍵 ({i+1}/3)")
+                    except Exception as e:
+                        self.logger.debug(f"發送快捷鍵失敗: {e}")
+                    if self._wait_for_editor_closed(1):
+                        closed = True
+                        break
+                
+                if not closed:
+                    time.sleep(2)  # 無法確認關閉時，等待關閉操作完成
+                self.logger.info("✅ 環境清理完成")
             
             # 清理狀態
             self.current_project_path = None
+            self.window_handle = None
             
             return True
                 
@@ -157,6 +271,33 @@ class CursorController:
             self.logger.error(f"清理環境時發生錯誤: {str(e)}")
             return False
     
+    def _wait_for_editor_closed(self, timeout: float) -> bool:
+        """
+        送出關閉快捷鍵後等待編輯器關閉
+        
+        可偵測視窗時等待編輯器視窗消失；否則若 open_project 啟動的進程仍在執行，
+        等待該進程結束（作業系統通知，不輪詢）；兩者皆不可用時固定等待 timeout 秒
+        
+        Args:
+            timeout: 等待上限（秒）
+            
+        Returns:
+            bool: 是否確認編輯器已關閉
+        """
+        if window_detector.is_available():
+            return window_detector.wait_for_window_closed("", timeout, title_suffix=_EDITOR_TITLE_SUFFIX)
+        
+        if self._process is not None and self._process.poll() is None:
+            try:
+                self._process.wait(timeout=timeout)
+                self._process = None
+                return True
+            except subprocess.TimeoutExpired:
+                return False
+        
+        time.sleep(timeout)
+        return False
+    
     def _maximize_window_direct(self) -> bool:
         """
         直接最大化視窗，不影響既有畫面
@@ -167,11 +308,12 @@ class CursorController:
         try:
             self.logger.info("正在最大化 VS Code 視窗...")
             
-            # 使用 Super+Up 快捷鍵最大化視窗
-            pyautogui.keyDown('win')
-            pyautogui.press('up')
-            pyautogui.keyUp('win')
-            time.sleep(0.5)
+            # 使用 Super+Up 快捷鍵最大化視窗（四個按鍵事件一次送出）
+            fast_input.send_sequence(_MAXIMIZE_KEY_EVENTS)
+            
+            # 可查詢視窗狀態時（Windows 且已偵測到視窗）等到最大化為止，否則固定等待
+            if window_detector.wait_for_maximized(self.window_handle, 0.3) is None:
+                time.sleep(0.5)
             
             self.logger.info("✅ 視窗最大化完成")
             return True
@@ -224,11 +366,14 @@ class CursorController:
         try:
             self.logger.debug(f"等待 VS Code 準備就緒 (超時: {timeout}秒)")
             
-            start_time = time.time()
-            
-            # 簡單等待指定時間
-            time.sleep(min(timeout, 10))  # 最多等待10秒
-            self.logger.debug("VS Code 等待完成")
+            # 偵測目前專案的視窗；無法偵測時沿用固定等待（最多 10 秒）
+            if self.current_project_path and window_detector.is_available():
+                if self._wait_for_project_window(Path(self.current_project_path).name, timeout):
+                    self.logger.debug("VS Code 等待完成")
+                    return True
+            else:
+                time.sleep(min(timeout, 10))  # 最多等待10秒
+                self.logger.debug("VS Code 等待完成")
             
             self.logger.warning(f"VS Code 在 {timeout} 秒內未準備就緒")
             return False
@@ -264,7 +409,7 @@ class CursorController:
         try:
             self.logger.debug("儲存所有檔案...")
             
-            pyautogui.hotkey('ctrl', 'shift', 's')  # Ctrl+Shift+S 儲存全部
+            _hotkey('ctrl', 'shift', 's')  # Ctrl+Shift+S 儲存全部
             time.sleep(1)
             
             self.logger.debug("所有檔案已儲存")
@@ -283,13 +428,12 @@ class CursorController:
         """
         try:
             # 嘗試使用 Alt+Tab 切換到 VS Code
-            pyautogui.hotkey('alt', 'tab')
-            time.sleep(0.5)
+            _hotkey('alt', 'tab')
+            time.sleep(0.5)  # 等待視窗切換完成
             
             # 不再點擊螢幕中央，避免不必要的滑鼠操作
-            # 改用鍵盤確保聚焦
-            pyautogui.press('ctrl')  # 簡單的鍵盤操作確保視窗聚焦
-            time.sleep(0.5)
+            # 改用鍵盤確保聚焦（單獨的 Ctrl 不觸發任何動作，之後不需再等待）
+            _press('ctrl')  # 簡單的鍵盤操作確保視窗聚焦
             
             self.logger.debug("VS Code 視窗已聚焦")
             return True
@@ -329,15 +473,24 @@ class CursorController:
             # 步驟2: 執行清除記憶命令序列
             self.logger.info("執行 Copilot Chat 清除命令序列...")
             
-            for i, command in enumerate(config.COPILOT_CLEAR_MEMORY_COMMANDS):
+            # 連續且無延遲的命令合併為一批按鍵事件一次送出，只在需要等待時才送出並暫停
+            pending_events = []
+            for command in config.COPILOT_CLEAR_MEMORY_COMMANDS:
                 if command['type'] == 'hotkey':
-                    pyautogui.hotkey(*command['keys'])
+                    pending_events.extend(_command_key_events('hotkey', tuple(command['keys'])))
                     self.logger.debug(f"執行快捷鍵: {'+'.join(command['keys'])}")
                 elif command['type'] == 'key':
-                    pyautogui.press(command['key'])
+                    pending_events.extend(_command_key_events('key', (command['key'],)))
                     self.logger.debug(f"按下按鍵: {command['key']}")
                 
-                time.sleep(command['delay'])
+                if command['delay'] > 0:
+                    if pending_events:
+                        fast_input.send_sequence(pending_events)
+                        pending_events = []
+                    time.sleep(command['delay'])
+            
+            if pending_events:
+                fast_input.send_sequence(pending_events)
             
             self.logger.info("✅ Copilot Chat 記憶清除流程完成")
             return True
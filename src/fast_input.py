@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 快速鍵盤輸入模組
+Windows 上直接以 user32.SendInput 送出按鍵（組合鍵一次呼叫送出全部事件），
+提供與 pyautogui 相同的 press / hotkey 介面；send_sequence 在其他平台退回 pyautogui（不套用全域 PAUSE）
+"""
+
+import ctypes
+import sys
+from ctypes import wintypes
+
+import pyautogui
+
+INPUT_KEYBOARD = 1
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+
+# pyautogui 鍵名 -> 虛擬鍵碼
+_VK_CODES = {
+    'backspace': 0x08, 'tab': 0x09, 'enter': 0x0D, 'return': 0x0D,
+    'shift': 0x10, 'ctrl': 0x11, 'alt': 0x12, 'pause': 0x13, 'capslock': 0x14,
+    'esc': 0x1B, 'escape': 0x1B, 'space': 0x20, ' ': 0x20,
+    'pageup': 0x21, 'pagedown': 0x22, 'end': 0x23, 'home': 0x24,
+    'left': 0x25, 'up': 0x26, 'right': 0x27, 'down': 0x28,
+    'insert': 0x2D, 'delete': 0x2E, 'del': 0x2E,
+    'win': 0x5B, 'winleft': 0x5B, 'winright': 0x5C, 'apps': 0x5D,
+    'multiply': 0x6A, 'add': 0x6B, 'separator': 0x6C, 'subtract': 0x6D,
+    'decimal': 0x6E, 'divide': 0x6F,
+    'shiftleft': 0xA0, 'shiftright': 0xA1, 'ctrlleft': 0xA2, 'ctrlright': 0xA3,
+    'altleft': 0xA4, 'altright': 0xA5,
+}
+_VK_CODES.update({f'f{i}': 0x6F + i for i in range(1, 25)})
+_VK_CODES.update({f'num{i}': 0x60 + i for i in range(10)})
+
+# 需要 KEYEVENTF_EXTENDEDKEY 的按鍵（否則方向鍵等會被當成數字鍵盤按鍵）
+_EXTENDED_KEYS = {
+    0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2D, 0x2E,
+    0x5B, 0x5C, 0x5D, 0x6F, 0xA3, 0xA5,
+}
+
+
+class _KeyBdInput(ctypes.Structure):
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _MouseInput(ctypes.Structure):
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _InputUnion(ctypes.Union):
+    # 包含 MOUSEINPUT 讓 sizeof(INPUT) 與 Windows 定義一致
+    _fields_ = [("ki", _KeyBdInput), ("mi", _MouseInput)]
+
+
+class _Input(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD), ("ii", _InputUnion)]
+
+
+_user32 = ctypes.WinDLL('user32', use_last_error=True) if sys.platform == 'win32' else None
+
+if _user32 is not None:
+    # VkKeyScanW 返回 SHORT（無對應按鍵時為 -1），需宣告型別才能正確比較
+    _user32.VkKeyScanW.argtypes = [wintypes.WCHAR]
+    _user32.VkKeyScanW.restype = ctypes.c_short
+
+
+def _vk(key: str) -> int:
+    """將 pyautogui 鍵名轉為虛擬鍵碼"""
+    key = key.lower()
+    code = _VK_CODES.get(key)
+    if code is not None:
+        return code
+    if len(key) == 1:
+        # 依目前鍵盤配置查詢字元對應的虛擬鍵碼（低位元組）
+        result = _user32.VkKeyScanW(key)
+        if result != -1:
+            return result & 0xFF
+    raise ValueError(f"不支援的按鍵: {key}")
+
+
+def _key_event(vk: int, key_up: bool) -> _Input:
+    flags = KEYEVENTF_KEYUP if key_up else 0
+    if vk in _EXTENDED_KEYS:
+        flags |= KEYEVENTF_EXTENDEDKEY
+    event = _Input(type=INPUT_KEYBOARD)
+    event.ii.ki = _KeyBdInput(wVk=vk, wScan=0, dwFlags=flags, time=0, dwExtraInfo=0)
+    return event
+
+
+def _send(events) -> None:
+    """以單次 SendInput 呼叫送出所有事件"""
+    count = len(events)
+    array = (_Input * count)(*events)
+    sent = _user32.SendInput(count, array, ctypes.sizeof(_Input))
+    if sent != count:
+        raise ctypes.WinError(ctypes.get_last_error())
+
+
+def press(key: str) -> None:
+    """按下並放開單一按鍵"""
+    vk = _vk(key)
+    _send([_key_event(vk, False), _key_event(vk, True)])
+
+
+def hotkey(*keys: str) -> None:
+    """依序按下所有按鍵，再以相反順序放開（一次送出）"""
+    codes = [_vk(key) for key in keys]
+    events = [_key_event(vk, False) for vk in codes]
+    events.extend(_key_event(vk, True) for vk in reversed(codes))
+    _send(events)
+
+
+def send_sequence(events) -> None:
+    """
+    送出一連串按鍵事件：Windows 以單次 SendInput 送出，其他平台以 pyautogui 逐一送出（不套用 pyautogui.PAUSE）
+    兩者皆保留 pyautogui 的 FAILSAFE 檢查
+    
+    Args:
+        events: [(動作, 鍵名), ...]，動作為 'down' 或 'up'
+    """
+    if _user32 is None:
+        for action, key in events:
+            if action == 'down':
+                pyautogui.keyDown(key, _pause=False)
+            else:
+                pyautogui.keyUp(key, _pause=False)
+        return
+    pyautogui.failSafeCheck()
+    _send([_key_event(_vk(key), action == 'up') for action, key in events])
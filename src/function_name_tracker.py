@@ -15,7 +15,7 @@ Function Name Tracker - 追蹤 AI 修改後的函式名稱
 import csv
 import re
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 from src.logger import get_logger
@@ -58,6 +58,10 @@ class FunctionNameTracker:
         # 內存中的原始函式行號映射：{(filepath, original_name): line_number}
         self.original_line_numbers: Dict[Tuple[str, str], int] = {}
         
+        # 檔案內容快取：{(full_path, mtime_ns, size): lines}
+        # 檔案被 AI 修改後 mtime/size 會改變，快取自動失效
+        self._file_index_cache: Dict[Tuple[str, int, int], List[str]] = {}
+        
         self.logger.info(f"初始化函式名稱追蹤器 - 專案: {project_name}")
     
     def initialize_csv(self) -> bool:
@@ -146,6 +150,31 @@ class FunctionNameTracker:
             self.logger.error(f"❌ 載入現有資料時發生錯誤: {e}")
             return False
     
+    def _read_lines(self, full_path: Path) -> List[str]:
+        """
+        讀取檔案所有行（以 mtime 與檔案大小為鍵快取）
+        
+        Args:
+            full_path: 檔案完整路徑
+            
+        Returns:
+            檔案內容的行列表
+        """
+        stat = full_path.stat()
+        cache_key = (str(full_path), stat.st_mtime_ns, stat.st_size)
+        
+        lines = self._file_index_cache.get(cache_key)
+        if lines is None:
+            with open(full_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+            # 同一檔案只保留最新版本的快取
+            path_str = cache_key[0]
+            for stale_key in [k for k in self._file_index_cache if k[0] == path_str]:
+                del self._file_index_cache[stale_key]
+            self._file_index_cache[cache_key] = lines
+        
+        return lines
+    
     def find_original_function_line(self, filepath: str, original_name: str, 
                                    project_path: Path) -> Optional[int]:
         """
@@ -171,8 +200,7 @@ class FunctionNameTracker:
                 return None
             
             # 逐行讀取檔案
-            with open(full_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            lines = self._read_lines(full_path)
             
             # 搜尋函式定義：def original_name(
             pattern = rf'def\s+{re.escape(original_name_clean)}\s*\('
@@ -222,9 +250,8 @@ class FunctionNameTracker:
                 self.logger.warning(f"⚠️  檔案不存在: {full_path}")
                 return None
             
-            # 讀取檔案
-            with open(full_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            # 讀取檔案（檔案未變更時使用快取）
+            lines = self._read_lines(full_path)
             
             # 檢查行號是否有效
             if line_number < 1 or line_number > len(lines):
@@ -416,6 +443,27 @@ class FunctionNameTracker:
         self.logger.debug(f"取得最新函式名稱：{original_name} → {latest_name}（第 {latest_round} 輪，行 {latest_line}）")
         return (latest_name, latest_line)
     
+    def get_latest_recorded(self, filepath: str, original_name: str,
+                            round_num: int) -> Optional[Tuple[str, Optional[int]]]:
+        """
+        取得指定輪次 Phase 1 已記錄在內存中的函式名稱和行號
+        
+        Phase 1 結束後檔案內容未再變動，因此可直接使用內存記錄，
+        不必重新讀取檔案
+        
+        Args:
+            filepath: 檔案路徑
+            original_name: 原始函式名稱
+            round_num: 輪數
+            
+        Returns:
+            (函式名稱, 行號) 或 None（該輪次尚無記錄）
+        """
+        for record_round, name, line in reversed(self.function_mapping.get((filepath, original_name), ())):
+            if record_round == round_num:
+                return (name, line)
+        return None
+    
     def get_function_name_for_round(self, filepath: str, original_name: str, 
                                     target_round: int) -> Tuple[str, Optional[int]]:
         """
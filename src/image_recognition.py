@@ -34,8 +34,49 @@ class ImageRecognition:
         """初始化圖像辨識器"""
         self.logger = get_logger("ImageRecognition")
         self.screenshot_count = 0
+        self._template_cache = {}  # 模板路徑 -> 解碼後的 BGR 陣列（避免每次比對重新解碼 PNG）
         self.logger.info("圖像辨識模組初始化完成")
     
+    def _get_template(self, template_path: Path) -> Optional[np.ndarray]:
+        """
+        取得解碼後的模板圖像（第一次讀取後快取）
+        
+        Args:
+            template_path: 模板圖像路徑
+            
+        Returns:
+            Optional[np.ndarray]: BGR 圖像陣列，檔案不存在或無法解碼則返回 None
+        """
+        key = str(template_path)
+        template = self._template_cache.get(key)
+        if template is None:
+            if not template_path.exists():
+                return None
+            # np.fromfile + imdecode 可處理含非 ASCII 字元的路徑
+            template = cv2.imdecode(np.fromfile(key, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if template is None:
+                return None
+            self._template_cache[key] = template
+        return template
+    
+    def preload_templates(self, template_paths) -> int:
+        """
+        預先載入並解碼模板圖像
+        
+        Args:
+            template_paths: 模板圖像路徑列表
+            
+        Returns:
+            int: 成功載入的模板數量
+        """
+        loaded = 0
+        for template_path in template_paths:
+            if self._get_template(Path(template_path)) is not None:
+                loaded += 1
+            else:
+                self.logger.warning(f"無法預先載入模板圖像: {template_path}")
+        return loaded
+    
     def take_screenshot(self, region: Tuple[int, int, int, int] = None, 
                        save_path: str = None) -> Optional[np.ndarray]:
         """
@@ -86,17 +127,18 @@ class ImageRecognition:
         """
         try:
             template_path = Path(template_path)
-            if not template_path.exists():
-                self.logger.error(f"模板圖像不存在: {template_path}")
+            template = self._get_template(template_path)
+            if template is None:
+                self.logger.error(f"模板圖像不存在或無法讀取: {template_path}")
                 return None
             
             if confidence is None:
                 confidence = config.IMAGE_CONFIDENCE
             
-            # 使用 pyautogui 的圖像識別功能
+            # 使用 pyautogui 的圖像識別功能（傳入已解碼的模板陣列）
             try:
                 location = pyautogui.locateOnScreen(
-                    str(template_path),
+                    template,
                     confidence=confidence,
                     region=region
                 )
@@ -268,6 +310,27 @@ class ImageRecognition:
             self.logger.debug(f"檢查 Copilot 回應狀態時發生錯誤: {str(e)}")
             return False
     
+    def check_copilot_buttons(self) -> Tuple[bool, bool]:
+        """
+        快速檢查 stop / send 按鈕（不清除通知，用於智能等待的每次輪詢）
+        檢測到 stop 按鈕時略過 send 按鈕比對
+        
+        Returns:
+            Tuple[bool, bool]: (是否有 stop 按鈕, 是否有 send 按鈕)
+        """
+        stop_button = self.find_image_on_screen(
+            str(config.STOP_BUTTON_IMAGE),
+            confidence=config.IMAGE_CONFIDENCE
+        )
+        if stop_button:
+            return True, False
+        
+        send_button = self.find_image_on_screen(
+            str(config.SEND_BUTTON_IMAGE),
+            confidence=config.IMAGE_CONFIDENCE
+        )
+        return False, bool(send_button)
+    
     def check_copilot_response_status_with_auto_clear(self) -> dict:
         """
         檢查 Copilot 回應狀態，每次檢測不到按鈕時都自動清除通知
@@ -4,7 +4,10 @@ Hybrid UI Automation Script - 日誌系統模組
 提供詳細的日誌記錄功能，包含成功/失敗/錯誤追蹤
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -22,6 +25,24 @@ except ImportError:
         sys.path.append(str(Path(__file__).parent.parent / "config"))
         import config
 
+# create_separator 使用的分隔線
+_SEPARATOR_LINE = "=" * 60
+# 專案日誌檔標頭結尾的分隔線
+_PROJECT_LOG_HEADER_RULE = "=" * 50 + "\n\n"
+
+# 各日誌記錄器名稱對應的背景寫入執行緒（重新初始化同名記錄器時先停止舊的）
+_LISTENERS = {}
+
+
+def _stop_listeners():
+    """程式結束時停止所有背景寫入執行緒（會先寫完佇列中剩餘的紀錄）"""
+    for listener in _LISTENERS.values():
+        listener.stop()
+    _LISTENERS.clear()
+
+
+atexit.register(_stop_listeners)
+
 class AutomationLogger:
     """自動化腳本專用日誌記錄器"""
     
@@ -41,6 +62,9 @@ class AutomationLogger:
         
         # 清除已存在的處理器，避免重複
         self.logger.handlers.clear()
+        old_listener = _LISTENERS.pop(name, None)
+        if old_listener is not None:
+            old_listener.stop()
         
         # 設定日誌檔案路徑
         if log_file:
@@ -58,36 +82,43 @@ class AutomationLogger:
         file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
         
         # 設定控制台處理器
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(log_level)
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        
+        # 呼叫端只將紀錄放入佇列，檔案與控制台輸出由背景執行緒處理
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
+        _LISTENERS[name] = listener
         
         # 記錄日誌系統啟動
         self.info(f"日誌系統初始化完成 - 檔案: {self.log_file}")
     
-    def debug(self, message: str, exc_info: bool = False):
-        """記錄除錯訊息"""
-        self.logger.debug(message, exc_info=exc_info)
+    def debug(self, message: str, *args, exc_info: bool = False):
+        """記錄除錯訊息（支援 % 延遲格式化參數）"""
+        self.logger.debug(message, *args, exc_info=exc_info)
     
-    def info(self, message: str, exc_info: bool = False):
-        """記錄一般訊息"""
-        self.logger.info(message, exc_info=exc_info)
+    def info(self, message: str, *args, exc_info: bool = False):
+        """記錄一般訊息（支援 % 延遲格式化參數）"""
+        self.logger.info(message, *args, exc_info=exc_info)
     
-    def warning(self, message: str, exc_info: bool = False):
-        """記錄警告訊息"""
-        self.logger.warning(message, exc_info=exc_info)
+    def warning(self, message: str, *args, exc_info: bool = False):
+        """記錄警告訊息（支援 % 延遲格式化參數）"""
+        self.logger.warning(message, *args, exc_info=exc_info)
     
-    def error(self, message: str, exc_info: bool = False):
-        """記錄錯誤訊息"""
-        self.logger.error(message, exc_info=exc_info)
+    def error(self, message: str, *args, exc_info: bool = False):
+        """記錄錯誤訊息（支援 % 延遲格式化參數）"""
+        self.logger.error(message, *args, exc_info=exc_info)
     
-    def critical(self, message: str, exc_info: bool = False):
-        """記錄嚴重錯誤訊息"""
-        self.logger.critical(message, exc_info=exc_info)
+    def critical(self, message: str, *args, exc_info: bool = False):
+        """記錄嚴重錯誤訊息（支援 % 延遲格式化參數）"""
+        self.logger.critical(message, *args, exc_info=exc_info)
     
     def project_start(self, project_path: str):
         """記錄專案開始處理"""
@@ -105,6 +136,8 @@ class AutomationLogger:
     
     def copilot_interaction(self, action: str, status: str = "INFO", details: str = ""):
         """記錄 Copilot 互動"""
+        if status not in ("ERROR", "WARNING") and not self.logger.isEnabledFor(logging.INFO):
+            return
         emoji = {"INFO": "ℹ️", "SUCCESS": "✅", "ERROR": "❌", "WARNING": "⚠️"}.get(status, "ℹ️")
         message = f"{emoji} Copilot {action}"
         if details:
@@ -158,7 +191,7 @@ class AutomationLogger:
     
     def create_separator(self, title: str = ""):
         """創建分隔線"""
-        separator = "=" * 60
+        separator = _SEPARATOR_LINE
         if title:
             title_padded = f" {title} "
             separator = separator[:25] + title_padded + separator[25+len(title_padded):]
@@ -211,10 +244,13 @@ class ProjectLogger:
         # 創建專案專用的簡化日誌
         try:
             self.project_log = project_log_file.open('w', encoding='utf-8')
-            self.project_log.write(f"專案自動化處理日誌\n")
-            self.project_log.write(f"專案: {project_name}\n")
-            self.project_log.write(f"開始時間: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.project_log.write("=" * 50 + "\n\n")
+            # 標頭一次組合、一次寫入
+            self.project_log.write(
+                f"專案自動化處理日誌\n"
+                f"專案: {project_name}\n"
+                f"開始時間: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"{_PROJECT_LOG_HEADER_RULE}"
+            )
             self.project_log.flush()  # 確保實時寫入
             self.main_logger.info(f"專案日誌檔建立: {project_log_file}")
         except Exception as e:
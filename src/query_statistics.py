@@ -176,29 +176,53 @@ class QueryStatistics:
             if csv_key not in current_data:
                 return False
             
-            function_data = current_data[csv_key]
-            
-            # 檢查是否有任何輪次發現漏洞（值 > 0）
-            for round_num in range(1, self.total_rounds + 1):
-                value = function_data.get(f'round{round_num}', '')
-                if value:
-                    value_str = str(value).strip()
-                    # 排除 #、failed、空字串
-                    if value_str not in ['#', 'failed', '', '0']:
-                        # 嘗試提取數字（可能格式為 "2 (Bandit)"）
-                        try:
-                            num_str = value_str.split('(')[0].strip()
-                            if num_str and int(num_str) > 0:
-                                return True  # 已發現漏洞，應跳過
-                        except (ValueError, AttributeError):
-                            pass
-            
-            return False
+            return self._has_vulnerability(current_data[csv_key])
             
         except Exception as e:
             self.logger.error(f"❌ 判斷是否跳過時發生錯誤: {e}")
             return False
     
+    def iter_success_keys(self):
+        """
+        列出所有已攻擊成功的函式（只讀取一次 CSV）
+        
+        Yields:
+            str: 函式識別（格式："filepath::function_name"，不含括號）
+        """
+        current_data = self._read_current_csv()
+        if not current_data:
+            return
+        
+        for csv_key, function_data in current_data.items():
+            if self._has_vulnerability(function_data):
+                yield csv_key
+    
+    def _has_vulnerability(self, function_data: Dict) -> bool:
+        """
+        檢查是否有任何輪次發現漏洞（值 > 0）
+        
+        Args:
+            function_data: 單一函式的 CSV 資料
+            
+        Returns:
+            bool: 是否已發現漏洞
+        """
+        for round_num in range(1, self.total_rounds + 1):
+            value = function_data.get(f'round{round_num}', '')
+            if value:
+                value_str = str(value).strip()
+                # 排除 #、failed、空字串
+                if value_str not in ['#', 'failed', '', '0']:
+                    # 嘗試提取數字（可能格式為 "2 (Bandit)"）
+                    try:
+                        num_str = value_str.split('(')[0].strip()
+                        if num_str and int(num_str) > 0:
+                            return True  # 已發現漏洞，應跳過
+                    except (ValueError, AttributeError):
+                        pass
+        
+        return False
+    
     def _split_function_key(self, function_key: str) -> tuple:
         """
         分離檔案路徑和函數名稱
@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
+import os
 import subprocess
 from pathlib import Path
 import sys
@@ -11,6 +12,26 @@ sys.path.append(str(Path(__file__).parent.parent))
 from config.config import config
 from src.settings_manager import settings_manager
 
+
+def _dir_size(path) -> int:
+    """
+    以 os.scandir 遞迴計算資料夾內所有檔案的總大小（bytes）
+    
+    DirEntry 會保留目錄列舉時取得的檔案資訊（Windows 上不需另外 stat），
+    取代 rglob + is_file + stat 對每個檔案的重複系統呼叫
+    """
+    total = 0
+    pending = [path]
+    while pending:
+        with os.scandir(pending.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file():
+                    total += entry.stat().st_size
+    return total
+
+
 class UIManager:
     """UI 管理器 - 提供簡單的選項選擇介面"""
     
@@ -418,7 +439,7 @@ class UIManager:
                 if success_dir.exists():
                     try:
                         # 計算大小
-                        dir_size = sum(f.stat().st_size for f in success_dir.rglob('*') if f.is_file())
+                        dir_size = _dir_size(success_dir)
                         total_size += dir_size
                         
                         shutil.rmtree(success_dir)
@@ -477,7 +498,7 @@ class UIManager:
                         if project_dir.exists():
                             try:
                                 # 計算大小
-                                dir_size = sum(f.stat().st_size for f in project_dir.rglob('*') if f.is_file())
+                                dir_size = _dir_size(project_dir)
                                 total_size += dir_size
                                 
                                 shutil.rmtree(project_dir)
@@ -518,7 +539,7 @@ class UIManager:
                         if bandit_dir.exists():
                             try:
                                 # 計算大小
-                                dir_size = sum(f.stat().st_size for f in bandit_dir.rglob('*') if f.is_file())
+                                dir_size = _dir_size(bandit_dir)
                                 total_size += dir_size
                                 
                                 shutil.rmtree(bandit_dir)
@@ -532,7 +553,7 @@ class UIManager:
                         if semgrep_dir.exists():
                             try:
                                 # 計算大小
-                                dir_size = sum(f.stat().st_size for f in semgrep_dir.rglob('*') if f.is_file())
+                                dir_size = _dir_size(semgrep_dir)
                                 total_size += dir_size
                                 
                                 shutil.rmtree(semgrep_dir)
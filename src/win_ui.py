@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - Windows UI Automation 輸入模組
+以 UI Automation 的 ValuePattern 直接設定目前聚焦輸入框的內容，
+取代「複製到剪貼簿 → 全選 → 貼上」流程（需安裝選用套件 uiautomation）
+"""
+
+import sys
+from typing import Iterable, Optional
+
+try:
+    import uiautomation as _uia
+except ImportError:
+    _uia = None
+
+
+def is_available() -> bool:
+    """是否可使用 UI Automation 設定輸入（僅 Windows 且已安裝 uiautomation）"""
+    return sys.platform == 'win32' and _uia is not None
+
+
+def _normalize(text: str) -> str:
+    """統一換行符號（輸入框可能將 \\n 存為 \\r\\n）"""
+    return text.replace('\r\n', '\n')
+
+
+def _is_input_control(control, keywords: Iterable[str]) -> bool:
+    """控制項的 ClassName 或 AutomationId 是否包含任一關鍵字（不分大小寫）"""
+    identity = f"{control.ClassName} {control.AutomationId}".casefold()
+    return any(keyword.casefold() in identity for keyword in keywords)
+
+
+def set_input_text(text: str, keywords: Iterable[str]) -> bool:
+    """
+    直接設定目前聚焦輸入框的內容（呼叫前需先聚焦 Copilot 輸入框）
+    設定前確認聚焦的是聊天輸入框，設定後讀回內容確認已寫入
+    
+    Args:
+        text: 要設定的內容
+        keywords: 聊天輸入框 ClassName / AutomationId 的識別關鍵字
+    
+    Returns:
+        bool: 設定並確認成功返回 True；不支援、聚焦的不是輸入框、內容不符或任何錯誤返回 False，
+              由呼叫端退回剪貼簿貼上
+    """
+    if not is_available():
+        return False
+    try:
+        control = _uia.GetFocusedControl()
+        if control is None or not _is_input_control(control, keywords):
+            return False
+        pattern = control.GetPattern(_uia.PatternId.ValuePattern)
+        if pattern is None or pattern.IsReadOnly:
+            return False
+        pattern.SetValue(text)
+        return _normalize(pattern.Value) == _normalize(text)
+    except Exception:
+        return False
+
+
+def get_input_text(keywords: Iterable[str]) -> Optional[str]:
+    """
+    讀取目前聚焦輸入框的內容（僅限聊天輸入框）
+    
+    Args:
+        keywords: 聊天輸入框 ClassName / AutomationId 的識別關鍵字
+    
+    Returns:
+        Optional[str]: 輸入框內容；不支援、聚焦的不是輸入框或任何錯誤返回 None
+    """
+    if not is_available():
+        return None
+    try:
+        control = _uia.GetFocusedControl()
+        if control is None or not _is_input_control(control, keywords):
+            return None
+        pattern = control.GetPattern(_uia.PatternId.ValuePattern)
+        if pattern is None:
+            return None
+        return pattern.Value
+    except Exception:
+        return None
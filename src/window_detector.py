@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Hybrid UI Automation Script - 視窗偵測模組
+依標題關鍵字與結尾（不分大小寫）尋找可見的頂層視窗，取代開啟 / 關閉專案時固定 time.sleep 的等待
+Windows 使用 user32.EnumWindows；Linux 使用 xdotool 或 wmctrl（兩者皆未安裝時不支援偵測）
+"""
+
+import ctypes
+import re
+import shutil
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+# 輪詢間隔：從 25ms 開始加倍，最多 200ms（視窗通常在數秒內出現，早期密集檢查、之後放寬）
+_POLL_INITIAL = 0.025
+_POLL_MAX = 0.2
+
+if sys.platform == 'win32':
+    from ctypes import wintypes
+    
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+    _WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    _SW_SHOWMAXIMIZED = 3
+    
+    class _WindowPlacement(ctypes.Structure):
+        _fields_ = [
+            ("length", wintypes.UINT),
+            ("flags", wintypes.UINT),
+            ("showCmd", wintypes.UINT),
+            ("ptMinPosition", wintypes.POINT),
+            ("ptMaxPosition", wintypes.POINT),
+            ("rcNormalPosition", wintypes.RECT),
+        ]
+    
+    # 明確宣告 HWND 參數型別（64 位元視窗代碼不會被當成 int 截斷）
+    _user32.IsWindowVisible.argtypes = [wintypes.HWND]
+    _user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+    _user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    _user32.GetWindowPlacement.argtypes = [wintypes.HWND, ctypes.POINTER(_WindowPlacement)]
+    _XDOTOOL = _WMCTRL = None
+else:
+    _user32 = None
+    # 外部工具路徑只在模組載入時解析一次
+    _XDOTOOL = shutil.which('xdotool')
+    _WMCTRL = shutil.which('wmctrl')
+
+
+def is_available() -> bool:
+    """目前平台是否能偵測視窗（Windows，或 Linux 已安裝 xdotool / wmctrl）"""
+    return _user32 is not None or _XDOTOOL is not None or _WMCTRL is not None
+
+
+def _ere_escape(text: str) -> str:
+    """跳脫 POSIX 延伸正規表示式（xdotool --name）的特殊字元"""
+    return re.sub(r'([.\[\]()*+?{}|^$\\])', r'\\\1', text)
+
+
+def _title_matches(title: str, keyword: str, title_suffix: str) -> bool:
+    """
+    標題是否含有關鍵字且以指定結尾收尾（關鍵字與結尾需已 casefold）
+    
+    關鍵字須位於標題開頭或緊接在 " - " 分隔符之後，
+    例如 "proj - " 符合 "main.py - proj - Windsurf"，但不符合 "main.py - oldproj - Windsurf"
+    """
+    title = title.casefold()
+    if not title.endswith(title_suffix):
+        return False
+    return title.startswith(keyword) or f" - {keyword}" in title
+
+
+def _find_window_win32(keyword: str, title_suffix: str) -> Optional[int]:
+    """以 EnumWindows 列舉可見頂層視窗，返回第一個標題符合條件的 HWND"""
+    found = []
+    
+    def callback(hwnd, _):
+        if not _user32.IsWindowVisible(hwnd):
+            return True
+        length = _user32.GetWindowTextLengthW(hwnd)
+        if length == 0:
+            return True
+        buffer = ctypes.create_unicode_buffer(length + 1)
+        _user32.GetWindowTextW(hwnd, buffer, length + 1)
+        if _title_matches(buffer.value, keyword, title_suffix):
+            found.append(hwnd)
+            return False  # 找到後停止列舉
+        return True
+    
+    _user32.EnumWindows(_WNDENUMPROC(callback), 0)
+    return found[0] if found else None
+
+
+def _find_window_x11(keyword: str, title_suffix: str) -> Optional[int]:
+    """以 xdotool（優先）或 wmctrl 尋找標題符合條件的可見視窗，返回 X window id"""
+    if _XDOTOOL is not None:
+        # xdotool 的 --name 為不分大小寫的正規表示式比對：先以結尾（或關鍵字）篩選候選視窗，
+        # 再逐一讀取完整標題確認同時符合關鍵字與結尾
+        pattern = _ere_escape(title_suffix) + '$' if title_suffix else _ere_escape(keyword)
+        result = subprocess.run(
+            [_XDOTOOL, 'search', '--onlyvisible', '--name', pattern],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        for window_id in result.stdout.split():
+            name = subprocess.run(
+                [_XDOTOOL, 'getwindowname', window_id],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            ).stdout.rstrip('\n')
+            if _title_matches(name, keyword, title_suffix):
+                return int(window_id)
+        return None
+    
+    # wmctrl -l 每行格式: 0x01234567  桌面  主機名稱  視窗標題
+    result = subprocess.run(
+        [_WMCTRL, '-l'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    for line in result.stdout.splitlines():
+        parts = line.split(None, 3)
+        if len(parts) == 4 and _title_matches(parts[3], keyword, title_suffix):
+            return int(parts[0], 16)
+    return None
+
+
+def find_window(keyword: str, title_suffix: str = "") -> Optional[int]:
+    """
+    尋找標題含有關鍵字（位於開頭或 " - " 之後）且以指定結尾收尾（皆不分大小寫）的可見頂層視窗
+    
+    Args:
+        keyword: 視窗標題關鍵字（例如 "專案資料夾名稱 - "）
+        title_suffix: 視窗標題結尾（例如 " - Windsurf"，用來排除其他應用程式標題中剛好包含關鍵字的視窗）
+    
+    Returns:
+        Optional[int]: 視窗代碼（Windows 為 HWND，Linux 為 X window id）；找不到或不支援時返回 None
+    """
+    keyword = keyword.casefold()
+    title_suffix = title_suffix.casefold()
+    try:
+        if _user32 is not None:
+            return _find_window_win32(keyword, title_suffix)
+        if _XDOTOOL is not None or _WMCTRL is not None:
+            return _find_window_x11(keyword, title_suffix)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def wait_for_window(keyword: str, timeout: float,
+                    should_stop: Optional[Callable[[], bool]] = None,
+                    title_suffix: str = "") -> Optional[int]:
+    """
+    輪詢直到符合條件的視窗出現或超時（輪詢間隔由 25ms 逐步加倍至 200ms）
+    
+    Args:
+        keyword: 視窗標題關鍵字
+        timeout: 超時時間（秒）
+        should_stop: 停止請求檢查函數，返回 True 時立即停止等待
+        title_suffix: 視窗標題結尾
+    
+    Returns:
+        Optional[int]: 找到的視窗代碼；超時、被中止或不支援偵測時返回 None
+    """
+    if not is_available():
+        return None
+    deadline = time.monotonic() + timeout
+    interval = _POLL_INITIAL
+    while True:
+        handle = find_window(keyword, title_suffix)
+        if handle is not None:
+            return handle
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (should_stop is not None and should_stop()):
+            return None
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, _POLL_MAX)
+
+
+def wait_for_window_closed(keyword: str, timeout: float, title_suffix: str = "") -> bool:
+    """
+    輪詢直到符合條件的視窗全部消失或超時
+    
+    Args:
+        keyword: 視窗標題關鍵字
+        timeout: 超時時間（秒）
+        title_suffix: 視窗標題結尾
+    
+    Returns:
+        bool: 視窗已不存在返回 True；超時或不支援偵測時返回 False
+    """
+    if not is_available():
+        return False
+    deadline = time.monotonic() + timeout
+    interval = _POLL_INITIAL
+    while find_window(keyword, title_suffix) is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, _POLL_MAX)
+    return True
+
+
+def is_maximized(handle: Optional[int]) -> Optional[bool]:
+    """
+    視窗是否已最大化（GetWindowPlacement 的 showCmd 為 SW_SHOWMAXIMIZED）
+    
+    Returns:
+        Optional[bool]: 是否最大化；非 Windows、沒有視窗代碼或查詢失敗時返回 None
+    """
+    if _user32 is None or handle is None:
+        return None
+    placement = _WindowPlacement()
+    placement.length = ctypes.sizeof(_WindowPlacement)
+    if not _user32.GetWindowPlacement(handle, ctypes.byref(placement)):
+        return None
+    return placement.showCmd == _SW_SHOWMAXIMIZED
+
+
+def wait_for_maximized(handle: Optional[int], timeout: float, poll: float = 0.02) -> Optional[bool]:
+    """
+    輪詢直到視窗最大化或超時
+    
+    Args:
+        handle: 視窗代碼
+        timeout: 超時時間（秒）
+        poll: 輪詢間隔（秒）
+    
+    Returns:
+        Optional[bool]: 已最大化返回 True，超時返回 False；無法查詢視窗狀態時返回 None
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        state = is_maximized(handle)
+        if state is None or state:
+            return state
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(poll, remaining))